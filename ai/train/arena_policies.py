@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""Head-to-head arena between two Python-side policies on base-rule games.
+
+Policy A (`--a`) and policy B (`--b`) are each one of: `heuristic`, a policy-table JSON,
+a `train_policy_onnx.py` checkpoint (`.pt`) or an exported ONNX model (`.onnx`). Every
+seed is played twice with colors swapped after the same `--opening-plies` random opening,
+so each pair cancels most of the first-move and opening luck. Game pairs are split into
+batches over a process pool; inside a batch all games advance in lockstep on
+`bitboard_engine` bitboards and each policy is evaluated once per ply for the games it
+is to move in.
+
+A's score (wins + draws/2) is reported with a Wilson confidence interval over the pairs,
+together with the implied Elo difference and games/sec. With `--min-lower-bound` the
+script exits 2 when the interval's lower bound falls below it, as a gate for candidates.
+"""
+
+from __future__ import annotations
+
+import argparse
+import concurrent.futures
+import datetime as dt
+import json
+import math
+import multiprocessing
+import os
+import statistics
+import time
+
+import numpy as np
+
+import bitboard_engine as bb
+import generate_selfplay_numpy as selfplay
+
+ARENA_SCHEMA_VERSION = "policy_arena.v1"
+HEURISTIC_SPEC = "heuristic"
+POLICY_SUFFIXES = (".json", ".pt", ".onnx")
+
+_WORKER_POLICIES: tuple | None = None
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Play two policies against each other on base-rule games.")
+    p.add_argument("--a", required=True, help="Policy A (the candidate): heuristic, <table>.json, <checkpoint>.pt or <model>.onnx.")
+    p.add_argument("--b", required=True, help="Policy B (the baseline), same forms as --a.")
+    p.add_argument("--games", type=int, default=200, help="Seeds to play; each is played once per color (default: 200).")
+    p.add_argument("--seed", type=int, default=1, help="Base seed; pair i uses seed+i (default: 1).")
+    p.add_argument("--max-plies", type=int, default=220, help="Max plies per game (default: 220).")
+    p.add_argument(
+        "--opening-plies",
+        type=int,
+        default=4,
+        help="Uniformly random plies played from each seed before the policies take over (default: 4).",
+    )
+    p.add_argument(
+        "--temperature",
+        type=float,
+        default=0.0,
+        help="Sampling temperature for .pt/.onnx policies (default: 0=argmax).",
+    )
+    p.add_argument("--tactical-weight", type=float, default=1.0, help="Tactical score weight for policy tables (default: 1).")
+    p.add_argument("--workers", type=int, default=0, help="Arena worker processes (default: 0=cpu_count).")
+    p.add_argument("--threads-per-worker", type=int, default=0, help="Torch/onnxruntime threads per worker (default: 0=cpu_count/workers).")
+    p.add_argument("--batch-size", type=int, default=256, help="Seed pairs per worker task, played in lockstep (default: 256).")
+    p.add_argument("--confidence", type=float, default=0.95, help="Confidence level of the score interval (default: 0.95).")
+    p.add_argument(
+        "--min-lower-bound",
+        type=float,
+        default=None,
+        help="Exit 2 unless the lower bound of A's score interval is at least this (default: off).",
+    )
+    p.add_argument("--report-out", default="", help="Write the arena report as JSON (default: off).")
+    return p.parse_args()
+
+
+def validate_args(args: argparse.Namespace) -> None:
+    for flag, spec in (("--a", args.a), ("--b", args.b)):
+        if spec == HEURISTIC_SPEC:
+            continue
+        if not spec.endswith(POLICY_SUFFIXES):
+            raise ValueError(f"{flag} must be {HEURISTIC_SPEC} or a {'/'.join(POLICY_SUFFIXES)} file: {spec}")
+        if not os.path.exists(spec):
+            raise ValueError(f"{flag} not found: {spec}")
+    if args.games < 1:
+        raise ValueError("--games must be >= 1")
+    if args.max_plies < 1:
+        raise ValueError("--max-plies must be >= 1")
+    if args.opening_plies < 0:
+        raise ValueError("--opening-plies must be >= 0")
+    if args.temperature < 0:
+        raise ValueError("--temperature must be >= 0")
+    if args.tactical_weight < 0:
+        raise ValueError("--tactical-weight must be >= 0")
+    if args.workers < 0:
+        raise ValueError("--workers must be >= 0")
+    if args.threads_per_worker < 0:
+        raise ValueError("--threads-per-worker must be >= 0")
+    if args.batch_size < 1:
+        raise ValueError("--batch-size must be >= 1")
+    if not 0 < args.confidence < 1:
+        raise ValueError("--confidence must be in (0,1)")
+    if args.min_lower_bound is not None and not 0 <= args.min_lower_bound <= 1:
+        raise ValueError("--min-lower-bound must be in [0,1]")
+
+
+def load_arena_policy(spec: str, options: dict, threads: int):
+    if spec == HEURISTIC_SPEC:
+        return selfplay.HeuristicPolicy()
+    if spec.endswith(".json"):
+        return selfplay.load_policy_table(spec, options["tacticalWeight"])
+    if spec.endswith(".onnx"):
+        return selfplay.OnnxPolicy(spec, options["temperature"], threads)
+    import torch
+
+    torch.set_num_threads(threads)
+    return selfplay.TorchPolicy(spec, "cpu", options["temperature"])
+
+
+def play_pairs(policies: tuple, pairs: np.ndarray, options: dict) -> list[dict]:
+    """Play every seed pair with A as black and as white; one result per game."""
+    policy_a, policy_b = policies
+    n = pairs.shape[0] * 2
+    pair_of = np.repeat(pairs, 2)
+    a_black = np.tile([True, False], pairs.shape[0])
+    seeds = pair_of.astype(np.int64) + int(options["seed"])
+    black, white = bb.initial_position(n)
+    player = np.full(n, bb.BLACK, dtype=np.int64)
+    passes = np.zeros(n, dtype=np.int64)
+    plies = np.zeros(n, dtype=np.int64)
+    live = np.ones(n, dtype=bool)
+    ply = 0
+    while live.any():
+        ids = np.flatnonzero(live)
+        over = (passes[ids] >= 2) | ((black[ids] | white[ids]) == bb.FULL) | (ply >= options["maxPlies"])
+        live[ids[over]] = False
+        ids = ids[~over]
+        if ids.size == 0:
+            break
+
+        pos = selfplay.Position.build(black[ids], white[ids], player[ids], seeds[ids], ply)
+        has_move = pos.legal_counts > 0
+        choice = np.zeros(ids.shape[0], dtype=np.int64)
+        if ply < options["openingPlies"]:
+            # Random opening: both games of a pair share the seed, so they share the opening too.
+            noise = selfplay.move_noise(pos.seeds, ply)
+            choice = np.where(pos.legal_cells, noise, -np.inf).argmax(axis=1)
+        else:
+            a_to_move = (pos.player == bb.BLACK) == a_black[ids]
+            for policy, side in ((policy_a, a_to_move), (policy_b, ~a_to_move)):
+                mask = side & has_move
+                if mask.any():
+                    moving = pos.take(mask)
+                    choice[mask] = np.where(moving.legal_cells, policy.scores(moving), -np.inf).argmax(axis=1)
+        move = np.where(has_move, bb.SQUARE_BITS[choice], bb.ZERO)
+        flipped = np.where(has_move, pos.flipped[np.arange(ids.shape[0]), choice], bb.ZERO)
+        own = pos.own | move | flipped
+        opp = pos.opp & ~flipped
+        is_black = pos.player == bb.BLACK
+        black[ids] = np.where(is_black, own, opp)
+        white[ids] = np.where(is_black, opp, own)
+        passes[ids] = np.where(has_move, 0, passes[ids] + 1)
+        player[ids] = -player[ids]
+        plies[ids] += 1
+        ply += 1
+
+    black_counts = bb.popcount(black)
+    white_counts = bb.popcount(white)
+    out = []
+    for i in range(n):
+        diff = int(black_counts[i] - white_counts[i])
+        if diff == 0:
+            winner = "draw"
+        else:
+            winner = "A" if (diff > 0) == bool(a_black[i]) else "B"
+        out.append(
+            {
+                "pair": int(pair_of[i]),
+                "aBlack": bool(a_black[i]),
+                "winner": winner,
+                "plies": int(plies[i]),
+                "blackCount": int(black_counts[i]),
+                "whiteCount": int(white_counts[i]),
+            }
+        )
+    return out
+
+
+def _init_worker(specs: tuple[str, str], options: dict, threads: int) -> None:
+    global _WORKER_POLICIES
+    _WORKER_POLICIES = tuple(load_arena_policy(spec, options, threads) for spec in specs)
+
+
+def _play_task(pairs: list[int], options: dict) -> list[dict]:
+    return play_pairs(_WORKER_POLICIES, np.asarray(pairs, dtype=np.int64), options)
+
+
+def _elo(score: float) -> float:
+    score = min(max(score, 1e-6), 1.0 - 1e-6)
+    return -400.0 * math.log10(1.0 / score - 1.0) + 0.0
+
+
+def summarize(games: list[dict], confidence: float) -> dict:
+    totals = {"A": 0, "B": 0, "draw": 0}
+    by_side = {"aBlack": {"A": 0, "B": 0, "draw": 0}, "aWhite": {"A": 0, "B": 0, "draw": 0}}
+    pair_points: dict[int, float] = {}
+    for game in games:
+        totals[game["winner"]] += 1
+        by_side["aBlack" if game["aBlack"] else "aWhite"][game["winner"]] += 1
+        point = 1.0 if game["winner"] == "A" else 0.5 if game["winner"] == "draw" else 0.0
+        pair_points[game["pair"]] = pair_points.get(game["pair"], 0.0) + point / 2
+    score = (totals["A"] + totals["draw"] * 0.5) / len(games)
+    # The two games of a pair share seed and opening, so pairs are the independent samples.
+    # A Wilson interval over them uses the largest variance a [0,1] score with this mean can
+    # have, so it stays open when every pair scores the same (e.g. a mirror match).
+    n = len(pair_points)
+    z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+    denom = 1.0 + z * z / n
+    center = (score + z * z / (2 * n)) / denom
+    half = z * math.sqrt(score * (1.0 - score) / n + z * z / (4 * n * n)) / denom
+    lower = max(0.0, center - half)
+    upper = min(1.0, center + half)
+    return {
+        "games": len(games),
+        "pairs": n,
+        "totals": totals,
+        "bySide": by_side,
+        "score": score,
+        "scoreInterval": [lower, upper],
+        "confidence": confidence,
+        "elo": _elo(score),
+        "eloInterval": [_elo(lower), _elo(upper)],
+        "avgPlies": sum(game["plies"] for game in games) / len(games),
+    }
+
+
+def main() -> int:
+    args = parse_args()
+    validate_args(args)
+    pairs = list(range(args.games))
+    batches = [pairs[i : i + args.batch_size] for i in range(0, len(pairs), args.batch_size)]
+    workers = int(args.workers) or max(1, min(len(batches), os.cpu_count() or 1))
+    threads = int(args.threads_per_worker) or max(1, (os.cpu_count() or 1) // workers)
+    options = {
+        "seed": int(args.seed),
+        "maxPlies": int(args.max_plies),
+        "openingPlies": int(args.opening_plies),
+        "temperature": float(args.temperature),
+        "tacticalWeight": float(args.tactical_weight),
+    }
+    print(
+        f"[arena_policies] a={args.a} b={args.b} games={args.games * 2} workers={workers} "
+        f"threads_per_worker={threads} batches={len(batches)}",
+        flush=True,
+    )
+
+    started = time.perf_counter()
+    games: list[dict] = []
+    if workers == 1:
+        # One worker plays in this process; no pool start-up or policy copies.
+        policies = tuple(load_arena_policy(spec, options, threads) for spec in (args.a, args.b))
+        for batch in batches:
+            games.extend(play_pairs(policies, np.asarray(batch, dtype=np.int64), options))
+    else:
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=((args.a, args.b), options, threads),
+        ) as pool:
+            futures = [pool.submit(_play_task, batch, options) for batch in batches]
+            for future in concurrent.futures.as_completed(futures):
+                games.extend(future.result())
+    seconds = time.perf_counter() - started
+    games.sort(key=lambda game: (game["pair"], not game["aBlack"]))
+
+    result = summarize(games, float(args.confidence))
+    total_plies = sum(game["plies"] for game in games)
+    gate = None
+    if args.min_lower_bound is not None:
+        gate = {"minLowerBound": float(args.min_lower_bound), "passed": result["scoreInterval"][0] >= args.min_lower_bound}
+    report = {
+        "schemaVersion": ARENA_SCHEMA_VERSION,
+        "generatedAt": dt.datetime.utcnow().isoformat() + "Z",
+        "config": {
+            "a": os.path.abspath(args.a) if args.a != HEURISTIC_SPEC else HEURISTIC_SPEC,
+            "b": os.path.abspath(args.b) if args.b != HEURISTIC_SPEC else HEURISTIC_SPEC,
+            "gamesPerColor": int(args.games),
+            "workers": workers,
+            "threadsPerWorker": threads,
+            "batchSize": int(args.batch_size),
+            **options,
+        },
+        "result": result,
+        "timing": {
+            "seconds": seconds,
+            "gamesPerSec": len(games) / max(seconds, 1e-9),
+            "pliesPerSec": total_plies / max(seconds, 1e-9),
+        },
+        "gate": gate,
+        "games": games,
+    }
+    if args.report_out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.report_out)), exist_ok=True)
+        with open(args.report_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    lower, upper = result["scoreInterval"]
+    elo_lower, elo_upper = result["eloInterval"]
+    print(
+        f"[arena_policies] games={result['games']} a_wins={result['totals']['A']} b_wins={result['totals']['B']} "
+        f"draws={result['totals']['draw']} score={result['score']:.3f} "
+        f"ci{round(args.confidence * 100)}=[{lower:.3f},{upper:.3f}] elo={result['elo']:+.1f} "
+        f"elo_ci=[{elo_lower:+.1f},{elo_upper:+.1f}] avg_plies={result['avgPlies']:.1f} "
+        f"games_per_sec={report['timing']['gamesPerSec']:.1f} seconds={seconds:.1f}"
+        + (f" min_lower_bound={gate['minLowerBound']:.3f} pass={gate['passed']}" if gate else ""),
+        flush=True,
+    )
+    if gate is not None and not gate["passed"]:
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
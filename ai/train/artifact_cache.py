@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""Content-addressed cache for the outputs of the Python training stages.
+
+A stage fingerprint covers the input file checksums, the arguments that shape the
+result, the card catalog and the source of the ai/train modules the stage runs. When
+a cached entry with the same fingerprint exists the stage copies its outputs back
+instead of recomputing them.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+
+CACHE_SCHEMA_VERSION = "artifact_cache.v1"
+CHECKSUM_INDEX_FILE = "checksums.json"
+MANIFEST_FILE = "manifest.json"
+HASH_CHUNK_BYTES = 1 << 20
+TRAIN_DIR = os.path.dirname(os.path.abspath(__file__))
+CARD_CATALOG_PATH = os.path.abspath(os.path.join(TRAIN_DIR, "..", "..", "cards", "catalog.json"))
+# Arguments that only control the cache itself never enter a fingerprint.
+CACHE_ARG_NAMES = ("artifact_cache_dir",)
+# Meta/manifest keys whose string values name output files; `onnx*` keys are included too.
+FILE_REF_KEYS = ("file", "meta", "path", "preferredFile", "studentManifest", "teacher")
+
+
+def add_cache_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument(
+        "--artifact-cache-dir",
+        default="",
+        help="Restore outputs from this content-addressed cache when inputs, args, card catalog and scripts match (default: off).",
+    )
+
+
+def _sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(HASH_CHUNK_BYTES)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _tmp_path(path: str) -> str:
+    # A plain open() keeps the umask default mode; mkstemp would leave restored files 0600.
+    return f"{path}.tmp-{os.getpid()}"
+
+
+def _write_json_atomic(payload: dict, path: str) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = _tmp_path(path)
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _copy_atomic(src: str, dst: str) -> None:
+    os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+    tmp_path = _tmp_path(dst)
+    try:
+        shutil.copyfile(src, tmp_path)
+        os.replace(tmp_path, dst)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class ChecksumIndex:
+    """sha256 of input files keyed by (path, size, mtime) so unchanged shards are hashed once."""
+
+    def __init__(self, cache_dir: str):
+        self.path = os.path.join(cache_dir, CHECKSUM_INDEX_FILE)
+        self._entries: dict[str, dict] = {}
+        self._dirty = False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+            if isinstance(payload, dict) and isinstance(payload.get("files"), dict):
+                self._entries = payload["files"]
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def checksum(self, path: str) -> dict:
+        abs_path = os.path.abspath(path)
+        st = os.stat(abs_path)
+        known = self._entries.get(abs_path)
+        if known and known.get("bytes") == st.st_size and known.get("mtimeNs") == st.st_mtime_ns:
+            return {"sha256": known["sha256"], "bytes": st.st_size}
+        sha = _sha256_file(abs_path)
+        self._entries[abs_path] = {"sha256": sha, "bytes": st.st_size, "mtimeNs": st.st_mtime_ns}
+        self._dirty = True
+        return {"sha256": sha, "bytes": st.st_size}
+
+    def save(self) -> None:
+        if self._dirty:
+            _write_json_atomic({"schemaVersion": CACHE_SCHEMA_VERSION, "files": self._entries}, self.path)
+            self._dirty = False
+
+
+def card_catalog_checksum() -> str | None:
+    if not os.path.exists(CARD_CATALOG_PATH):
+        return None
+    return _sha256_file(CARD_CATALOG_PATH)
+
+
+def script_version() -> dict[str, str]:
+    """sha256 of every ai/train module loaded by the running stage (its code version)."""
+    out: dict[str, str] = {}
+    for module in list(sys.modules.values()):
+        path = getattr(module, "__file__", None)
+        if not path or not os.path.isabs(path) or not path.endswith(".py"):
+            continue
+        if os.path.dirname(path) == TRAIN_DIR and os.path.isfile(path):
+            out[os.path.basename(path)] = _sha256_file(path)
+    return dict(sorted(out.items()))
+
+
+def _fingerprint_value(value):
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_fingerprint_value(v) for v in value]
+    return str(value)
+
+
+def _is_file_ref_key(key: str) -> bool:
+    return key in FILE_REF_KEYS or key.startswith("onnx")
+
+
+def _rename_refs(value, old_stem: str, new_stem: str):
+    """Return `value` with the stem of file references under known meta/manifest keys replaced, or None if unchanged."""
+    if isinstance(value, list):
+        items = [_rename_refs(v, old_stem, new_stem) for v in value]
+        return None if all(v is None for v in items) else [v if r is None else r for v, r in zip(value, items)]
+    if not isinstance(value, dict):
+        return None
+    out = dict(value)
+    changed = False
+    for key, item in value.items():
+        if isinstance(item, str) and _is_file_ref_key(key):
+            head, name = os.path.split(item)
+            if name.startswith(old_stem):
+                out[key] = os.path.join(head, new_stem + name[len(old_stem):])
+                changed = True
+        else:
+            renamed = _rename_refs(item, old_stem, new_stem)
+            if renamed is not None:
+                out[key] = renamed
+                changed = True
+    return out if changed else None
+
+
+def _restore_renamed(src: str, dst: str, old_stem: str, new_stem: str) -> None:
+    """Copy `src` to `dst`, pointing stem-relative references at the new stem.
+
+    Meta/manifest JSON names sibling files under `FILE_REF_KEYS` and ONNX models name
+    their external-data file, so only those are rewritten; everything else, including
+    JSON without such references, is copied verbatim.
+    """
+    os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+    if dst.endswith(".json"):
+        try:
+            with open(src, "r", encoding="utf-8") as f:
+                payload = _rename_refs(json.load(f), old_stem, new_stem)
+        except ValueError:
+            payload = None
+        if payload is not None:
+            _write_json_atomic(payload, dst)
+            return
+    if dst.endswith(".onnx"):
+        import onnx
+
+        model = onnx.load(src, load_external_data=False)
+        renamed = False
+        for tensor in model.graph.initializer:
+            for entry in tensor.external_data:
+                if entry.key == "location" and entry.value.startswith(old_stem):
+                    entry.value = new_stem + entry.value[len(old_stem):]
+                    renamed = True
+        if renamed:
+            tmp_path = _tmp_path(dst)
+            with open(tmp_path, "wb") as f:
+                f.write(model.SerializeToString())
+            os.replace(tmp_path, dst)
+            return
+    _copy_atomic(src, dst)
+
+
+@dataclass
+class StageCache:
+    cache_dir: str
+    stage: str
+    fingerprint: str
+    components: dict
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def entry_dir(self) -> str:
+        return os.path.join(self.cache_dir, self.stage, self.fingerprint)
+
+    def _collect(self, outputs: dict[str, str], sibling_prefix: str) -> dict[str, str]:
+        """Map output keys to existing paths: declared outputs plus new `<prefix>*` siblings."""
+        collected: dict[str, str] = {}
+        seen: set[str] = set()
+        for role, path in outputs.items():
+            path = (path or "").strip()
+            if path and os.path.isfile(path):
+                collected[role] = path
+                seen.add(os.path.abspath(path))
+        if sibling_prefix:
+            base_dir = os.path.dirname(sibling_prefix) or "."
+            name_prefix = os.path.basename(sibling_prefix)
+            since = time.time() - (time.perf_counter() - self.started)
+            for name in sorted(os.listdir(base_dir)):
+                path = os.path.join(base_dir, name)
+                if (
+                    not name.startswith(name_prefix)
+                    or os.path.abspath(path) in seen
+                    or not os.path.isfile(path)
+                    or os.path.getmtime(path) < since
+                ):
+                    continue
+                collected["sibling:" + name[len(name_prefix):]] = path
+        return collected
+
+    def restore(self, outputs: dict[str, str], sibling_prefix: str = "") -> dict | None:
+        """Copy a cached entry back to the requested paths; None on a miss.
+
+        Outputs are addressed by role and sibling suffix, so a hit lands under the
+        current names. JSON sidecars that mention the cached stem are rewritten to it.
+        """
+        manifest_path = os.path.join(self.entry_dir, MANIFEST_FILE)
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        files = manifest.get("files") or []
+        for entry in files:
+            cached = os.path.join(self.entry_dir, entry["blob"])
+            if not os.path.isfile(cached) or os.path.getsize(cached) != entry["bytes"]:
+                return None
+        old_stem = os.path.basename(manifest.get("siblingPrefix") or "")
+        new_stem = os.path.basename(sibling_prefix)
+        restored_bytes = 0
+        for entry in files:
+            key = entry["key"]
+            if key.startswith("sibling:"):
+                if not sibling_prefix:
+                    continue
+                dst = sibling_prefix + key[len("sibling:"):]
+            elif key in outputs:
+                dst = outputs[key]
+            else:
+                continue
+            src = os.path.join(self.entry_dir, entry["blob"])
+            if old_stem and new_stem and old_stem != new_stem:
+                _restore_renamed(src, dst, old_stem, new_stem)
+            else:
+                _copy_atomic(src, dst)
+            restored_bytes += entry["bytes"]
+        return {
+            "event": "artifactCache",
+            "stage": self.stage,
+            "status": "hit",
+            "fingerprint": self.fingerprint,
+            "files": len(files),
+            "bytes": restored_bytes,
+            "restoreSeconds": time.perf_counter() - self.started,
+            "savedSeconds": manifest.get("computeSeconds"),
+            "cachedAt": manifest.get("createdAt"),
+            "result": manifest.get("result"),
+        }
+
+    def store(self, outputs: dict[str, str], sibling_prefix: str = "", result: dict | None = None) -> dict:
+        """Copy the stage outputs into the cache; concurrent writers keep the first entry."""
+        compute_seconds = time.perf_counter() - self.started
+        collected = self._collect(outputs, sibling_prefix)
+        stage_dir = os.path.join(self.cache_dir, self.stage)
+        os.makedirs(stage_dir, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(prefix=self.fingerprint + ".", suffix=".tmp", dir=stage_dir)
+        files: list[dict] = []
+        try:
+            for index, (key, path) in enumerate(collected.items()):
+                blob = f"{index:03d}-{os.path.basename(path)}"
+                shutil.copyfile(path, os.path.join(tmp_dir, blob))
+                files.append({"key": key, "blob": blob, "bytes": os.path.getsize(path)})
+            manifest = {
+                "schemaVersion": CACHE_SCHEMA_VERSION,
+                "stage": self.stage,
+                "fingerprint": self.fingerprint,
+                "createdAt": dt.datetime.utcnow().isoformat() + "Z",
+                "computeSeconds": compute_seconds,
+                "siblingPrefix": sibling_prefix,
+                "components": self.components,
+                "files": files,
+                "result": result,
+            }
+            with open(os.path.join(tmp_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=2)
+            if os.path.isdir(self.entry_dir) and not os.path.isfile(os.path.join(self.entry_dir, MANIFEST_FILE)):
+                shutil.rmtree(self.entry_dir)
+            if os.path.isdir(self.entry_dir):
+                shutil.rmtree(tmp_dir)
+            else:
+                os.replace(tmp_dir, self.entry_dir)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if not os.path.isfile(os.path.join(self.entry_dir, MANIFEST_FILE)):
+                raise
+        return {
+            "event": "artifactCache",
+            "stage": self.stage,
+            "status": "miss",
+            "fingerprint": self.fingerprint,
+            "files": len(files),
+            "bytes": sum(entry["bytes"] for entry in files),
+            "computeSeconds": compute_seconds,
+        }
+
+
+def open_stage_cache(
+    args: argparse.Namespace,
+    stage: str,
+    inputs: dict[str, str],
+    outputs: tuple[str, ...],
+    extra: dict | None = None,
+) -> StageCache | None:
+    """Fingerprint a stage run; None when --artifact-cache-dir is not set.
+
+    `inputs` maps argument names to files that are fingerprinted by content; `outputs`
+    names the path arguments whose value stays out of the fingerprint (only whether
+    they are set counts) so a run writing to new names still hits.
+    """
+    cache_dir = (getattr(args, "artifact_cache_dir", "") or "").strip()
+    if not cache_dir:
+        return None
+    started = time.perf_counter()
+    os.makedirs(cache_dir, exist_ok=True)
+    index = ChecksumIndex(cache_dir)
+    input_sums = {name: index.checksum(path) for name, path in inputs.items() if (path or "").strip()}
+    index.save()
+    skipped = set(inputs) | set(outputs) | set(CACHE_ARG_NAMES)
+    components = {
+        "schemaVersion": CACHE_SCHEMA_VERSION,
+        "stage": stage,
+        "inputs": input_sums,
+        "args": {k: _fingerprint_value(v) for k, v in sorted(vars(args).items()) if k not in skipped},
+        "outputs": {name: bool((getattr(args, name, "") or "").strip()) for name in sorted(outputs)},
+        "cardCatalog": card_catalog_checksum(),
+        "scripts": script_version(),
+        "extra": extra or {},
+    }
+    blob = json.dumps(components, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return StageCache(cache_dir, stage, hashlib.sha256(blob).hexdigest(), components, started)
+
+
+def log_report(log_prefix: str, report: dict, metrics_out: str = "") -> None:
+    """Print the cache report and append it as one JSON line to `metrics_out`."""
+    text = f"[{log_prefix}] artifact_cache={report['status']} fingerprint={report['fingerprint'][:16]} files={report['files']} bytes={report['bytes']}"
+    if report["status"] == "hit":
+        saved = report.get("savedSeconds")
+        text += f" restore_seconds={report['restoreSeconds']:.2f}"
+        if saved is not None:
+            text += f" saved_seconds={saved:.2f}"
+    else:
+        text += f" compute_seconds={report['computeSeconds']:.2f}"
+    print(text, flush=True)
+    out = (metrics_out or "").strip()
+    if out:
+        os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+        with open(out, "a", encoding="utf-8") as f:
+            f.write(json.dumps({k: v for k, v in report.items() if k != "result"}, ensure_ascii=False))
+            f.write("\n")
@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""NumPy bitboard engine for the base Othello rules.
+
+Mirrors `getFlipsBasic`/`getLegalMovesBasic` from `src/engine/selfplay-runner.js`
+(no cards, no special stones) on uint64 bitboards: bit `row * 8 + col` is set when the
+side owns that cell. Every function accepts scalars or same-shaped uint64 arrays, so a
+whole batch of positions is stepped with a handful of shift-and-mask operations.
+
+Run as a script to cross-check the engine against recorded self-play games.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from train_policy_table import iter_ndjson
+
+BOARD_SIZE = 8
+BLACK = 1
+WHITE = -1
+
+FULL = np.uint64(0xFFFFFFFFFFFFFFFF)
+ZERO = np.uint64(0)
+NOT_COL_0 = np.uint64(0xFEFEFEFEFEFEFEFE)
+NOT_COL_7 = np.uint64(0x7F7F7F7F7F7F7F7F)
+CORNERS = np.uint64(0x8100000000000081)
+SQUARE_INDEX = np.arange(BOARD_SIZE * BOARD_SIZE, dtype=np.uint64)
+SQUARE_BITS = np.left_shift(np.uint64(1), SQUARE_INDEX)
+
+_K1 = np.uint64(0x5555555555555555)
+_K2 = np.uint64(0x3333333333333333)
+_K4 = np.uint64(0x0F0F0F0F0F0F0F0F)
+_D1 = np.uint64(0x5500550055005500)
+_D2 = np.uint64(0x3333000033330000)
+_D4 = np.uint64(0x0F0F0F0F00000000)
+
+# (row delta, col delta, shift, mask). A positive shift moves toward higher bit indexes;
+# the mask drops cells that wrapped around into the neighbouring row.
+DIRECTIONS = (
+    (-1, -1, -9, NOT_COL_7),
+    (-1, 0, -8, FULL),
+    (-1, 1, -7, NOT_COL_0),
+    (0, -1, -1, NOT_COL_7),
+    (0, 1, 1, NOT_COL_0),
+    (1, -1, 7, NOT_COL_7),
+    (1, 0, 8, FULL),
+    (1, 1, 9, NOT_COL_0),
+)
+
+
+def _shift(x: np.ndarray, shift: int, mask: np.uint64) -> np.ndarray:
+    if shift > 0:
+        return np.left_shift(x, np.uint64(shift)) & mask
+    return np.right_shift(x, np.uint64(-shift)) & mask
+
+
+def as_bits(x) -> np.ndarray:
+    """Python ints / lists / arrays as uint64 bitboards."""
+    return np.asarray(x, dtype=np.uint64)
+
+
+def popcount(x) -> np.ndarray:
+    return np.bitwise_count(as_bits(x)).astype(np.int64)
+
+
+def legal_moves(own, opp) -> np.ndarray:
+    """Mask of empty cells where `own` flips at least one `opp` stone."""
+    own = as_bits(own)
+    opp = as_bits(opp)
+    empty = ~(own | opp)
+    moves = np.zeros_like(own)
+    for _, _, shift, mask in DIRECTIONS:
+        run = _shift(own, shift, mask) & opp
+        for _ in range(BOARD_SIZE - 3):
+            run |= _shift(run, shift, mask) & opp
+        moves |= _shift(run, shift, mask) & empty
+    return moves
+
+
+def flips(own, opp, move) -> np.ndarray:
+    """Stones flipped when `own` plays the single-bit `move`; 0 for occupied cells or no move."""
+    own = as_bits(own)
+    opp = as_bits(opp)
+    move = as_bits(move) & ~(own | opp)
+    out = np.zeros_like(own | move)
+    for _, _, shift, mask in DIRECTIONS:
+        # `run` only grows through contiguous opponent stones, so the cell past its far end
+        # is own exactly when the line is bracketed.
+        run = _shift(move, shift, mask) & opp
+        for _ in range(BOARD_SIZE - 3):
+            run |= _shift(run, shift, mask) & opp
+        bracketed = (_shift(run, shift, mask) & own) != ZERO
+        out |= np.where(bracketed, run, ZERO)
+    return out
+
+
+def apply_move(own, opp, move) -> tuple[np.ndarray, np.ndarray]:
+    """(own, opp) after `own` plays `move`; a zero move is a pass and leaves both unchanged."""
+    own = as_bits(own)
+    opp = as_bits(opp)
+    move = as_bits(move)
+    flipped = flips(own, opp, move)
+    placed = np.where(flipped != ZERO, move, ZERO)
+    return own | placed | flipped, opp & ~flipped
+
+
+def sides(black, white, player) -> tuple[np.ndarray, np.ndarray]:
+    """(own, opp) for the side to move (`BLACK`/`WHITE`, scalar or per board)."""
+    is_black = np.asarray(player) == BLACK
+    black = as_bits(black)
+    white = as_bits(white)
+    return np.where(is_black, black, white), np.where(is_black, white, black)
+
+
+def play(black, white, player, move) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Play `move` (0 = pass) for `player` on every board; returns (black, white, next player)."""
+    own, opp = sides(black, white, player)
+    own, opp = apply_move(own, opp, move)
+    is_black = np.asarray(player) == BLACK
+    return np.where(is_black, own, opp), np.where(is_black, opp, own), -np.asarray(player)
+
+
+def turn_state(black, white, player) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(legal mask, must pass, game over) for `player` to move.
+
+    A side without a legal move passes; the game ends once neither side can move.
+    """
+    own, opp = sides(black, white, player)
+    legal = legal_moves(own, opp)
+    must_pass = legal == ZERO
+    game_over = must_pass & (legal_moves(opp, own) == ZERO)
+    return legal, must_pass, game_over
+
+
+def initial_position(n: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+    black = as_bits(bit(3, 4) | bit(4, 3))
+    white = as_bits(bit(3, 3) | bit(4, 4))
+    if n is None:
+        return black, white
+    return np.full(n, black, dtype=np.uint64), np.full(n, white, dtype=np.uint64)
+
+
+def bit(row: int, col: int) -> int:
+    return 1 << (row * BOARD_SIZE + col)
+
+
+def squares(mask) -> list[tuple[int, int]]:
+    """(row, col) of every set bit of one bitboard, row-major like getLegalMovesBasic."""
+    value = int(mask)
+    out = []
+    while value:
+        low = value & -value
+        index = low.bit_length() - 1
+        out.append(divmod(index, BOARD_SIZE))
+        value ^= low
+    return out
+
+
+def legal_moves_basic(black: int, white: int, player: int) -> list[dict]:
+    """Per-board equivalent of getLegalMovesBasic: [{row, col, flips: [{row, col}]}] row-major."""
+    own, opp = sides(black, white, player)
+    out = []
+    for row, col in squares(legal_moves(own, opp)):
+        flipped = flips(own, opp, bit(row, col))
+        out.append({"row": row, "col": col, "flips": [{"row": r, "col": c} for r, c in squares(flipped)]})
+    return out
+
+
+def parse_board(board_str: str) -> tuple[int, int]:
+    """(black, white) bits of a self-play `board` string ('B'/'W'/'.' rows joined by '/')."""
+    black = 0
+    white = 0
+    for row, line in enumerate(board_str.split("/")):
+        for col, ch in enumerate(line):
+            if ch == "B":
+                black |= bit(row, col)
+            elif ch == "W":
+                white |= bit(row, col)
+    return black, white
+
+
+def parse_boards(board_strs: Iterable[str]) -> tuple[np.ndarray, np.ndarray]:
+    pairs = [parse_board(s) for s in board_strs]
+    return as_bits([b for b, _ in pairs]), as_bits([w for _, w in pairs])
+
+
+def cells(x) -> np.ndarray:
+    """Bitboards as (..., 64) booleans in row-major cell order."""
+    return ((as_bits(x)[..., None] >> SQUARE_INDEX) & np.uint64(1)).astype(bool)
+
+
+def format_boards(black, white) -> list[str]:
+    """Self-play `board` strings for a batch of bitboards."""
+    black_cells = cells(np.atleast_1d(black))
+    white_cells = cells(np.atleast_1d(white))
+    out = np.full((black_cells.shape[0], BOARD_SIZE, BOARD_SIZE + 1), ord("/"), dtype=np.uint8)
+    grid = np.full(black_cells.shape, ord("."), dtype=np.uint8)
+    grid[black_cells] = ord("B")
+    grid[white_cells] = ord("W")
+    out[:, :, :BOARD_SIZE] = grid.reshape(-1, BOARD_SIZE, BOARD_SIZE)
+    flat = out.reshape(out.shape[0], -1)[:, :-1]
+    return [row.tobytes().decode("ascii") for row in flat]
+
+
+def format_board(black, white) -> str:
+    return format_boards(black, white)[0]
+
+
+def flip_vertical(x) -> np.ndarray:
+    """(row, col) -> (7 - row, col): rows are bytes, so this is a byte swap."""
+    return as_bits(x).byteswap()
+
+
+def mirror_horizontal(x) -> np.ndarray:
+    """(row, col) -> (row, 7 - col)."""
+    x = as_bits(x)
+    x = ((x >> np.uint64(1)) & _K1) | ((x & _K1) << np.uint64(1))
+    x = ((x >> np.uint64(2)) & _K2) | ((x & _K2) << np.uint64(2))
+    return ((x >> np.uint64(4)) & _K4) | ((x & _K4) << np.uint64(4))
+
+
+def transpose(x) -> np.ndarray:
+    """(row, col) -> (col, row)."""
+    x = as_bits(x)
+    t = _D4 & (x ^ (x << np.uint64(28)))
+    x = x ^ t ^ (t >> np.uint64(28))
+    t = _D2 & (x ^ (x << np.uint64(14)))
+    x = x ^ t ^ (t >> np.uint64(14))
+    t = _D1 & (x ^ (x << np.uint64(7)))
+    return x ^ t ^ (t >> np.uint64(7))
+
+
+def transform(x, t: int) -> np.ndarray:
+    """Dihedral transform `t` with `train_policy_table.transform_coord` numbering."""
+    if t == 1:
+        return transpose(flip_vertical(x))
+    if t == 2:
+        return flip_vertical(mirror_horizontal(x))
+    if t == 3:
+        return flip_vertical(transpose(x))
+    if t == 4:
+        return mirror_horizontal(x)
+    if t == 5:
+        return mirror_horizontal(flip_vertical(transpose(x)))
+    if t == 6:
+        return flip_vertical(x)
+    if t == 7:
+        return transpose(x)
+    return as_bits(x)
+
+
+def _cell_rank(black: np.ndarray, white: np.ndarray, low: np.ndarray) -> np.ndarray:
+    # '.' < 'B' < 'W' in the board string.
+    return ((black & low) != ZERO).astype(np.int8) + 2 * ((white & low) != ZERO).astype(np.int8)
+
+
+def canonicalize(black, white) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(black, white, transform id) of the lexicographically smallest board string.
+
+    Matches `train_policy_table.canonicalize_board`: the first differing cell in row-major
+    order is the lowest differing bit, and ties keep the lower transform id.
+    """
+    black = as_bits(black)
+    white = as_bits(white)
+    best_black, best_white = black, white
+    best_t = np.zeros(black.shape, dtype=np.int64)
+    for t in range(1, 8):
+        cand_black = transform(black, t)
+        cand_white = transform(white, t)
+        diff = (cand_black ^ best_black) | (cand_white ^ best_white)
+        low = diff & (~diff + np.uint64(1))
+        better = (diff != ZERO) & (_cell_rank(cand_black, cand_white, low) < _cell_rank(best_black, best_white, low))
+        best_black = np.where(better, cand_black, best_black)
+        best_white = np.where(better, cand_white, best_white)
+        best_t = np.where(better, t, best_t)
+    return best_black, best_white, best_t
+
+
+def iter_games(records: Iterable[dict]) -> Iterator[list[dict]]:
+    game: list[dict] = []
+    key = None
+    for rec in records:
+        rec_key = (rec.get("gameIndex"), rec.get("seed"))
+        if game and rec_key != key:
+            yield game
+            game = []
+        key = rec_key
+        game.append(rec)
+    if game:
+        yield game
+
+
+def base_rule_prefix(game: list[dict]) -> list[dict]:
+    """Records before the first card use; cards can leave special stones on the board."""
+    out = []
+    for rec in game:
+        if rec.get("actionType") not in ("place", "pass") or rec.get("pendingType") or rec.get("useCardId"):
+            break
+        out.append(rec)
+    return out
+
+
+def cross_check(records: Iterable[dict]) -> dict:
+    """Compare the engine with recorded games, one batch over every base-rule record.
+
+    For each record: the legal-move count, that the played move is legal (or that a pass
+    had none), the disc counts after the move and the board of the next record.
+    """
+    total = 0
+    games = 0
+    checked: list[dict] = []
+    next_boards: list[str | None] = []
+    first_boards: list[str] = []
+    for game in iter_games(records):
+        games += 1
+        total += len(game)
+        prefix = base_rule_prefix(game)
+        if not prefix:
+            continue
+        first_boards.append(prefix[0]["board"])
+        for i, rec in enumerate(prefix):
+            checked.append(rec)
+            next_boards.append(prefix[i + 1]["board"] if i + 1 < len(prefix) else None)
+
+    report = {
+        "records": total,
+        "games": games,
+        "checked": len(checked),
+        "skipped": total - len(checked),
+        "initialMismatches": 0,
+        "legalMismatches": 0,
+        "moveMismatches": 0,
+        "countMismatches": 0,
+        "transitionMismatches": 0,
+        "transitionsChecked": 0,
+        "boardsPerSec": 0.0,
+    }
+    if not checked:
+        return report
+
+    init_black, init_white = initial_position()
+    for board_str in first_boards:
+        if parse_board(board_str) != (int(init_black), int(init_white)):
+            report["initialMismatches"] += 1
+
+    black, white = parse_boards(rec["board"] for rec in checked)
+    player = np.array([BLACK if rec.get("player") == "black" else WHITE for rec in checked], dtype=np.int64)
+    move = as_bits([bit(rec["row"], rec["col"]) if rec.get("actionType") == "place" else 0 for rec in checked])
+
+    started = time.perf_counter()
+    legal, _, _ = turn_state(black, white, player)
+    after_black, after_white, _ = play(black, white, player, move)
+    elapsed = time.perf_counter() - started
+
+    recorded_legal = np.array([int(rec.get("legalMoves") or 0) for rec in checked], dtype=np.int64)
+    report["legalMismatches"] = int(np.count_nonzero(popcount(legal) != recorded_legal))
+    played_legal = (legal & move) != ZERO
+    is_pass = move == ZERO
+    report["moveMismatches"] = int(np.count_nonzero(np.where(is_pass, legal != ZERO, ~played_legal)))
+    recorded_counts = np.array(
+        [[int(rec.get("blackCountAfter", -1)), int(rec.get("whiteCountAfter", -1))] for rec in checked], dtype=np.int64
+    )
+    counts = np.stack([popcount(after_black), popcount(after_white)], axis=1)
+    report["countMismatches"] = int(np.count_nonzero((counts != recorded_counts).any(axis=1)))
+    for i, want in enumerate(next_boards):
+        if want is None:
+            continue
+        report["transitionsChecked"] += 1
+        if parse_board(want) != (int(after_black[i]), int(after_white[i])):
+            report["transitionMismatches"] += 1
+    report["boardsPerSec"] = len(checked) / max(elapsed, 1e-9)
+    return report
+
+
+def mismatches(report: dict) -> int:
+    return sum(report[k] for k in ("initialMismatches", "legalMismatches", "moveMismatches", "countMismatches", "transitionMismatches"))
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Cross-check the NumPy bitboard engine against self-play NDJSON.")
+    p.add_argument("--input", required=True, help="Path to self-play NDJSON data.")
+    p.add_argument("--report-out", default="", help="Write the cross-check report as JSON (default: off).")
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    report = cross_check(iter_ndjson(args.input))
+    if args.report_out:
+        with open(args.report_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    print(
+        "[bitboard_engine] "
+        f"records={report['records']} games={report['games']} checked={report['checked']} skipped={report['skipped']} "
+        f"transitions={report['transitionsChecked']} legal_mismatches={report['legalMismatches']} "
+        f"move_mismatches={report['moveMismatches']} count_mismatches={report['countMismatches']} "
+        f"transition_mismatches={report['transitionMismatches']} initial_mismatches={report['initialMismatches']} "
+        f"boards_per_sec={report['boardsPerSec']:.0f}"
+    )
+    return 1 if mismatches(report) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -44,7 +44,7 @@ def main() -> int:
     }
 
     required_modules = ("torch", "numpy", "onnx", "yaml")
-    optional_modules = ("tensorboard",)
+    optional_modules = ("tensorboard", "onnxruntime")
     loaded_modules: dict[str, Any] = {}
 
     for module_name in required_modules:
@@ -7,6 +7,7 @@ import argparse
 import json
 from typing import Iterable
 
+import artifact_cache
 from train_policy_table import (
     build_abstract_action_key,
     build_abstract_state_key,
@@ -20,6 +21,8 @@ def parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser(description="Evaluate policy table against NDJSON records.")
     p.add_argument("--input", required=True, help="Path to NDJSON data.")
     p.add_argument("--model", required=True, help="Path to policy-table JSON.")
+    p.add_argument("--metrics-out", default="", help="Append the artifact-cache report as a JSON line (default: off).")
+    artifact_cache.add_cache_args(p)
     return p.parse_args()
 
 
@@ -70,10 +73,20 @@ def evaluate(records: Iterable[dict], model: dict) -> dict:
 
 def main() -> int:
     args = parse_args()
-    with open(args.model, "r", encoding="utf-8") as f:
-        model = json.load(f)
-
-    result = evaluate(iter_ndjson(args.input), model)
+    cache = artifact_cache.open_stage_cache(
+        args, "evaluate_policy_table", inputs={"input": args.input, "model": args.model}, outputs=("metrics_out",)
+    )
+    report = cache.restore({}) if cache is not None else None
+    if report is not None:
+        result = report["result"]
+    else:
+        with open(args.model, "r", encoding="utf-8") as f:
+            model = json.load(f)
+        result = evaluate(iter_ndjson(args.input), model)
+        if cache is not None:
+            report = cache.store({}, result=result)
+    if report is not None:
+        artifact_cache.log_report("evaluate_policy_table", report, args.metrics_out)
     print(
         "[evaluate_policy_table] "
         f"records={result['records']} "
@@ -0,0 +1,570 @@
+#!/usr/bin/env python3
+"""Batched card-free self-play on NumPy bitboards.
+
+Advances up to `--batch-size` base-rule games in lockstep with `bitboard_engine` and
+queries the policy once per ply for every live game: the selfplay-runner heuristic,
+a policy table (`--policy-model`, scored like `getPolicyScore` plus the tactical
+lookahead, as `generate-selfplay-data.js --policy-model` does) or a torch checkpoint
+(`--policy-checkpoint`). Records use the `selfplay.v1` NDJSON schema with empty card
+fields. Each finished game is appended in one write and `<out>.summary.json` is written
+last, so `--follow` trainers can tail the output.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import math
+import os
+import time
+from dataclasses import dataclass
+from typing import Callable, TextIO
+
+import numpy as np
+
+import bitboard_engine as bb
+import train_policy_table as policy_table
+
+SELFPLAY_SCHEMA_VERSION = "selfplay.v1"
+POLICY_TABLE_SCHEMAS = ("policy_table.v1", "policy_table.v2")
+SUMMARY_SUFFIX = ".summary.json"
+NUM_SQUARES = bb.BOARD_SIZE * bb.BOARD_SIZE
+PLAYER_KEYS = {bb.BLACK: "black", bb.WHITE: "white"}
+
+
+def _per_square(fn: Callable[[int, int], object]) -> np.ndarray:
+    return np.array([fn(*divmod(i, bb.BOARD_SIZE)) for i in range(NUM_SQUARES)])
+
+
+IS_CORNER = _per_square(lambda r, c: r in (0, 7) and c in (0, 7))
+IS_EDGE = _per_square(lambda r, c: r in (0, 7) or c in (0, 7))
+IS_X = _per_square(lambda r, c: r in (1, 6) and c in (1, 6))
+IS_C = _per_square(lambda r, c: (r in (0, 7) and c in (1, 6)) or (c in (0, 7) and r in (1, 6)))
+# scoreMove without its flip and jitter terms, and evaluatePositionValue.
+MOVE_BONUS = IS_CORNER * 10000.0 + IS_EDGE * 250.0 - IS_X * 600.0 - IS_C * 300.0
+POSITION_VALUE = np.where(IS_CORNER, 10000.0, IS_EDGE * 250.0) - IS_X * 600.0 - IS_C * 300.0
+TACTICAL_TIE = _per_square(lambda r, c: (7 - r) * 0.001 + (7 - c) * 0.0001)
+# Abstract-state action key of a placement on every square.
+CELL_ACTION_KEYS = _per_square(lambda r, c: policy_table.build_abstract_action_key({"actionType": "place", "row": r, "col": c}))
+
+
+def _canonical_index() -> np.ndarray:
+    """[t][i]: cell index that square i moves to under transform t (exact action keys are canonical)."""
+    out = np.zeros((8, NUM_SQUARES), dtype=np.int64)
+    for t in range(8):
+        for i in range(NUM_SQUARES):
+            row, col = policy_table.transform_coord(*divmod(i, bb.BOARD_SIZE), bb.BOARD_SIZE, t)
+            out[t, i] = row * bb.BOARD_SIZE + col
+    return out
+
+
+CANONICAL_INDEX = _canonical_index()
+
+# A card-free selfplay.v1 record, byte for byte what json.dumps(record, separators=(",", ":"))
+# writes: every value is a number, null or a string that needs no escaping.
+RECORD_LINE = (
+    '{{"schemaVersion":"' + SELFPLAY_SCHEMA_VERSION + '","gameIndex":{0},"seed":{1},"ply":{2},"turnNumber":{2},'
+    '"player":"{3}","actionType":"{4}","row":{5},"col":{6},"useCardId":null,"legalMoves":{7},"pendingType":null,'
+    '"handBlack":0,"handWhite":0,"chargeBlack":0,"chargeWhite":0,"deckCount":0,"discardCount":0,'
+    '"blackCountBefore":{8},"whiteCountBefore":{9},"board":"{10}","handCards":[],"usableCardIds":[],'
+    '"blackCountAfter":{11},"whiteCountAfter":{12},"winner":"{13}","outcome":{14}}}\n'
+)
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Generate card-free self-play NDJSON with batched NumPy bitboards.")
+    p.add_argument("--out", required=True, help="Output NDJSON path (summary goes to <out>.summary.json).")
+    p.add_argument("--games", type=int, default=100, help="Number of self-play games (default: 100).")
+    p.add_argument("--seed", type=int, default=1, help="Base seed; game i uses seed+i (default: 1).")
+    p.add_argument("--max-plies", type=int, default=220, help="Max plies per game (default: 220).")
+    p.add_argument("--batch-size", type=int, default=4096, help="Games advanced in lockstep (default: 4096).")
+    p.add_argument("--policy-model", default="", help="Optional policy-table JSON used by both players.")
+    p.add_argument("--policy-checkpoint", default="", help="Optional train_policy_onnx.py checkpoint used by both players.")
+    p.add_argument(
+        "--tactical-weight",
+        type=float,
+        default=1.0,
+        help="Weight of the one-ply tactical score added with --policy-model (default: 1, as generate-selfplay-data.js).",
+    )
+    p.add_argument(
+        "--temperature",
+        type=float,
+        default=1.0,
+        help="Sampling temperature over legal-move logits with --policy-checkpoint (default: 1; 0=argmax).",
+    )
+    p.add_argument("--device", default="auto", help="Torch device for --policy-checkpoint: auto|cpu|cuda (default: auto).")
+    return p.parse_args()
+
+
+def validate_args(args: argparse.Namespace) -> None:
+    if args.games < 1:
+        raise ValueError("--games must be >= 1")
+    if args.max_plies < 1:
+        raise ValueError("--max-plies must be >= 1")
+    if args.batch_size < 1:
+        raise ValueError("--batch-size must be >= 1")
+    if args.policy_model and args.policy_checkpoint:
+        raise ValueError("--policy-model and --policy-checkpoint cannot be combined")
+    if args.tactical_weight < 0:
+        raise ValueError("--tactical-weight must be >= 0")
+    if args.temperature < 0:
+        raise ValueError("--temperature must be >= 0")
+    for flag, path in (("--policy-model", args.policy_model), ("--policy-checkpoint", args.policy_checkpoint)):
+        if path and not os.path.exists(path):
+            raise ValueError(f"{flag} not found: {path}")
+
+
+def _mix64(z: np.ndarray) -> np.ndarray:
+    z = (z ^ (z >> np.uint64(30))) * _MIX1
+    z = (z ^ (z >> np.uint64(27))) * _MIX2
+    return z ^ (z >> np.uint64(31))
+
+
+def move_noise(seeds: np.ndarray, ply: int) -> np.ndarray:
+    """Uniform [0, 1) per (game, square), a hash of (seed, ply, square).
+
+    Counter-based rather than a shared generator, so a game plays the same moves
+    whatever batch it lands in.
+    """
+    base = _mix64(seeds.astype(np.uint64) * _GOLDEN + np.uint64(ply))
+    z = _mix64(base[:, None] + (bb.SQUARE_INDEX + np.uint64(1)) * _GOLDEN)
+    return (z >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+
+def flips_by_square(own: np.ndarray, opp: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """(n, 64) flipped stones per square and legal cells; flips are only computed on legal squares."""
+    legal_cells = bb.cells(bb.legal_moves(own, opp))
+    games, squares = np.nonzero(legal_cells)
+    flipped = np.zeros(legal_cells.shape, dtype=np.uint64)
+    flipped[games, squares] = bb.flips(own[games], opp[games], bb.SQUARE_BITS[squares])
+    return flipped, legal_cells
+
+
+@dataclass
+class Position:
+    """Live games at one ply, from the side to move."""
+
+    black: np.ndarray
+    white: np.ndarray
+    player: np.ndarray
+    seeds: np.ndarray
+    ply: int
+    own: np.ndarray
+    opp: np.ndarray
+    flipped: np.ndarray  # (n, 64) stones flipped by a move on each square
+    flip_counts: np.ndarray
+    legal_cells: np.ndarray
+    legal_counts: np.ndarray
+
+    @classmethod
+    def build(cls, black: np.ndarray, white: np.ndarray, player: np.ndarray, seeds: np.ndarray, ply: int) -> Position:
+        own, opp = bb.sides(black, white, player)
+        flipped, legal_cells = flips_by_square(own, opp)
+        return cls(black, white, player, seeds, ply, own, opp, flipped, bb.popcount(flipped), legal_cells, legal_cells.sum(axis=1))
+
+    def take(self, mask: np.ndarray) -> Position:
+        return Position(
+            self.black[mask],
+            self.white[mask],
+            self.player[mask],
+            self.seeds[mask],
+            self.ply,
+            self.own[mask],
+            self.opp[mask],
+            self.flipped[mask],
+            self.flip_counts[mask],
+            self.legal_cells[mask],
+            self.legal_counts[mask],
+        )
+
+    def player_keys(self) -> list[str]:
+        return [PLAYER_KEYS[p] for p in self.player.tolist()]
+
+
+class HeuristicPolicy:
+    """selfplay-runner `scoreMove`: flips, corner/edge/X/C bonuses and a small jitter."""
+
+    name = "heuristic"
+
+    def scores(self, pos: Position) -> np.ndarray:
+        return pos.flip_counts * 100.0 + MOVE_BONUS + move_noise(pos.seeds, pos.ply) * 0.01
+
+
+def tactical_scores(pos: Position) -> np.ndarray:
+    """selfplay-runner `scoreTacticalMove` for every legal move, one batch over all games."""
+    games, squares = np.nonzero(pos.legal_cells)
+    flipped = pos.flipped[games, squares]
+    own = pos.own[games] | bb.SQUARE_BITS[squares] | flipped
+    opp = pos.opp[games] & ~flipped
+    empties = NUM_SQUARES - bb.popcount(own | opp)
+    disc_weight = np.where(empties <= 12, 18.0, np.where(empties <= 24, 8.0, 2.0))
+    disc_diff = bb.popcount(own) - bb.popcount(opp)
+    corner_diff = bb.popcount(own & bb.CORNERS) - bb.popcount(opp & bb.CORNERS)
+    reply_flipped, reply_legal = flips_by_square(opp, own)
+    reply_counts = bb.popcount(reply_flipped)
+    pressure = np.where(reply_legal, reply_counts * 80.0 + POSITION_VALUE * 8.0, 0.0)
+    threat = np.maximum(pressure.max(axis=1, initial=0.0), 0.0)
+    gives_corner = (reply_legal & IS_CORNER).any(axis=1)
+
+    out = np.zeros(pos.legal_cells.shape)
+    out[games, squares] = (
+        pos.flip_counts[games, squares] * 60.0
+        + POSITION_VALUE[squares] * 8.0
+        + disc_diff * disc_weight
+        + corner_diff * 300.0
+        + reply_legal.sum(axis=1) * -45.0
+        + threat * -6.0
+        + gives_corner * -1800.0
+        + TACTICAL_TIE[squares]
+    )
+    return out
+
+
+class TablePolicy:
+    """Policy-table scores as `getPolicyScore`, on top of the heuristic and tactical scores.
+
+    Each state's actions become a 64-cell score vector once (canonical cells for exact
+    states, cell categories for abstract ones) and every later hit is a gather.
+    """
+
+    name = "table"
+
+    def __init__(self, model: dict, tactical_weight: float):
+        self.states = model["states"]
+        abstract = model.get("abstractStates")
+        self.abstract_states = abstract if isinstance(abstract, dict) else {}
+        self.canonical = model.get("schemaVersion") == "policy_table.v2"
+        self.tactical_weight = float(tactical_weight)
+        self.heuristic = HeuristicPolicy()
+        self._exact: dict[str, np.ndarray | None] = {}
+        self._abstract: dict[str, np.ndarray | None] = {}
+        self.lookups = 0
+        self.exact_hits = 0
+        self.abstract_hits = 0
+
+    @staticmethod
+    def _entry_scores(state: dict | None, abstract: bool) -> np.ndarray | None:
+        if not isinstance(state, dict) or not isinstance(state.get("actions"), dict):
+            return None
+        out = np.zeros(NUM_SQUARES)
+        best_bonus = 50.0 if abstract else 100.0
+        for action_key, stat in state["actions"].items():
+            if abstract:
+                cells = CELL_ACTION_KEYS == action_key
+            else:
+                parts = action_key.split(":")
+                if len(parts) != 3 or parts[0] != "place":
+                    continue
+                cells = int(parts[1]) * bb.BOARD_SIZE + int(parts[2])
+            visits = stat.get("visits") if isinstance(stat.get("visits"), (int, float)) else 0
+            avg_outcome = stat.get("avgOutcome") if isinstance(stat.get("avgOutcome"), (int, float)) else 0
+            bonus = best_bonus if state.get("bestAction") == action_key else 0.0
+            out[cells] = bonus + math.log1p(max(0, visits)) * 15 + avg_outcome * 80
+        return out
+
+    def _lookup(self, cache: dict, section: dict, key: str, abstract: bool) -> np.ndarray | None:
+        if key not in cache:
+            cache[key] = self._entry_scores(section.get(key), abstract)
+        return cache[key]
+
+    def table_scores(self, pos: Position) -> np.ndarray:
+        if self.canonical:
+            black, white, transform_ids = bb.canonicalize(pos.black, pos.white)
+        else:
+            black, white, transform_ids = pos.black, pos.white, np.zeros(pos.black.shape, dtype=np.int64)
+        boards = bb.format_boards(black, white)
+        empties = (NUM_SQUARES - bb.popcount(pos.black | pos.white)).tolist()
+        disc_diff = (bb.popcount(pos.own) - bb.popcount(pos.opp)).tolist()
+        corner_diff = (bb.popcount(pos.own & bb.CORNERS) - bb.popcount(pos.opp & bb.CORNERS)).tolist()
+        legal_counts = pos.legal_counts.tolist()
+
+        out = np.zeros(pos.legal_cells.shape)
+        for i, player in enumerate(pos.player_keys()):
+            self.lookups += 1
+            vec = self._lookup(self._exact, self.states, f"{player}|{boards[i]}|-|{legal_counts[i]}", False)
+            if vec is not None:
+                self.exact_hits += 1
+                out[i] = vec[CANONICAL_INDEX[transform_ids[i]]]
+                continue
+            key = policy_table.abstract_state_key(player, "-", legal_counts[i], empties[i], disc_diff[i], corner_diff[i])
+            vec = self._lookup(self._abstract, self.abstract_states, key, True)
+            if vec is not None:
+                self.abstract_hits += 1
+                out[i] = vec
+        return out
+
+    def scores(self, pos: Position) -> np.ndarray:
+        out = self.heuristic.scores(pos) + self.table_scores(pos)
+        if self.tactical_weight > 0:
+            out += tactical_scores(pos) * self.tactical_weight
+        return out
+
+
+def model_features(pos: Position, input_dim: int) -> np.ndarray:
+    """`train_policy_onnx.feature_vector` rows for card-free records of every game."""
+    x = np.zeros((pos.own.shape[0], input_dim), dtype=np.float32)
+    x[:, :NUM_SQUARES] = bb.cells(pos.own).astype(np.float32) - bb.cells(pos.opp).astype(np.float32)
+    x[:, 64] = pos.legal_counts / 60.0
+    x[:, 65] = (bb.popcount(pos.own) - bb.popcount(pos.opp)) / 64.0
+    return x
+
+
+def logit_scores(logits: np.ndarray, pos: Position, temperature: float) -> np.ndarray:
+    """Logits as move scores; with a temperature the argmax samples the legal-move softmax (Gumbel-max)."""
+    logits = logits.astype(np.float64)
+    if temperature <= 0:
+        return logits
+    u = np.clip(move_noise(pos.seeds, pos.ply), 1e-12, 1.0 - 1e-12)
+    return logits / temperature - np.log(-np.log(u))
+
+
+class TorchPolicy:
+    """Place logits of a `PolicyNet` checkpoint, one forward pass per ply for all games."""
+
+    name = "torch"
+
+    def __init__(self, checkpoint_path: str, device: str, temperature: float):
+        import torch
+
+        import train_policy_onnx as onnx_base
+
+        ckpt = torch.load(checkpoint_path, map_location="cpu")
+        state = ckpt.get("model_state") if isinstance(ckpt, dict) else None
+        if state is None and isinstance(ckpt, dict):
+            state = ckpt
+        if not isinstance(state, dict) or "backbone.0.weight" not in state:
+            raise ValueError(f"invalid checkpoint format: {checkpoint_path}")
+        hidden_size, self.input_dim = (int(v) for v in state["backbone.0.weight"].shape)
+        num_layers = sum(1 for key in state if key.startswith("backbone.") and key.endswith(".weight"))
+        card_dim = int(state["card_head.weight"].shape[0]) if "card_head.weight" in state else 0
+        if int(state["place_head.weight"].shape[0]) != NUM_SQUARES:
+            raise ValueError(f"checkpoint place head must have {NUM_SQUARES} outputs: {checkpoint_path}")
+        model = onnx_base.PolicyNet(self.input_dim, hidden_size, NUM_SQUARES, card_dim, num_layers)
+        try:
+            model.load_state_dict(state)
+        except Exception as exc:
+            raise ValueError(f"failed to load model checkpoint: {checkpoint_path}: {exc}") from exc
+        self.torch = torch
+        self.device = onnx_base.choose_device(device)
+        self.model = model.to(self.device).eval()
+        self.temperature = float(temperature)
+
+    def scores(self, pos: Position) -> np.ndarray:
+        with self.torch.inference_mode():
+            out = self.model(self.torch.from_numpy(model_features(pos, self.input_dim)).to(self.device))
+        logits = (out[0] if isinstance(out, tuple) else out).float().cpu().numpy()
+        return logit_scores(logits, pos, self.temperature)
+
+
+class OnnxPolicy:
+    """Place logits of an exported policy ONNX model through onnxruntime, one run per ply for all games."""
+
+    name = "onnx"
+
+    def __init__(self, model_path: str, temperature: float, threads: int = 0):
+        try:
+            import onnxruntime as ort
+        except ImportError as exc:
+            raise ValueError(f"onnxruntime is required for ONNX policies (pip install onnxruntime): {model_path}") from exc
+        options = ort.SessionOptions()
+        if threads > 0:
+            options.intra_op_num_threads = int(threads)
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.input_dim = int(model_input.shape[1])
+        outputs = [o.name for o in self.session.get_outputs()]
+        self.output_name = "place_logits" if "place_logits" in outputs else outputs[0]
+        self.temperature = float(temperature)
+
+    def scores(self, pos: Position) -> np.ndarray:
+        x = model_features(pos, self.input_dim)
+        logits = self.session.run([self.output_name], {self.input_name: x})[0]
+        return logit_scores(logits, pos, self.temperature)
+
+
+def load_policy_table(path: str, tactical_weight: float) -> TablePolicy:
+    with open(path, "r", encoding="utf-8") as f:
+        model = json.load(f)
+    schema = model.get("schemaVersion") if isinstance(model, dict) else None
+    if schema not in POLICY_TABLE_SCHEMAS:
+        raise ValueError(f"unsupported policy-table schema: {schema or 'unknown'}: {path}")
+    if not isinstance(model.get("states"), dict):
+        raise ValueError(f"policy table must contain states object: {path}")
+    return TablePolicy(model, tactical_weight)
+
+
+def load_policy(args: argparse.Namespace):
+    if args.policy_checkpoint:
+        return TorchPolicy(args.policy_checkpoint, args.device, args.temperature)
+    if args.policy_model:
+        return load_policy_table(args.policy_model, args.tactical_weight)
+    return HeuristicPolicy()
+
+
+def _finish_game(game_index: int, seed: int, records: list[tuple], black: int, white: int, out: TextIO) -> str:
+    black_count = bin(black).count("1")
+    white_count = bin(white).count("1")
+    winner = "black" if black_count > white_count else "white" if white_count > black_count else "draw"
+    lines = []
+    for rec in records:
+        outcome = 0 if winner == "draw" else (1 if rec[1] == winner else -1)
+        lines.append(RECORD_LINE.format(game_index, seed, *rec, winner, outcome))
+    out.write("".join(lines))
+    out.flush()
+    return winner
+
+
+def play_batch(policy, game_indexes: np.ndarray, base_seed: int, max_plies: int, out: TextIO) -> tuple[dict, int]:
+    """Play one batch of games to the end; returns (wins, plies)."""
+    n = game_indexes.shape[0]
+    seeds = game_indexes.astype(np.int64) + int(base_seed)
+    black, white = bb.initial_position(n)
+    player = np.full(n, bb.BLACK, dtype=np.int64)
+    passes = np.zeros(n, dtype=np.int64)
+    live = np.ones(n, dtype=bool)
+    records: list[list[tuple]] = [[] for _ in range(n)]
+    wins = {"black": 0, "white": 0, "draw": 0}
+    plies = 0
+    ply = 0
+    while live.any():
+        ids = np.flatnonzero(live)
+        # Core.isGameOver: two passes in a row or a full board; selfplay-runner also stops at max plies.
+        over = (passes[ids] >= 2) | ((black[ids] | white[ids]) == bb.FULL) | (ply >= max_plies)
+        for i in ids[over].tolist():
+            winner = _finish_game(int(game_indexes[i]), int(seeds[i]), records[i], int(black[i]), int(white[i]), out)
+            wins[winner] += 1
+            plies += len(records[i])
+            records[i] = []
+        live[ids[over]] = False
+        ids = ids[~over]
+        if ids.size == 0:
+            break
+
+        pos = Position.build(black[ids], white[ids], player[ids], seeds[ids], ply)
+        has_move = pos.legal_counts > 0
+        choice = np.full(ids.shape[0], -1, dtype=np.int64)
+        if has_move.any():
+            moving = pos.take(has_move)
+            scores = np.where(moving.legal_cells, policy.scores(moving), -np.inf)
+            choice[has_move] = scores.argmax(axis=1)
+        square = np.maximum(choice, 0)
+        move = np.where(has_move, bb.SQUARE_BITS[square], bb.ZERO)
+        flipped = np.where(has_move, pos.flipped[np.arange(ids.shape[0]), square], bb.ZERO)
+        own = pos.own | move | flipped
+        opp = pos.opp & ~flipped
+        is_black = pos.player == bb.BLACK
+        next_black = np.where(is_black, own, opp)
+        next_white = np.where(is_black, opp, own)
+
+        columns = zip(
+            ids.tolist(),
+            pos.player_keys(),
+            choice.tolist(),
+            pos.legal_counts.tolist(),
+            bb.popcount(pos.black).tolist(),
+            bb.popcount(pos.white).tolist(),
+            bb.format_boards(pos.black, pos.white),
+            bb.popcount(next_black).tolist(),
+            bb.popcount(next_white).tolist(),
+        )
+        for i, player_key, sq, legal, black_before, white_before, board, black_after, white_after in columns:
+            if sq >= 0:
+                row, col = divmod(sq, bb.BOARD_SIZE)
+                action = ("place", row, col)
+            else:
+                action = ("pass", "null", "null")
+            records[i].append((ply, player_key, *action, legal, black_before, white_before, board, black_after, white_after))
+
+        black[ids] = next_black
+        white[ids] = next_white
+        passes[ids] = np.where(has_move, 0, passes[ids] + 1)
+        player[ids] = -player[ids]
+        ply += 1
+    return wins, plies
+
+
+def main() -> int:
+    args = parse_args()
+    validate_args(args)
+    policy = load_policy(args)
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    summary_path = args.out + SUMMARY_SUFFIX
+    if os.path.exists(summary_path):
+        # A stale marker would make --follow trainers treat the new file as finished.
+        os.remove(summary_path)
+
+    started = time.perf_counter()
+    wins = {"black": 0, "white": 0, "draw": 0}
+    total_plies = 0
+    with open(args.out, "w", encoding="utf-8") as out:
+        for start in range(0, args.games, args.batch_size):
+            indexes = np.arange(start, min(args.games, start + args.batch_size))
+            batch_wins, batch_plies = play_batch(policy, indexes, args.seed, args.max_plies, out)
+            for key, value in batch_wins.items():
+                wins[key] += value
+            total_plies += batch_plies
+            done = int(indexes[-1]) + 1
+            elapsed = time.perf_counter() - started
+            print(
+                f"[generate_selfplay_numpy] {done}/{args.games} completed "
+                f"games_per_sec={done / max(elapsed, 1e-9):.1f} records_per_sec={total_plies / max(elapsed, 1e-9):.0f}",
+                flush=True,
+            )
+    elapsed = time.perf_counter() - started
+
+    config = {
+        "games": int(args.games),
+        "seed": int(args.seed),
+        "maxPlies": int(args.max_plies),
+        "allowCardUsage": False,
+        "cardUsageRate": 0,
+        "hasPolicyModel": bool(args.policy_model or args.policy_checkpoint),
+        "policyModelPath": os.path.abspath(args.policy_model) if args.policy_model else None,
+        "generator": "numpy",
+        "policy": policy.name,
+        "batchSize": int(args.batch_size),
+    }
+    if args.policy_checkpoint:
+        config["policyCheckpointPath"] = os.path.abspath(args.policy_checkpoint)
+        config["temperature"] = float(args.temperature)
+    if args.policy_model:
+        config["tacticalWeight"] = float(args.tactical_weight)
+    payload = {
+        "generatedAt": dt.datetime.utcnow().isoformat() + "Z",
+        "elapsedMs": int(elapsed * 1000),
+        "schemaVersion": SELFPLAY_SCHEMA_VERSION,
+        "config": config,
+        "summary": {
+            "schemaVersion": SELFPLAY_SCHEMA_VERSION,
+            "totalGames": int(args.games),
+            "totalPlies": total_plies,
+            "avgPlies": total_plies / args.games,
+            "wins": wins,
+        },
+    }
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+
+    print(f"[generate_selfplay_numpy] records: {args.out}")
+    print(f"[generate_selfplay_numpy] summary: {summary_path}")
+    print(
+        f"[generate_selfplay_numpy] totalGames={args.games} avgPlies={total_plies / args.games:.2f} "
+        f"wins={json.dumps(wins, separators=(',', ':'))} policy={policy.name} "
+        f"games_per_sec={args.games / max(elapsed, 1e-9):.1f}"
+    )
+    if isinstance(policy, TablePolicy):
+        print(
+            f"[generate_selfplay_numpy] table lookups={policy.lookups} exact_hits={policy.exact_hits} "
+            f"abstract_hits={policy.abstract_hits}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
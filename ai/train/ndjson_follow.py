@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""Tail growing self-play NDJSON shards and hand out completed games.
+
+`generate-selfplay-data.js` appends each game's records in one write once the game is
+over (that is when `outcome` is filled in) and writes `<shard>.summary.json` after the
+last game. A game is handed out once a record of the next game follows it, or once the
+shard is finished: its summary exists or the shard was removed (the parallel generator
+deletes its parts after merging them).
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+SUMMARY_SUFFIX = ".summary.json"
+
+
+def add_follow_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument(
+        "--follow",
+        action="store_true",
+        help="Tail --input (a growing NDJSON file, a directory of shards or a glob) and train on completed games as they appear.",
+    )
+    p.add_argument("--follow-poll-seconds", type=float, default=5.0, help="Shard poll interval in --follow mode (default: 5).")
+    p.add_argument(
+        "--follow-idle-exit-seconds",
+        type=float,
+        default=0.0,
+        help="Stop --follow after this long without a new completed game (default: 0=run until interrupted).",
+    )
+    p.add_argument(
+        "--snapshot-every-seconds",
+        type=float,
+        default=300.0,
+        help="Export a fresh snapshot at most this often while new games arrive in --follow mode (default: 300).",
+    )
+
+
+def validate_follow_args(args: argparse.Namespace) -> bool:
+    """Return whether --follow is on."""
+    if not args.follow:
+        return False
+    if float(args.follow_poll_seconds) <= 0:
+        raise ValueError("--follow-poll-seconds must be > 0")
+    if float(args.follow_idle_exit_seconds) < 0:
+        raise ValueError("--follow-idle-exit-seconds must be >= 0")
+    if float(args.snapshot_every_seconds) < 0:
+        raise ValueError("--snapshot-every-seconds must be >= 0")
+    return True
+
+
+@dataclass
+class _Shard:
+    path: str
+    offset: int = 0
+    partial: bytes = b""
+    line_no: int = 0
+    game_key: tuple | None = None
+    game: list[dict] = field(default_factory=list)
+
+
+class ShardFollower:
+    """Incrementally reads every shard matched by `pattern`; new shards are picked up on each poll."""
+
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+        self._shards: dict[str, _Shard] = {}
+        self._finished: set[str] = set()
+        self.games = 0
+        self.records = 0
+        self.skipped_records = 0
+
+    def _discover(self) -> list[str]:
+        if os.path.isdir(self.pattern):
+            return sorted(glob.glob(os.path.join(self.pattern, "*.ndjson")))
+        if glob.has_magic(self.pattern):
+            return sorted(glob.glob(self.pattern))
+        return [self.pattern] if os.path.exists(self.pattern) else []
+
+    @property
+    def active_shards(self) -> int:
+        return len(self._shards)
+
+    @property
+    def finished_shards(self) -> int:
+        return len(self._finished)
+
+    def _finish_game(self, shard: _Shard, out: list[list[dict]]) -> None:
+        game, shard.game, shard.game_key = shard.game, [], None
+        if not game:
+            return
+        if any(rec.get("outcome") is None for rec in game):
+            # Only finished games carry outcomes; anything else cannot be trained on.
+            self.skipped_records += len(game)
+            return
+        self.games += 1
+        self.records += len(game)
+        out.append(game)
+
+    def _read(self, shard: _Shard, out: list[list[dict]]) -> None:
+        with open(shard.path, "rb") as f:
+            f.seek(shard.offset)
+            chunk = f.read()
+        shard.offset += len(chunk)
+        lines = (shard.partial + chunk).split(b"\n")
+        shard.partial = lines.pop()
+        for raw in lines:
+            shard.line_no += 1
+            raw = raw.strip()
+            if not raw:
+                continue
+            try:
+                rec = json.loads(raw)
+            except json.JSONDecodeError as err:
+                raise ValueError(f"invalid ndjson at {shard.path}:{shard.line_no}: {err}") from err
+            if not isinstance(rec, dict):
+                continue
+            key = (rec.get("gameIndex"), rec.get("seed"))
+            if shard.game and key != shard.game_key:
+                self._finish_game(shard, out)
+            shard.game_key = key
+            shard.game.append(rec)
+
+    def poll(self) -> list[list[dict]]:
+        """Completed games (lists of records) that appeared since the last poll."""
+        out: list[list[dict]] = []
+        for path in self._discover():
+            if path.endswith(SUMMARY_SUFFIX) or path in self._shards or path in self._finished:
+                continue
+            self._shards[path] = _Shard(path)
+        for path, shard in list(self._shards.items()):
+            # Check the marker first: once it exists every record is already on disk.
+            finished = os.path.exists(path + SUMMARY_SUFFIX)
+            try:
+                size = os.path.getsize(path)
+                if size < shard.offset:
+                    raise ValueError(f"shard shrank while following (rewritten?): {path}")
+                if size > shard.offset:
+                    self._read(shard, out)
+            except FileNotFoundError:
+                finished = True
+            if finished:
+                self._finish_game(shard, out)
+                self._finished.add(path)
+                del self._shards[path]
+        return out
+
+
+def follow_games(
+    args: argparse.Namespace,
+    on_games: Callable[[list[list[dict]]], None],
+    on_snapshot: Callable[[], None],
+    log_prefix: str,
+) -> ShardFollower:
+    """Feed completed games to `on_games` and call `on_snapshot` on the schedule.
+
+    A snapshot is due when new games arrived and `--snapshot-every-seconds` passed since
+    the previous one. Stops after `--follow-idle-exit-seconds` without a new game or on
+    Ctrl+C; the caller writes the final outputs afterwards.
+    """
+    follower = ShardFollower(args.input)
+    poll_seconds = float(args.follow_poll_seconds)
+    idle_exit = float(args.follow_idle_exit_seconds)
+    every = float(args.snapshot_every_seconds)
+    last_game_at = time.monotonic()
+    last_snapshot_at = time.monotonic()
+    new_games = 0
+    print(f"[{log_prefix}] follow input={args.input} poll_seconds={poll_seconds:g} snapshot_every_seconds={every:g}", flush=True)
+    try:
+        while True:
+            games = follower.poll()
+            now = time.monotonic()
+            if games:
+                on_games(games)
+                new_games += len(games)
+                last_game_at = now
+            if new_games and now - last_snapshot_at >= every:
+                on_snapshot()
+                new_games = 0
+                last_snapshot_at = time.monotonic()
+            if idle_exit > 0 and now - last_game_at >= idle_exit:
+                print(f"[{log_prefix}] follow idle for {idle_exit:g}s, stopping", flush=True)
+                break
+            time.sleep(poll_seconds)
+    except KeyboardInterrupt:
+        print(f"[{log_prefix}] follow interrupted, writing final outputs", flush=True)
+    print(
+        f"[{log_prefix}] follow games={follower.games} records={follower.records} "
+        f"skipped_records={follower.skipped_records} finished_shards={follower.finished_shards} "
+        f"open_shards={follower.active_shards}",
+        flush=True,
+    )
+    return follower
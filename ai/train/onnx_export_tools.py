@@ -0,0 +1,531 @@
+#!/usr/bin/env python3
+"""Post-export ONNX stages shared by the policy trainers (onnxruntime CPU)."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import torch
+
+QUANTIZE_MODES = ("off", "dynamic", "static")
+ONNX_CHECK_MODES = ("auto", "on", "off")
+BENCH_BATCH_SIZES = (1, 8, 64)
+# Meta entries that describe the fp32 export itself; a derived model's meta must not inherit them
+# (the browser would follow the teacher's `exportVariants.preferredFile` instead of loading the variant).
+TEACHER_ONLY_META_KEYS = ("exportVariants", "runtimeCheck", "quantized", "studentManifest", "sweep")
+
+
+def onnxruntime_available() -> bool:
+    try:
+        import onnxruntime  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _require_onnxruntime(flag: str):
+    try:
+        import onnxruntime as ort
+    except ImportError as exc:
+        raise ValueError(f"onnxruntime is required for {flag} (pip install onnxruntime)") from exc
+    return ort
+
+
+def open_session(onnx_path: str, threads: int = 1):
+    """CPU session pinned to `threads` intra-op threads, close to single-worker browser inference."""
+    ort = _require_onnxruntime("ONNX export checks")
+    opts = ort.SessionOptions()
+    opts.intra_op_num_threads = max(1, int(threads))
+    opts.inter_op_num_threads = 1
+    return ort.InferenceSession(onnx_path, sess_options=opts, providers=["CPUExecutionProvider"])
+
+
+def run_session(session, x: np.ndarray) -> dict[str, np.ndarray]:
+    """Run all rows of `x`; fixed batch=1 graphs are fed one row per call."""
+    model_input = session.get_inputs()[0]
+    output_names = [o.name for o in session.get_outputs()]
+    x = np.ascontiguousarray(x, dtype=np.float32)
+    if model_input.shape and model_input.shape[0] == 1 and x.shape[0] != 1:
+        rows = [session.run(output_names, {model_input.name: x[i : i + 1]}) for i in range(x.shape[0])]
+        return {name: np.concatenate([one[k] for one in rows], axis=0) for k, name in enumerate(output_names)}
+    outputs = session.run(output_names, {model_input.name: x})
+    return dict(zip(output_names, outputs))
+
+
+def measure_latency(session, sample: np.ndarray, batch_size: int, runs: int = 200, warmup: int = 20) -> dict:
+    """Per-call latency percentiles for `batch_size` rows drawn cyclically from `sample`."""
+    if sample.shape[0] <= 0:
+        raise ValueError("latency sample is empty")
+    reps = -(-batch_size // sample.shape[0])
+    batch = np.ascontiguousarray(np.tile(sample, (reps, 1))[:batch_size], dtype=np.float32)
+    input_name = session.get_inputs()[0].name
+    feed = {input_name: batch}
+    for _ in range(warmup):
+        session.run(None, feed)
+    timings = np.empty(runs, dtype=np.float64)
+    for i in range(runs):
+        started = time.perf_counter()
+        session.run(None, feed)
+        timings[i] = (time.perf_counter() - started) * 1000.0
+    return {
+        "batchSize": int(batch_size),
+        "runs": int(runs),
+        "p50Ms": float(np.percentile(timings, 50)),
+        "p99Ms": float(np.percentile(timings, 99)),
+        "meanMs": float(timings.mean()),
+    }
+
+
+def top1_agreement(reference: dict[str, np.ndarray], candidate: dict[str, np.ndarray]) -> dict[str, float]:
+    """Share of rows whose argmax matches, per output head."""
+    out: dict[str, float] = {}
+    for name, ref in reference.items():
+        cand = candidate.get(name)
+        if cand is None or ref.shape[0] <= 0:
+            continue
+        out[name] = float(np.mean(np.argmax(ref, axis=1) == np.argmax(cand, axis=1)))
+    return out
+
+
+def torch_outputs(model: torch.nn.Module, x: np.ndarray, output_names: list[str]) -> dict[str, np.ndarray]:
+    """Eager CPU outputs of `model` keyed like the ONNX graph outputs (same order)."""
+    model.eval()
+    with torch.no_grad():
+        outputs = model(torch.from_numpy(np.ascontiguousarray(x, dtype=np.float32)))
+    if not isinstance(outputs, (tuple, list)):
+        outputs = (outputs,)
+    return {name: out.detach().cpu().numpy() for name, out in zip(output_names, outputs)}
+
+
+def check_onnx_runtime(
+    onnx_path: str,
+    model: torch.nn.Module,
+    sample: np.ndarray,
+    batch_sizes: tuple[int, ...] = BENCH_BATCH_SIZES,
+    runs: int = 200,
+    max_deviation: float = 1e-3,
+    max_p99_ms: float = 0.0,
+) -> dict:
+    """Load the exported model in onnxruntime (CPU, 1 thread) and compare it with torch.
+
+    Parity is the max absolute logit difference per head on `sample`; latency is
+    p50/p99 per call at each batch size. `ok` is False when parity exceeds
+    `max_deviation` or, with `max_p99_ms > 0`, when batch-1 p99 is over budget.
+    """
+    session = open_session(onnx_path)
+    ort_out = run_session(session, sample)
+    ref_out = torch_outputs(model, sample, list(ort_out.keys()))
+    deviation = {name: float(np.max(np.abs(ort_out[name] - ref))) if ref.size else 0.0 for name, ref in ref_out.items()}
+    max_seen = max(deviation.values()) if deviation else 0.0
+    latency = [measure_latency(session, sample, int(b), runs=runs) for b in batch_sizes]
+    batch1 = next((one for one in latency if one["batchSize"] == 1), None)
+    parity_ok = max_seen <= max_deviation
+    latency_ok = not (max_p99_ms > 0 and batch1 is not None and batch1["p99Ms"] > max_p99_ms)
+    return {
+        "runtime": "onnxruntime-cpu",
+        "threads": 1,
+        "sampleRows": int(sample.shape[0]),
+        "maxAbsDeviation": deviation,
+        "maxDeviationLimit": float(max_deviation),
+        "parityOk": parity_ok,
+        "latency": latency,
+        "maxP99MsBatch1": float(max_p99_ms) if max_p99_ms > 0 else None,
+        "latencyOk": latency_ok,
+        "ok": parity_ok and latency_ok,
+        "bytes": model_bytes(onnx_path),
+    }
+
+
+def optimize_onnx(src_path: str, dst_path: str) -> None:
+    """Offline onnxruntime graph optimization for the CPU provider.
+
+    The extended level folds constants, removes redundant nodes and fuses Gemm+Relu
+    into com.microsoft FusedGemm; weights are written inline in `dst_path`.
+    """
+    import onnx
+
+    ort = _require_onnxruntime("--onnx-optimize")
+    with tempfile.TemporaryDirectory(prefix="policy_onnx_opt_") as tmp_dir:
+        # Inline external weights first; onnxruntime would otherwise keep references
+        # to the source's side file in the optimized graph.
+        inline_path = os.path.join(tmp_dir, "inline.onnx")
+        onnx.save(onnx.load(src_path), inline_path)
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+        opts.optimized_model_filepath = dst_path
+        ort.InferenceSession(inline_path, sess_options=opts, providers=["CPUExecutionProvider"])
+
+
+def variant_path(onnx_out: str, suffix: str) -> str:
+    return os.path.splitext(onnx_out)[0] + f".{suffix}.onnx"
+
+
+class _CalibrationReader:
+    """onnxruntime CalibrationDataReader over fixed-size chunks of training rows."""
+
+    def __init__(self, input_name: str, rows: np.ndarray, batch_size: int = 64) -> None:
+        self._batches = iter(
+            [{input_name: np.ascontiguousarray(rows[i : i + batch_size], dtype=np.float32)} for i in range(0, rows.shape[0], batch_size)]
+        )
+
+    def get_next(self):
+        return next(self._batches, None)
+
+
+def quantize_int8(
+    onnx_path: str,
+    out_path: str,
+    mode: str,
+    calibration: np.ndarray,
+    eval_sample: np.ndarray,
+    min_agreement: float,
+) -> dict:
+    """Quantize `onnx_path` to INT8 and compare it with the fp32 model.
+
+    Static mode calibrates activations on `calibration` (rows from the training data);
+    dynamic mode only quantizes weights. Top-1 agreement on `eval_sample` must reach
+    `min_agreement` for every head, otherwise the quantized file is removed and the
+    returned entry is marked refused.
+    """
+    _require_onnxruntime("--quantize")
+    from onnxruntime.quantization import QuantFormat, QuantType, quantize_dynamic, quantize_static
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    if mode not in ("dynamic", "static"):
+        raise ValueError(f"--quantize must be one of: {', '.join(QUANTIZE_MODES)}")
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    fp32_session = open_session(onnx_path)
+    with tempfile.TemporaryDirectory(prefix="policy_onnx_quant_") as tmp_dir:
+        # Re-run shape inference first; exporter-provided value_info can trip the quantizer.
+        prepared = os.path.join(tmp_dir, "prepared.onnx")
+        quant_pre_process(onnx_path, prepared)
+        if mode == "dynamic":
+            quantize_dynamic(prepared, out_path, weight_type=QuantType.QInt8)
+        else:
+            reader = _CalibrationReader(fp32_session.get_inputs()[0].name, calibration)
+            quantize_static(
+                prepared,
+                out_path,
+                reader,
+                quant_format=QuantFormat.QDQ,
+                activation_type=QuantType.QUInt8,
+                weight_type=QuantType.QInt8,
+                per_channel=True,
+            )
+
+    int8_session = open_session(out_path)
+    agreement = top1_agreement(run_session(fp32_session, eval_sample), run_session(int8_session, eval_sample))
+    min_seen = min(agreement.values()) if agreement else 0.0
+    accepted = min_seen >= min_agreement
+    fp32_latency = measure_latency(fp32_session, eval_sample, 1)
+    int8_latency = measure_latency(int8_session, eval_sample, 1)
+    entry = {
+        "mode": mode,
+        "path": os.path.abspath(out_path) if accepted else None,
+        "accepted": accepted,
+        "minAgreement": float(min_agreement),
+        "top1Agreement": agreement,
+        "evalRows": int(eval_sample.shape[0]),
+        "calibrationRows": int(calibration.shape[0]) if mode == "static" else 0,
+        "fp32Bytes": model_bytes(onnx_path),
+        "int8Bytes": model_bytes(out_path),
+        "fp32LatencyBatch1": fp32_latency,
+        "int8LatencyBatch1": int8_latency,
+    }
+    if not accepted:
+        del int8_session
+        os.remove(out_path)
+    return entry
+
+
+def model_bytes(onnx_path: str) -> int:
+    """On-disk size of an ONNX model including any external-data files it references."""
+    import onnx
+
+    total = os.path.getsize(onnx_path)
+    base_dir = os.path.dirname(os.path.abspath(onnx_path))
+    locations: set[str] = set()
+    for tensor in onnx.load(onnx_path, load_external_data=False).graph.initializer:
+        if tensor.data_location == onnx.TensorProto.EXTERNAL:
+            locations.update(e.value for e in tensor.external_data if e.key == "location")
+    for location in locations:
+        path = os.path.join(base_dir, location)
+        if os.path.exists(path):
+            total += os.path.getsize(path)
+    return total
+
+
+def sample_rows(x, rows: int, seed: int) -> np.ndarray:
+    """Seeded row sample of a torch feature tensor as float32 numpy."""
+    n = int(x.shape[0])
+    rng = np.random.default_rng(seed)
+    idx = np.sort(rng.choice(n, size=min(n, max(1, rows)), replace=False))
+    return x.index_select(0, torch.from_numpy(idx).to(x.device)).detach().cpu().numpy().astype(np.float32, copy=False)
+
+
+def update_meta(meta_path: str, updates: dict) -> None:
+    with open(meta_path, "r", encoding="utf-8") as f:
+        payload = json.load(f)
+    payload.update(updates)
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+
+
+def write_variant_meta(
+    meta_path: str, variant_meta_path: str, updates: dict, training_updates: dict | None = None
+) -> None:
+    """Copy the fp32 meta next to a derived model, with `updates` merged in.
+
+    Entries about the fp32 export (`TEACHER_ONLY_META_KEYS`) are dropped unless
+    `updates` sets them. `training_updates` overrides single `training` fields (e.g. a
+    student's own shape).
+    """
+    with open(meta_path, "r", encoding="utf-8") as f:
+        payload = json.load(f)
+    for key in TEACHER_ONLY_META_KEYS:
+        payload.pop(key, None)
+    payload.update(updates)
+    if training_updates:
+        payload["training"] = {**(payload.get("training") or {}), **training_updates}
+    with open(variant_meta_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+
+
+def add_quantize_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument(
+        "--quantize",
+        default="off",
+        help="Post-export INT8 quantization: off/dynamic/static (static calibrates on training rows) (default: off).",
+    )
+    p.add_argument("--quantize-out", default="", help="Quantized ONNX path (default: <onnx-out stem>.int8.onnx).")
+    p.add_argument("--quantize-calibration-rows", type=int, default=512, help="Training rows used for static calibration (default: 512).")
+    p.add_argument("--quantize-eval-rows", type=int, default=2048, help="Training rows used to compare INT8 vs fp32 top-1 (default: 2048).")
+    p.add_argument(
+        "--quantize-min-agreement",
+        type=float,
+        default=0.98,
+        help="Refuse the quantized model when top-1 agreement with fp32 falls below this on any head (default: 0.98).",
+    )
+
+
+def validate_quantize_args(args: argparse.Namespace) -> str:
+    mode = str(args.quantize or "off").strip().lower()
+    if mode not in QUANTIZE_MODES:
+        raise ValueError(f"--quantize must be one of: {', '.join(QUANTIZE_MODES)}")
+    if mode != "off":
+        _require_onnxruntime("--quantize")
+        if not (0.0 <= float(args.quantize_min_agreement) <= 1.0):
+            raise ValueError("--quantize-min-agreement must be in [0,1]")
+        if int(args.quantize_calibration_rows) < 1 or int(args.quantize_eval_rows) < 1:
+            raise ValueError("--quantize-calibration-rows and --quantize-eval-rows must be >= 1")
+    return mode
+
+
+def maybe_quantize_onnx(args: argparse.Namespace, onnx_out: str, meta_out: str, x: torch.Tensor, log_prefix: str) -> dict | None:
+    """Run the --quantize stage after export and record it in the fp32 meta as `quantized`.
+
+    An accepted model also gets its own `<quantized>.meta.json` so the runtime can load
+    it directly with the same feature contract.
+    """
+    mode = validate_quantize_args(args)
+    if mode == "off":
+        return None
+    out_path = (args.quantize_out or "").strip() or (os.path.splitext(onnx_out)[0] + ".int8.onnx")
+    seed = int(getattr(args, "seed", 1))
+    entry = quantize_int8(
+        onnx_out,
+        out_path,
+        mode,
+        calibration=sample_rows(x, int(args.quantize_calibration_rows), seed),
+        eval_sample=sample_rows(x, int(args.quantize_eval_rows), seed + 1),
+        min_agreement=float(args.quantize_min_agreement),
+    )
+    if entry["accepted"]:
+        entry["meta"] = os.path.abspath(out_path + ".meta.json")
+        write_variant_meta(meta_out, out_path + ".meta.json", {"quantization": entry})
+    elif os.path.exists(out_path + ".meta.json"):
+        # Drop a meta left by an earlier accepted run so it cannot point at a missing model.
+        os.remove(out_path + ".meta.json")
+    update_meta(meta_out, {"quantized": entry})
+    agreement_text = " ".join(f"agree_{k}={v:.4f}" for k, v in entry["top1Agreement"].items())
+    print(
+        f"[{log_prefix}] quantize={mode} accepted={str(entry['accepted']).lower()} {agreement_text} "
+        f"fp32_p50_ms={entry['fp32LatencyBatch1']['p50Ms']:.3f} int8_p50_ms={entry['int8LatencyBatch1']['p50Ms']:.3f} "
+        f"out={out_path if entry['accepted'] else '-'}",
+        flush=True,
+    )
+    return entry
+
+
+def add_onnx_check_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument(
+        "--onnx-check",
+        default="off",
+        help="Export-time onnxruntime parity/latency check: off/auto (report only, when onnxruntime is installed)/on (fail on a miss) (default: off).",
+    )
+    p.add_argument("--onnx-check-rows", type=int, default=256, help="Training rows used for the parity check and as latency inputs (default: 256).")
+    p.add_argument("--onnx-check-runs", type=int, default=200, help="Timed runs per batch size in the latency check (default: 200).")
+    p.add_argument("--onnx-max-deviation", type=float, default=1e-3, help="Max allowed |onnx - torch| logit difference (default: 1e-3).")
+    p.add_argument("--onnx-max-p99-ms", type=float, default=0.0, help="Fail when batch-1 p99 latency exceeds this many ms (default: 0=no limit).")
+
+
+def validate_onnx_check_args(args: argparse.Namespace) -> bool:
+    """Return whether the export-time check should run."""
+    mode = str(args.onnx_check or "off").strip().lower()
+    if mode not in ONNX_CHECK_MODES:
+        raise ValueError(f"--onnx-check must be one of: {', '.join(ONNX_CHECK_MODES)}")
+    if int(args.onnx_check_rows) < 1 or int(args.onnx_check_runs) < 1:
+        raise ValueError("--onnx-check-rows and --onnx-check-runs must be >= 1")
+    if float(args.onnx_max_deviation) < 0 or float(args.onnx_max_p99_ms) < 0:
+        raise ValueError("--onnx-max-deviation and --onnx-max-p99-ms must be >= 0")
+    if mode == "on":
+        _require_onnxruntime("--onnx-check on")
+        return True
+    return mode == "auto" and onnxruntime_available()
+
+
+def maybe_check_onnx_export(
+    args: argparse.Namespace,
+    model: torch.nn.Module,
+    onnx_out: str,
+    meta_out: str,
+    x: torch.Tensor,
+    log_prefix: str,
+) -> dict | None:
+    """Record the export-time runtime check under `runtimeCheck` in the meta.
+
+    With `--onnx-check on`, raises after writing the meta when parity or the latency
+    budget fails, so a broken or slow export stops the pipeline before promotion;
+    `auto` only reports.
+    """
+    if not validate_onnx_check_args(args):
+        # Only `auto` gets here with the check requested; `off` stays quiet.
+        if str(args.onnx_check or "off").strip().lower() == "auto":
+            print(f"[{log_prefix}] onnx_check=skipped reason=onnxruntime_not_installed", flush=True)
+        return None
+    entry = check_onnx_runtime(
+        onnx_out,
+        model,
+        sample_rows(x, int(args.onnx_check_rows), int(getattr(args, "seed", 1)) + 2),
+        runs=int(args.onnx_check_runs),
+        max_deviation=float(args.onnx_max_deviation),
+        max_p99_ms=float(args.onnx_max_p99_ms),
+    )
+    update_meta(meta_out, {"runtimeCheck": entry})
+    latency_text = " ".join(f"b{one['batchSize']}_p50={one['p50Ms']:.3f}ms b{one['batchSize']}_p99={one['p99Ms']:.3f}ms" for one in entry["latency"])
+    print(
+        f"[{log_prefix}] onnx_check ok={str(entry['ok']).lower()} "
+        f"max_dev={max(entry['maxAbsDeviation'].values(), default=0.0):.2e} {latency_text}",
+        flush=True,
+    )
+    if str(args.onnx_check).strip().lower() != "on":
+        return entry
+    if not entry["parityOk"]:
+        raise RuntimeError(f"ONNX export deviates from torch: {entry['maxAbsDeviation']} > {args.onnx_max_deviation}")
+    if not entry["latencyOk"]:
+        raise RuntimeError(f"ONNX batch-1 p99 latency exceeds --onnx-max-p99-ms={args.onnx_max_p99_ms}")
+    return entry
+
+
+def add_export_variant_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument(
+        "--onnx-optimize",
+        action="store_true",
+        help="Also write <onnx-out stem>.opt.onnx: onnxruntime-optimized graph (constant folding, fused Gemm+Relu).",
+    )
+    p.add_argument(
+        "--onnx-batch1",
+        action="store_true",
+        help="Also write <onnx-out stem>.b1.onnx: fixed batch=1 export for single-position inference (optimized with --onnx-optimize).",
+    )
+
+
+def validate_export_variant_args(args: argparse.Namespace) -> bool:
+    enabled = bool(args.onnx_optimize) or bool(args.onnx_batch1)
+    if enabled:
+        _require_onnxruntime("--onnx-optimize/--onnx-batch1")
+    return enabled
+
+
+def maybe_write_export_variants(
+    args: argparse.Namespace,
+    model: torch.nn.Module,
+    onnx_out: str,
+    meta_out: str,
+    x: torch.Tensor,
+    export_fn,
+    log_prefix: str,
+) -> dict | None:
+    """Write the optional optimized / batch=1 variants next to `onnx_out` and benchmark them.
+
+    Every variant (the dynamic-batch export included) gets the runtime parity and
+    latency check; `exportVariants` in the meta lists them and names the variant with
+    the lowest batch-1 p50 among those within parity as `preferred`. `export_fn` is
+    called as `export_fn(model, path, static_batch=True)` for the batch=1 export.
+    """
+    if not validate_export_variant_args(args):
+        return None
+    sample = sample_rows(x, int(args.onnx_check_rows), int(getattr(args, "seed", 1)) + 2)
+    candidates: list[tuple[str, str, int | None, bool]] = [("dynamic", onnx_out, None, False)]
+    with tempfile.TemporaryDirectory(prefix="policy_onnx_variants_") as tmp_dir:
+        if args.onnx_optimize:
+            optimized_path = variant_path(onnx_out, "opt")
+            optimize_onnx(onnx_out, optimized_path)
+            candidates.append(("optimized", optimized_path, None, True))
+        if args.onnx_batch1:
+            batch1_path = variant_path(onnx_out, "b1")
+            if args.onnx_optimize:
+                raw_path = os.path.join(tmp_dir, "batch1.onnx")
+                export_fn(model, raw_path, static_batch=True)
+                optimize_onnx(raw_path, batch1_path)
+            else:
+                export_fn(model, batch1_path, static_batch=True)
+            candidates.append(("batch1", batch1_path, 1, bool(args.onnx_optimize)))
+
+        variants: list[dict] = []
+        for name, path, fixed_batch, optimized in candidates:
+            check = check_onnx_runtime(
+                path,
+                model,
+                sample,
+                batch_sizes=BENCH_BATCH_SIZES if fixed_batch is None else (fixed_batch,),
+                runs=int(args.onnx_check_runs),
+                max_deviation=float(args.onnx_max_deviation),
+            )
+            variants.append(
+                {
+                    "name": name,
+                    "file": os.path.basename(path),
+                    "path": os.path.abspath(path),
+                    "batchSize": fixed_batch,
+                    "optimized": optimized,
+                    "bytes": check["bytes"],
+                    "maxAbsDeviation": check["maxAbsDeviation"],
+                    "parityOk": check["parityOk"],
+                    "latency": check["latency"],
+                }
+            )
+
+    def batch1_p50(one: dict) -> float:
+        return next((lat["p50Ms"] for lat in one["latency"] if lat["batchSize"] == 1), float("inf"))
+
+    eligible = [one for one in variants if one["parityOk"]]
+    preferred = min(eligible, key=batch1_p50) if eligible else None
+    entry = {
+        "variants": variants,
+        "preferred": preferred["name"] if preferred else None,
+        "preferredFile": preferred["file"] if preferred else None,
+    }
+    update_meta(meta_out, {"exportVariants": entry})
+    print(
+        f"[{log_prefix}] onnx_variants "
+        + " ".join(f"{one['name']}_b1_p50={batch1_p50(one):.3f}ms" + ("" if one["parityOk"] else "(parity-fail)") for one in variants)
+        + f" preferred={entry['preferred']}",
+        flush=True,
+    )
+    return entry
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""Latency-budgeted student models distilled from a trained PolicyNet teacher."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from dataclasses import dataclass
+
+import torch
+import torch.nn.functional as F
+from torch import nn
+
+import onnx_export_tools as export_tools
+
+MANIFEST_SCHEMA_VERSION = "policy_students.v1"
+# Mirrors CPU_LEVEL_NAMES in constants/difficulty-constants.js.
+CPU_LEVELS = (1, 2, 3, 4, 5, 6)
+DEFAULT_STUDENT_SPECS = "128x2,64x2,64x1,32x1"
+DEFAULT_LEVEL_BUDGETS = "1=0.25,2=0.25,3=0.5,4=0.5,5=0.75"
+
+
+@dataclass
+class StudentSpec:
+    hidden_size: int
+    num_layers: int
+
+    @property
+    def name(self) -> str:
+        return f"student-h{self.hidden_size}x{self.num_layers}"
+
+
+def parse_student_specs(raw: str) -> list[StudentSpec]:
+    specs: list[StudentSpec] = []
+    for token in (raw or "").split(","):
+        token = token.strip().lower()
+        if not token:
+            continue
+        hidden, sep, layers = token.partition("x")
+        try:
+            spec = StudentSpec(int(hidden), int(layers) if sep else 2)
+        except ValueError as exc:
+            raise ValueError(f"--students entries must look like HIDDENxLAYERS (e.g. 64x1): {token!r}") from exc
+        if spec.hidden_size < 1 or spec.num_layers < 1:
+            raise ValueError(f"--students hidden size and layer count must be >= 1: {token!r}")
+        specs.append(spec)
+    return specs
+
+
+def parse_level_budgets(raw: str) -> dict[int, float]:
+    budgets: dict[int, float] = {}
+    for token in (raw or "").split(","):
+        token = token.strip()
+        if not token:
+            continue
+        level, sep, ratio = token.partition("=")
+        try:
+            level_n, ratio_f = int(level), float(ratio)
+        except ValueError as exc:
+            raise ValueError(f"--student-level-budgets entries must look like LEVEL=RATIO: {token!r}") from exc
+        if not sep or level_n not in CPU_LEVELS or ratio_f <= 0:
+            raise ValueError(f"--student-level-budgets entries need a level in 1-{CPU_LEVELS[-1]} and a ratio > 0: {token!r}")
+        budgets[level_n] = ratio_f
+    return budgets
+
+
+def add_student_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument(
+        "--students",
+        default="",
+        help=f"Distill students HIDDENxLAYERS,... from the trained model after export, e.g. {DEFAULT_STUDENT_SPECS} (default: off).",
+    )
+    p.add_argument("--student-epochs", type=int, default=8, help="Distillation epochs per student (default: 8).")
+    p.add_argument("--student-lr", type=float, default=1e-3, help="Student learning rate (default: 1e-3).")
+    p.add_argument("--student-temperature", type=float, default=2.0, help="Softmax temperature for teacher/student logits (default: 2.0).")
+    p.add_argument("--student-val-split", type=float, default=0.1, help="Held-out row fraction for student accuracy (default: 0.1).")
+    p.add_argument(
+        "--student-level-budgets",
+        default=DEFAULT_LEVEL_BUDGETS,
+        help=(
+            "Per-level batch-1 p50 budget as a fraction of the full model's p50, LEVEL=RATIO,... "
+            f"Levels at or above --min-level-for-runtime use the full model (default: {DEFAULT_LEVEL_BUDGETS})."
+        ),
+    )
+    p.add_argument(
+        "--min-level-for-runtime",
+        type=int,
+        default=CPU_LEVELS[-1],
+        help=f"Lowest CPU level that always gets the full model in the student manifest (default: {CPU_LEVELS[-1]}).",
+    )
+    p.add_argument("--student-manifest-out", default="", help="Student manifest path (default: <onnx-out stem>.students.json).")
+
+
+def validate_student_args(args: argparse.Namespace) -> list[StudentSpec]:
+    """Return the parsed student specs; empty when the stage is off."""
+    specs = parse_student_specs(str(args.students or ""))
+    if int(args.min_level_for_runtime) not in CPU_LEVELS:
+        raise ValueError(f"--min-level-for-runtime must be in 1-{CPU_LEVELS[-1]}")
+    parse_level_budgets(str(args.student_level_budgets or ""))
+    if not specs:
+        return specs
+    if int(args.student_epochs) < 1:
+        raise ValueError("--student-epochs must be >= 1")
+    if float(args.student_lr) <= 0 or float(args.student_temperature) <= 0:
+        raise ValueError("--student-lr and --student-temperature must be > 0")
+    if not (0.0 < float(args.student_val_split) < 1.0):
+        raise ValueError("--student-val-split must be in (0, 1)")
+    export_tools._require_onnxruntime("--students")
+    return specs
+
+
+def backbone_shape(model: nn.Module) -> tuple[int, int]:
+    """(hidden_size, num_layers) of a PolicyNet-style backbone."""
+    linears = [m for m in model.backbone if isinstance(m, nn.Linear)]
+    return int(linears[-1].out_features), len(linears)
+
+
+def teacher_logits(teacher: nn.Module, x: torch.Tensor, device: str, eval_batch_size: int) -> list[torch.Tensor]:
+    """Teacher outputs for every row of `x`, kept on the host as the distillation targets."""
+    chunks: list[list[torch.Tensor]] = []
+    teacher.eval()
+    with torch.no_grad():
+        for start in range(0, int(x.shape[0]), eval_batch_size):
+            outputs = teacher(x[start : start + eval_batch_size].to(device))
+            if not isinstance(outputs, (tuple, list)):
+                outputs = (outputs,)
+            chunks.append([out.float().cpu() for out in outputs])
+    return [torch.cat([one[k] for one in chunks], dim=0) for k in range(len(chunks[0]))]
+
+
+def _soft_kl(student: torch.Tensor, teacher: torch.Tensor, temperature: float) -> torch.Tensor:
+    # Scaled by T^2 so gradient magnitudes stay comparable across temperatures.
+    log_p = F.log_softmax(student / temperature, dim=1)
+    q = F.softmax(teacher / temperature, dim=1)
+    return F.kl_div(log_p, q, reduction="batchmean") * (temperature * temperature)
+
+
+def distill_student(
+    student: nn.Module,
+    x: torch.Tensor,
+    targets: list[torch.Tensor],
+    train_idx: torch.Tensor,
+    device: str,
+    epochs: int,
+    batch_size: int,
+    lr: float,
+    temperature: float,
+) -> float:
+    """Fit `student` to the cached teacher logits on `train_idx`; returns the last epoch's mean loss."""
+    student.to(device)
+    optimizer = torch.optim.Adam(student.parameters(), lr=lr)
+    avg_loss = 0.0
+    for _ in range(epochs):
+        student.train()
+        perm = train_idx[torch.randperm(int(train_idx.shape[0]))]
+        loss_sum = torch.zeros((), dtype=torch.float64, device=device)
+        batches = 0
+        for start in range(0, int(perm.shape[0]), batch_size):
+            rows = perm[start : start + batch_size]
+            outputs = student(x.index_select(0, rows).to(device))
+            if not isinstance(outputs, (tuple, list)):
+                outputs = (outputs,)
+            loss = sum(_soft_kl(out, t.index_select(0, rows).to(device), temperature) for out, t in zip(outputs, targets))
+            optimizer.zero_grad(set_to_none=True)
+            loss.backward()
+            optimizer.step()
+            loss_sum += loss.detach()
+            batches += 1
+        avg_loss = float(loss_sum.item()) / max(1, batches)
+    student.eval()
+    return avg_loss
+
+
+def teacher_agreement(
+    student: nn.Module,
+    x: torch.Tensor,
+    targets: list[torch.Tensor],
+    idx: torch.Tensor,
+    device: str,
+    eval_batch_size: int,
+    output_names: list[str],
+) -> dict[str, float]:
+    """Per-head top-1 agreement between student and cached teacher logits on `idx`."""
+    matches = [0] * len(targets)
+    with torch.no_grad():
+        for start in range(0, int(idx.shape[0]), eval_batch_size):
+            rows = idx[start : start + eval_batch_size]
+            outputs = student(x.index_select(0, rows).to(device))
+            if not isinstance(outputs, (tuple, list)):
+                outputs = (outputs,)
+            for k, (out, t) in enumerate(zip(outputs, targets)):
+                matches[k] += int((out.argmax(dim=1).cpu() == t.index_select(0, rows).argmax(dim=1)).sum().item())
+    total = max(1, int(idx.shape[0]))
+    return {name: matches[k] / total for k, name in enumerate(output_names)}
+
+
+def eval_accuracy(result) -> dict:
+    """Overall/per-head accuracy from an EvalResult-style counter bundle."""
+    samples = result.place_samples + result.card_samples
+    return {
+        "acc": (result.place_correct + result.card_correct) / max(1, samples),
+        "placeAcc": result.place_correct / max(1, result.place_samples),
+        "cardAcc": result.card_correct / result.card_samples if result.card_samples > 0 else None,
+        "samples": int(samples),
+    }
+
+
+def _batch1(check: dict) -> dict:
+    one = next(lat for lat in check["latency"] if lat["batchSize"] == 1)
+    return {"p50Ms": one["p50Ms"], "p99Ms": one["p99Ms"], "meanMs": one["meanMs"]}
+
+
+def assign_levels(candidates: list[dict], teacher: dict, budgets: dict[int, float], min_level: int) -> dict[str, dict]:
+    """Most accurate candidate within each level's budget (ties go to the faster one).
+
+    Levels at or above `min_level` always get the full model; a level below it without
+    a budget, or whose budget nothing fits, maps to `model: null` (table/heuristic play).
+    """
+    teacher_p50 = teacher["latencyBatch1"]["p50Ms"]
+    levels: dict[str, dict] = {}
+    for level in CPU_LEVELS:
+        if level >= min_level:
+            levels[str(level)] = {"budgetRatio": None, "budgetMs": None, "model": teacher["name"], "file": teacher["file"], "meta": teacher["meta"]}
+            continue
+        ratio = budgets.get(level)
+        budget_ms = teacher_p50 * ratio if ratio is not None else None
+        fitting = [c for c in candidates if budget_ms is not None and c["latencyBatch1"]["p50Ms"] <= budget_ms]
+        best = max(fitting, key=lambda c: (c["valAcc"], -c["latencyBatch1"]["p50Ms"])) if fitting else None
+        levels[str(level)] = {
+            "budgetRatio": ratio,
+            "budgetMs": budget_ms,
+            "model": best["name"] if best else None,
+            "file": best["file"] if best else None,
+            "meta": best["meta"] if best else None,
+        }
+    return levels
+
+
+def maybe_distill_students(
+    args: argparse.Namespace,
+    teacher: nn.Module,
+    onnx_out: str,
+    meta_out: str,
+    x: torch.Tensor,
+    make_student,
+    eval_fn,
+    export_fn,
+    device: str,
+    log_prefix: str,
+) -> dict | None:
+    """Train, export and benchmark the --students and write the level manifest.
+
+    `make_student(hidden_size, num_layers)` builds an untrained PolicyNet-compatible
+    module, `eval_fn(model, idx)` returns the trainer's EvalResult on rows `idx`, and
+    `export_fn(model, path)` writes the ONNX file with the teacher's input/output names.
+    The manifest path is recorded as `studentManifest` in the teacher meta.
+    """
+    specs = validate_student_args(args)
+    if not specs:
+        return None
+    seed = int(getattr(args, "seed", 1))
+    eval_batch_size = int(getattr(args, "eval_batch_size", 0) or 8192)
+    temperature = float(args.student_temperature)
+    torch.manual_seed(seed)
+    teacher.to(device)
+    targets = teacher_logits(teacher, x, device, eval_batch_size)
+
+    n = int(x.shape[0])
+    perm = torch.randperm(n, generator=torch.Generator().manual_seed(seed))
+    val_n = min(n - 1, max(1, int(n * float(args.student_val_split))))
+    val_idx, train_idx = perm[:val_n].sort().values, perm[val_n:]
+    sample = export_tools.sample_rows(x, int(getattr(args, "onnx_check_rows", 256)), seed + 3)
+    runs = int(getattr(args, "onnx_check_runs", 200))
+    max_deviation = float(getattr(args, "onnx_max_deviation", 1e-3))
+
+    teacher.cpu()
+    teacher_check = export_tools.check_onnx_runtime(onnx_out, teacher, sample, batch_sizes=(1,), runs=runs)
+    teacher.to(device)
+    teacher_hidden, teacher_layers = backbone_shape(teacher)
+    teacher_entry = {
+        "name": "teacher",
+        "file": os.path.basename(onnx_out),
+        "meta": os.path.basename(meta_out),
+        "hiddenSize": teacher_hidden,
+        "layers": teacher_layers,
+        "params": sum(p.numel() for p in teacher.parameters()),
+        "bytes": teacher_check["bytes"],
+        "latencyBatch1": _batch1(teacher_check),
+        **{f"val{k[0].upper()}{k[1:]}": v for k, v in eval_accuracy(eval_fn(teacher, val_idx)).items()},
+    }
+    output_names = list(teacher_check["maxAbsDeviation"].keys())
+
+    students: list[dict] = []
+    for spec in specs:
+        student = make_student(spec.hidden_size, spec.num_layers)
+        final_loss = distill_student(
+            student,
+            x,
+            targets,
+            train_idx,
+            device,
+            epochs=int(args.student_epochs),
+            batch_size=int(args.batch_size),
+            lr=float(args.student_lr),
+            temperature=temperature,
+        )
+        accuracy = eval_accuracy(eval_fn(student, val_idx))
+        agreement = teacher_agreement(student, x, targets, val_idx, device, eval_batch_size, output_names)
+        student.cpu()
+        path = export_tools.variant_path(onnx_out, spec.name)
+        export_fn(student, path)
+        check = export_tools.check_onnx_runtime(path, student, sample, batch_sizes=(1,), runs=runs, max_deviation=max_deviation)
+        entry = {
+            "name": spec.name,
+            "file": os.path.basename(path),
+            "meta": os.path.basename(path) + ".meta.json",
+            "hiddenSize": spec.hidden_size,
+            "layers": spec.num_layers,
+            "params": sum(p.numel() for p in student.parameters()),
+            "bytes": check["bytes"],
+            "latencyBatch1": _batch1(check),
+            "parityOk": check["parityOk"],
+            "finalLoss": final_loss,
+            "teacherAgreement": agreement,
+            **{f"val{k[0].upper()}{k[1:]}": v for k, v in accuracy.items()},
+        }
+        export_tools.write_variant_meta(
+            meta_out,
+            path + ".meta.json",
+            # The student's own runtime check; the teacher's checks, variants and manifest are not copied.
+            {"student": {**entry, "teacher": teacher_entry["file"]}, "runtimeCheck": check},
+            training_updates={"hiddenSize": spec.hidden_size, "numLayers": spec.num_layers},
+        )
+        students.append(entry)
+        agreement_text = " ".join(f"agree_{k}={v:.4f}" for k, v in agreement.items())
+        print(
+            f"[{log_prefix}] student={spec.name} params={entry['params']} val_acc={entry['valAcc']:.4f} {agreement_text} "
+            f"p50_ms={entry['latencyBatch1']['p50Ms']:.3f} teacher_p50_ms={teacher_entry['latencyBatch1']['p50Ms']:.3f} "
+            f"parity_ok={str(entry['parityOk']).lower()}",
+            flush=True,
+        )
+
+    min_level = int(args.min_level_for_runtime)
+    budgets = parse_level_budgets(str(args.student_level_budgets or ""))
+    candidates = [teacher_entry] + [one for one in students if one["parityOk"]]
+    manifest = {
+        "schemaVersion": MANIFEST_SCHEMA_VERSION,
+        "budgetBasis": "teacherBatch1P50",
+        "minLevelForRuntime": min_level,
+        "distillation": {
+            "epochs": int(args.student_epochs),
+            "lr": float(args.student_lr),
+            "temperature": temperature,
+            "valSplit": float(args.student_val_split),
+            "valRows": int(val_n),
+            "seed": seed,
+        },
+        "teacher": teacher_entry,
+        "students": students,
+        "levels": assign_levels(candidates, teacher_entry, budgets, min_level),
+    }
+    manifest_out = (args.student_manifest_out or "").strip() or (os.path.splitext(onnx_out)[0] + ".students.json")
+    os.makedirs(os.path.dirname(manifest_out) or ".", exist_ok=True)
+    with open(manifest_out, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    export_tools.update_meta(meta_out, {"studentManifest": os.path.basename(manifest_out)})
+    level_text = " ".join(f"L{level}={one['model'] or '-'}" for level, one in manifest["levels"].items())
+    print(f"[{log_prefix}] student_manifest={manifest_out} {level_text}", flush=True)
+    return manifest
@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+"""Hyperparameter sweep for train_policy_onnx.py with successive halving on val_loss."""
+
+from __future__ import annotations
+
+import argparse
+import concurrent.futures
+import contextlib
+import io
+import itertools
+import json
+import math
+import os
+import random
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+import torch
+import torch.multiprocessing as mp
+
+import evaluate_policy_table
+import onnx_export_tools as export_tools
+import train_policy_onnx as onnx_base
+import train_policy_table as policy_table
+
+LEADERBOARD_SCHEMA_VERSION = "policy_sweep.v1"
+SHARED_MEMORY_DIR = "/dev/shm"
+
+
+@dataclass
+class Trial:
+    trial_id: int
+    hidden_size: int
+    lr: float
+    card_loss_weight: float
+    progress_path: str
+    status: str = "running"
+    rung: int = 0
+    epochs: int = 0
+    val_loss: float | None = None
+    train_acc: float | None = None
+    seconds: float = 0.0
+    history: list[dict] = field(default_factory=list)
+
+    @property
+    def name(self) -> str:
+        return f"trial-{self.trial_id:03d}"
+
+    def to_json(self) -> dict:
+        return {
+            "trial": self.name,
+            "hiddenSize": self.hidden_size,
+            "lr": self.lr,
+            "cardLossWeight": self.card_loss_weight,
+            "status": self.status,
+            "rung": self.rung,
+            "epochs": self.epochs,
+            "valLoss": self.val_loss,
+            "trainAcc": self.train_acc,
+            "seconds": self.seconds,
+            "history": self.history,
+        }
+
+
+def parse_list(raw: str, cast, flag: str) -> list:
+    try:
+        values = [cast(token.strip()) for token in str(raw or "").split(",") if token.strip()]
+    except ValueError as exc:
+        raise ValueError(f"{flag} must be a comma-separated list: {raw!r}") from exc
+    if not values:
+        raise ValueError(f"{flag} must list at least one value")
+    return values
+
+
+def format_loss(value: float | None) -> str:
+    return "-" if value is None else f"{value:.6f}"
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Sweep train_policy_onnx hyperparameters over one shared featurized dataset.")
+    p.add_argument("--input", required=True, help="Path to NDJSON self-play data.")
+    p.add_argument("--out-dir", required=True, help="Folder for the leaderboard and the best model's artifacts.")
+    p.add_argument("--eval-input", default="", help="NDJSON used to score policy tables (default: --input).")
+    p.add_argument(
+        "--dataset-cache",
+        default="",
+        help="Featurized dataset file (.pt); loaded when it exists, written otherwise (default: temp file in shared memory).",
+    )
+    p.add_argument("--dedupe", default="off", help="Featurization dedupe mode passed to train_policy_onnx: off/exact/dihedral (default: off).")
+    p.add_argument("--hidden-sizes", default="128,256", help="Comma-separated --hidden-size values (default: 128,256).")
+    p.add_argument("--lrs", default="0.001,0.0005", help="Comma-separated --lr values (default: 0.001,0.0005).")
+    p.add_argument("--card-loss-weights", default="1.0,2.0", help="Comma-separated --card-loss-weight values (default: 1.0,2.0).")
+    p.add_argument(
+        "--shape-immediates",
+        default="0.25,0.4",
+        help="Comma-separated --shape-immediate values for the policy-table fallback (default: 0.25,0.4).",
+    )
+    p.add_argument("--max-trials", type=int, default=0, help="Sample at most N network configurations from the grid (default: 0=all).")
+    p.add_argument("--min-epochs", type=int, default=1, help="Epochs every trial gets in the first rung (default: 1).")
+    p.add_argument("--max-epochs", type=int, default=9, help="Epochs the surviving trials reach (default: 9).")
+    p.add_argument("--eta", type=int, default=3, help="Keep the best 1/eta trials per rung and grow epochs by eta (default: 3).")
+    p.add_argument("--workers", type=int, default=0, help="Concurrent trial processes (default: CPU count).")
+    p.add_argument("--threads-per-worker", type=int, default=0, help="Torch threads per trial process (default: CPU count / workers).")
+    p.add_argument("--batch-size", type=int, default=512, help="Mini-batch size (default: 512).")
+    p.add_argument("--val-split", type=float, default=0.1, help="Validation split shared by every trial (default: 0.1).")
+    p.add_argument("--seed", type=int, default=7, help="Random seed (default: 7).")
+    p.add_argument("--min-visits", type=int, default=12, help="Policy-table --min-visits (default: 12).")
+    p.add_argument("--compact-table", action="store_true", help="Write the policy table with compact separators and no indentation.")
+    p.add_argument("--eval-batch-size", type=int, default=onnx_base.DEFAULT_EVAL_BATCH_SIZE, help="Evaluation chunk size in rows.")
+    p.add_argument("--leaderboard-out", default="", help="Leaderboard JSON path (default: <out-dir>/sweep.leaderboard.json).")
+    p.add_argument("--keep-trials", action="store_true", help="Keep the progress checkpoints of pruned trials.")
+    return p.parse_args(argv)
+
+
+_WORKER_DATA: onnx_base.DatasetBundle | None = None
+
+
+def _init_worker(dataset_path: str, threads: int) -> None:
+    global _WORKER_DATA
+    torch.set_num_threads(threads)
+    _WORKER_DATA = onnx_base.load_shared_dataset(dataset_path)
+
+
+def _run_trial(trial: dict, epochs: int, common: dict) -> dict:
+    """Train (or continue) one configuration up to `epochs` in a pool worker."""
+    started = time.perf_counter()
+    path = trial["progressPath"]
+    # Trial processes run quietly; the sweep prints one line per finished trial.
+    with contextlib.redirect_stdout(io.StringIO()):
+        _, _, summary, _, metrics = onnx_base.train_model(
+            data=_WORKER_DATA,
+            epochs=epochs,
+            hidden_size=int(trial["hiddenSize"]),
+            lr=float(trial["lr"]),
+            card_loss_weight=float(trial["cardLossWeight"]),
+            resume_checkpoint=path if os.path.exists(path) else "",
+            progress_checkpoint_out=path,
+            **common,
+        )
+    val_losses = [m["valLoss"] for m in metrics if m.get("valLoss") is not None]
+    return {
+        "id": int(trial["id"]),
+        "valLoss": min(val_losses) if val_losses else None,
+        "trainAcc": float(summary.overall_acc),
+        "epochs": int(metrics[-1]["epoch"]) if metrics else epochs,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def add_to_all(aggregators: list[policy_table.PolicyTableAggregator]) -> Callable[[dict], None]:
+    def add(rec: dict) -> None:
+        for aggregator in aggregators:
+            aggregator.add(rec)
+
+    return add
+
+
+def sweep_policy_tables(
+    aggregators: list[policy_table.PolicyTableAggregator],
+    records_path: str,
+    eval_path: str,
+    min_visits: int,
+) -> tuple[list[dict], policy_table.PolicyTableAggregator | None]:
+    """Build one policy table per --shape-immediate aggregator and score it.
+
+    When `records_path` is set the aggregators have not seen the records yet (the
+    dataset came from --dataset-cache) and are fed from it in one streamed pass. Tables
+    are ranked by covered hits per record of `eval_path` (coverage x hit rate); the best
+    table's aggregator is returned so the table can be streamed to disk.
+    """
+    if records_path:
+        add = add_to_all(aggregators)
+        for rec in policy_table.iter_ndjson(records_path):
+            add(rec)
+    results: list[dict] = []
+    best_aggregator: policy_table.PolicyTableAggregator | None = None
+    best_score = -1.0
+    for aggregator in aggregators:
+        shape = aggregator.shape_immediate
+        model = aggregator.build(min_visits)
+        scored = evaluate_policy_table.evaluate(policy_table.iter_ndjson(eval_path), model)
+        score = scored["hit"] / max(1, scored["records"])
+        results.append(
+            {
+                "shapeImmediate": shape,
+                "score": score,
+                "coverageRate": scored["coverageRate"],
+                "hitRateOnCovered": scored["hitRateOnCovered"],
+            }
+        )
+        print(
+            f"[sweep_policy_onnx] policy_table shape_immediate={shape:g} score={score:.4f} "
+            f"coverage={scored['coverageRate']:.3f} hit_rate={scored['hitRateOnCovered']:.3f}",
+            flush=True,
+        )
+        if score > best_score:
+            best_score = score
+            best_aggregator = aggregator
+    results.sort(key=lambda one: -one["score"])
+    return results, best_aggregator
+
+
+def build_trials(args: argparse.Namespace, trial_dir: str) -> list[Trial]:
+    grid = list(
+        itertools.product(
+            parse_list(args.hidden_sizes, int, "--hidden-sizes"),
+            parse_list(args.lrs, float, "--lrs"),
+            parse_list(args.card_loss_weights, float, "--card-loss-weights"),
+        )
+    )
+    if int(args.max_trials) > 0 and len(grid) > int(args.max_trials):
+        grid = random.Random(int(args.seed)).sample(grid, int(args.max_trials))
+    return [
+        Trial(i, hidden, lr, weight, os.path.join(trial_dir, f"trial-{i:03d}.progress.checkpoint.pt"))
+        for i, (hidden, lr, weight) in enumerate(grid)
+    ]
+
+
+def load_or_featurize(
+    args: argparse.Namespace, tmp_dir: str, aggregators: list[policy_table.PolicyTableAggregator]
+) -> tuple[onnx_base.DatasetBundle, str, bool]:
+    """Featurized dataset and its path, plus whether `aggregators` were fed during featurization.
+
+    Featurizing feeds every parsed record to the policy-table aggregators in the same
+    pass; a loaded --dataset-cache leaves them empty.
+    """
+    cache = (args.dataset_cache or "").strip()
+    if cache and os.path.exists(cache):
+        print(f"[sweep_policy_onnx] dataset_cache={cache} (loaded)", flush=True)
+        return onnx_base.load_shared_dataset(cache), cache, False
+    data = onnx_base.load_dataset(
+        args.input, str(args.dedupe or "off").strip().lower(), record_sink=add_to_all(aggregators)
+    )
+    path = cache or os.path.join(tmp_dir, "dataset.pt")
+    if cache:
+        os.makedirs(os.path.dirname(cache) or ".", exist_ok=True)
+    onnx_base.write_shared_dataset(data, path)
+    print(f"[sweep_policy_onnx] dataset_cache={path} rows={int(data.x.shape[0])} (featurized)", flush=True)
+    return onnx_base.load_shared_dataset(path), path, True
+
+
+def validate_args(args: argparse.Namespace) -> None:
+    if int(args.min_epochs) < 1 or int(args.max_epochs) < int(args.min_epochs):
+        raise ValueError("--min-epochs must be >= 1 and <= --max-epochs")
+    if int(args.eta) < 2:
+        raise ValueError("--eta must be >= 2")
+    if not (0.0 < float(args.val_split) < 0.5):
+        raise ValueError("--val-split must be in (0,0.5) for a val_loss sweep")
+    if int(args.workers) < 0 or int(args.threads_per_worker) < 0 or int(args.max_trials) < 0:
+        raise ValueError("--workers, --threads-per-worker and --max-trials must be >= 0")
+    for shape in parse_list(args.shape_immediates, float, "--shape-immediates"):
+        if shape < 0 or shape > 1:
+            raise ValueError("--shape-immediates values must be in [0,1]")
+    if int(args.min_visits) < 1:
+        raise ValueError("--min-visits must be >= 1")
+
+
+def finish_best(
+    args: argparse.Namespace,
+    best: Trial,
+    data: onnx_base.DatasetBundle,
+    common: dict,
+    best_shape: float | None,
+    table_aggregator: policy_table.PolicyTableAggregator | None,
+) -> dict:
+    """Rebuild the winner from its progress checkpoint and write the usual trainer outputs."""
+    onnx_out = os.path.join(args.out_dir, "policy-net.onnx")
+    meta_out = onnx_out + ".meta.json"
+    table_out = os.path.join(args.out_dir, "policy-table.json") if table_aggregator is not None else ""
+    run_args = onnx_base.parse_args(
+        [
+            "--input", args.input,
+            "--onnx-out", onnx_out,
+            "--meta-out", meta_out,
+            "--policy-table-out", table_out,
+            "--checkpoint-out", os.path.join(args.out_dir, "policy-net.checkpoint.pt"),
+            "--metrics-out", os.path.join(args.out_dir, "policy-net.metrics.jsonl"),
+            "--epochs", str(best.epochs),
+            "--batch-size", str(args.batch_size),
+            "--lr", str(best.lr),
+            "--hidden-size", str(best.hidden_size),
+            "--card-loss-weight", str(best.card_loss_weight),
+            "--seed", str(args.seed),
+            "--val-split", str(args.val_split),
+            "--min-visits", str(args.min_visits),
+            "--shape-immediate", str(best_shape if best_shape is not None else 0.0),
+            "--eval-batch-size", str(args.eval_batch_size),
+            "--dedupe", str(args.dedupe or "off"),
+            "--device", "cpu",
+        ]
+    )
+    # The progress checkpoint already holds every epoch, so this only restores the best
+    # weights and runs the final summary evaluation.
+    model, optimizer, summary, resumed_from, metrics = onnx_base.train_model(
+        data=data,
+        epochs=best.epochs,
+        hidden_size=best.hidden_size,
+        lr=best.lr,
+        card_loss_weight=best.card_loss_weight,
+        resume_checkpoint=best.progress_path,
+        **common,
+    )
+    onnx_base.export_onnx(model, onnx_out)
+    onnx_base.write_meta(meta_out, run_args, data, summary, "cpu")
+    onnx_base.maybe_write_metrics(run_args.metrics_out, metrics)
+    onnx_base.maybe_write_checkpoint(
+        checkpoint_out=run_args.checkpoint_out,
+        model=model,
+        optimizer=optimizer,
+        args=run_args,
+        data=data,
+        train_summary=summary,
+        device="cpu",
+        resumed_from=resumed_from,
+    )
+    export_tools.maybe_check_onnx_export(run_args, model, onnx_out, meta_out, data.x, "sweep_policy_onnx")
+    if table_aggregator is not None:
+        policy_table.write_model(table_aggregator.stream(int(args.min_visits)), table_out, bool(args.compact_table))
+    export_tools.update_meta(meta_out, {"sweep": {"trial": best.name, "valLoss": best.val_loss, "epochs": best.epochs}})
+    return {
+        "onnx": os.path.abspath(onnx_out),
+        "meta": os.path.abspath(meta_out),
+        "checkpoint": os.path.abspath(run_args.checkpoint_out),
+        "metrics": os.path.abspath(run_args.metrics_out),
+        "policyTable": os.path.abspath(table_out) if table_out else None,
+        "trainAcc": float(summary.overall_acc),
+    }
+
+
+def main() -> int:
+    args = parse_args()
+    validate_args(args)
+    os.makedirs(args.out_dir, exist_ok=True)
+    trial_dir = os.path.join(args.out_dir, "trials")
+    os.makedirs(trial_dir, exist_ok=True)
+    trials = build_trials(args, trial_dir)
+    by_id = {trial.trial_id: trial for trial in trials}
+    workers = int(args.workers) or max(1, min(len(trials), os.cpu_count() or 1))
+    threads = int(args.threads_per_worker) or max(1, (os.cpu_count() or 1) // workers)
+    common = dict(
+        batch_size=int(args.batch_size),
+        device="cpu",
+        seed=int(args.seed),
+        val_split=float(args.val_split),
+        eval_batch_size=int(args.eval_batch_size),
+    )
+    started = time.perf_counter()
+    shm_dir = SHARED_MEMORY_DIR if os.path.isdir(SHARED_MEMORY_DIR) else None
+    with tempfile.TemporaryDirectory(prefix="sweep_policy_onnx_", dir=shm_dir) as tmp_dir:
+        aggregators = [
+            policy_table.PolicyTableAggregator(shape)
+            for shape in parse_list(args.shape_immediates, float, "--shape-immediates")
+        ]
+        data, dataset_path, aggregated = load_or_featurize(args, tmp_dir, aggregators)
+        print(
+            f"[sweep_policy_onnx] trials={len(trials)} workers={workers} threads_per_worker={threads} "
+            f"epochs={args.min_epochs}..{args.max_epochs} eta={args.eta}",
+            flush=True,
+        )
+
+        table_results: list[dict] = []
+        table_aggregator: policy_table.PolicyTableAggregator | None = None
+        active = list(trials)
+        budget = int(args.min_epochs)
+        rung = 0
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=mp.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(dataset_path, threads),
+        ) as pool:
+            while True:
+                futures = [
+                    pool.submit(
+                        _run_trial,
+                        {
+                            "id": t.trial_id,
+                            "hiddenSize": t.hidden_size,
+                            "lr": t.lr,
+                            "cardLossWeight": t.card_loss_weight,
+                            "progressPath": t.progress_path,
+                        },
+                        budget,
+                        common,
+                    )
+                    for t in active
+                ]
+                if rung == 0:
+                    # Policy tables are built in this process while the first rung trains.
+                    table_results, table_aggregator = sweep_policy_tables(
+                        aggregators,
+                        "" if aggregated else args.input,
+                        (args.eval_input or "").strip() or args.input,
+                        int(args.min_visits),
+                    )
+                    del aggregators
+                for future in concurrent.futures.as_completed(futures):
+                    result = future.result()
+                    trial = by_id[result["id"]]
+                    trial.rung, trial.epochs = rung, result["epochs"]
+                    trial.val_loss, trial.train_acc = result["valLoss"], result["trainAcc"]
+                    trial.seconds += result["seconds"]
+                    trial.history.append({"rung": rung, "epochs": result["epochs"], "valLoss": result["valLoss"]})
+                    print(
+                        f"[sweep_policy_onnx] rung={rung} {trial.name} hidden={trial.hidden_size} lr={trial.lr:g} "
+                        f"card_w={trial.card_loss_weight:g} epochs={trial.epochs} val_loss={format_loss(trial.val_loss)}",
+                        flush=True,
+                    )
+                active.sort(key=lambda t: t.val_loss if t.val_loss is not None else math.inf)
+                if budget >= int(args.max_epochs):
+                    break
+                keep = max(1, len(active) // int(args.eta))
+                for trial in active[keep:]:
+                    trial.status = f"pruned@rung{rung}"
+                active = active[:keep]
+                # A single survivor goes straight to the full budget.
+                budget = int(args.max_epochs) if keep == 1 else min(int(args.max_epochs), budget * int(args.eta))
+                rung += 1
+
+        for trial in active:
+            trial.status = "finalist"
+        best = active[0]
+        best.status = "best"
+        best_shape = table_results[0]["shapeImmediate"] if table_results else None
+        artifacts = finish_best(args, best, data, common, best_shape, table_aggregator)
+        del data
+
+    if not args.keep_trials:
+        for trial in trials:
+            if trial is not best and os.path.exists(trial.progress_path):
+                os.remove(trial.progress_path)
+    if not os.listdir(trial_dir):
+        shutil.rmtree(trial_dir)
+
+    leaderboard = {
+        "schemaVersion": LEADERBOARD_SCHEMA_VERSION,
+        "input": os.path.abspath(args.input),
+        "evalInput": os.path.abspath(args.eval_input) if (args.eval_input or "").strip() else None,
+        "halving": {"minEpochs": int(args.min_epochs), "maxEpochs": int(args.max_epochs), "eta": int(args.eta), "rungs": rung + 1},
+        "workers": workers,
+        "threadsPerWorker": threads,
+        "seconds": time.perf_counter() - started,
+        "best": {**best.to_json(), "shapeImmediate": best_shape, "artifacts": artifacts},
+        "trials": [t.to_json() for t in sorted(trials, key=lambda t: (-t.rung, t.val_loss if t.val_loss is not None else math.inf))],
+        "policyTables": table_results,
+    }
+    leaderboard_out = (args.leaderboard_out or "").strip() or os.path.join(args.out_dir, "sweep.leaderboard.json")
+    with open(leaderboard_out, "w", encoding="utf-8") as f:
+        json.dump(leaderboard, f, ensure_ascii=False, indent=2)
+    print(
+        f"[sweep_policy_onnx] best={best.name} hidden={best.hidden_size} lr={best.lr:g} card_w={best.card_loss_weight:g} "
+        f"shape_immediate={best_shape} val_loss={format_loss(best.val_loss)} leaderboard={leaderboard_out} onnx={artifacts['onnx']}",
+        flush=True,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -7,13 +7,16 @@ import argparse
 import json
 import os
 import random
-from dataclasses import dataclass
-from typing import Dict
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterator
 
 import torch
 from torch import nn
 from torch.nn import functional as F
 
+import onnx_export_tools as export_tools
+import student_distill
 import train_policy_onnx as onnx_base
 import train_policy_table as policy_table
 
@@ -21,6 +24,25 @@ import train_policy_table as policy_table
 MODEL_SCHEMA_VERSION = "policy_onnx.v1"
 POLICY_TABLE_SCHEMA_VERSION = "policy_table.v2"
 IGNORE_INDEX = -100
+# Schedule reserve per enabled export-time runtime check, variant or quantize stage.
+POST_EXPORT_CHECK_SECONDS = 30.0
+ACTIVE_CONFIG_PATH = os.path.join("data", "deepcfr", "deepcfr_config.active.yaml")
+# (yaml path, argparse dest, cast). Explicit CLI flags always win over config values.
+# deep_cfr.policy.epochs_per_iteration is not mapped: distillation runs once after all
+# CFR+ iterations, so it has no per-iteration epoch count.
+CONFIG_ARG_MAP = (
+    (("run", "seed"), "seed", int),
+    (("run", "max_hours"), "max_hours", float),
+    (("run", "iterations"), "cfr_iterations", int),
+    (("cfr_plus", "regret_floor"), "cfr_regret_floor", float),
+    (("cfr_plus", "strategy_decay"), "cfr_strategy_decay", float),
+    (("deep_cfr", "policy", "hidden_size"), "hidden_size", int),
+    (("deep_cfr", "policy", "batch_size"), "batch_size", int),
+    (("deep_cfr", "policy", "learning_rate"), "lr", float),
+    (("distill", "onnx_out"), "onnx_out", str),
+    (("distill", "meta_out"), "meta_out", str),
+    (("distill", "min_level_for_runtime"), "min_level_for_runtime", int),
+)
 INVERSE_TRANSFORM_ID = {
     0: 0,
     1: 3,
@@ -78,10 +100,121 @@ class DistillSummary:
     card_acc: float | None
     place_samples: int
     card_samples: int
+    compile: dict | None = None
+    precision: dict | None = None
 
 
-def parse_args() -> argparse.Namespace:
+@dataclass
+class RunScheduler:
+    """Wall-clock budget split across CFR+ iterations, distillation epochs and export.
+
+    Stage throughput is measured as the run progresses; a stage unit (one CFR+ iteration,
+    one epoch) is only started when its measured cost still fits before the deadline,
+    leaving room for export so the run ends with usable artifacts instead of being killed.
+    """
+
+    max_seconds: float
+    cfr_time_share: float = 0.3
+    post_export_checks: int = 0
+    student_epochs: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+    stage_started_at: dict = field(default_factory=dict)
+    stage_seconds: dict = field(default_factory=dict)
+    stage_units: dict = field(default_factory=dict)
+    stops: dict = field(default_factory=dict)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_seconds > 0
+
+    @property
+    def safety_margin(self) -> float:
+        return min(300.0, self.max_seconds * 0.02)
+
+    @property
+    def deadline(self) -> float:
+        return self.started_at + self.max_seconds - self.safety_margin
+
+    def begin(self, stage: str) -> None:
+        self.stage_started_at[stage] = time.monotonic()
+
+    def record(self, stage: str, seconds: float, units: int = 1) -> None:
+        self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + float(seconds)
+        self.stage_units[stage] = self.stage_units.get(stage, 0) + int(units)
+
+    def unit_seconds(self, stage: str) -> float | None:
+        units = self.stage_units.get(stage, 0)
+        if units <= 0:
+            return None
+        return self.stage_seconds.get(stage, 0.0) / float(units)
+
+    def export_reserve(self) -> float:
+        # Building and writing the policy table costs a few passes over the infosets,
+        # which is what one CFR+ iteration measures.
+        reserve = max(60.0, self.max_seconds * 0.02)
+        cfr_unit = self.unit_seconds("cfr")
+        if cfr_unit is not None:
+            reserve = max(reserve, cfr_unit * 3.0)
+        # Runtime check, variants and quantization run a few hundred small onnxruntime
+        # sessions each; a student epoch costs at most one (larger) distillation epoch.
+        reserve += self.post_export_checks * POST_EXPORT_CHECK_SECONDS
+        epoch_unit = self.unit_seconds("epoch")
+        if epoch_unit is not None:
+            reserve += epoch_unit * self.student_epochs
+        return reserve
+
+    def _stop(self, stage: str, reason: str) -> bool:
+        self.stops.setdefault(stage, reason)
+        return False
+
+    def allow_cfr_iteration(self) -> bool:
+        if not self.enabled or self.stage_units.get("cfr", 0) <= 0:
+            return True
+        stage_start = self.stage_started_at.get("cfr", self.started_at)
+        budget = (self.deadline - self.export_reserve() - stage_start) * self.cfr_time_share
+        if time.monotonic() + (self.unit_seconds("cfr") or 0.0) > stage_start + budget:
+            return self._stop("cfr", "cfr_time_share")
+        return True
+
+    def allow_seconds(self, seconds: float) -> bool:
+        """Whether `seconds` of extra work still ends before the deadline and the export reserve."""
+        if not self.enabled:
+            return True
+        return time.monotonic() + seconds <= self.deadline - self.export_reserve()
+
+    def allow_post_export(self, stage: str, seconds: float = 0.0) -> bool:
+        """Whether an optional post-export stage estimated at `seconds` still ends before the deadline."""
+        if not self.enabled or time.monotonic() + seconds <= self.deadline:
+            return True
+        return self._stop(stage, "deadline")
+
+    def allow_epoch(self) -> bool:
+        if not self.enabled or self.stage_units.get("epoch", 0) <= 0:
+            return True
+        if time.monotonic() + (self.unit_seconds("epoch") or 0.0) > self.deadline - self.export_reserve():
+            return self._stop("epoch", "deadline")
+        return True
+
+    def report(self) -> dict:
+        elapsed = time.monotonic() - self.started_at
+        return {
+            "maxHours": self.max_seconds / 3600.0 if self.enabled else None,
+            "cfrTimeShare": float(self.cfr_time_share),
+            "elapsedSeconds": elapsed,
+            "remainingSeconds": (self.started_at + self.max_seconds - time.monotonic()) if self.enabled else None,
+            "stageSeconds": dict(self.stage_seconds),
+            "stageUnits": dict(self.stage_units),
+            "stops": dict(self.stops),
+        }
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(description="Train DeepCFR/CFR+ distilled ONNX model from self-play NDJSON.")
+    p.add_argument(
+        "--config",
+        default="",
+        help=f"DeepCFR YAML config, e.g. {ACTIVE_CONFIG_PATH}; explicit flags override it (default: off).",
+    )
     p.add_argument("--input", required=True, help="Path to NDJSON self-play data.")
     p.add_argument("--onnx-out", default=os.path.join("data", "models", "policy-net.onnx"), help="Output ONNX path.")
     p.add_argument("--meta-out", default=None, help="Output metadata JSON path (default: <onnx-out>.meta.json).")
@@ -106,9 +239,78 @@ def parse_args() -> argparse.Namespace:
     p.add_argument("--checkpoint-out", default="", help="Optional checkpoint output path (.pt).")
     p.add_argument("--device", default="auto", help="Device: auto/cpu/cuda (default: auto).")
     p.add_argument("--card-loss-weight", type=float, default=2.0, help="Loss weight for card action head (default: 2.0).")
+    p.add_argument("--eval-batch-size", type=int, default=onnx_base.DEFAULT_EVAL_BATCH_SIZE, help=f"Rows per forward pass in validation and final accuracy evaluation (default: {onnx_base.DEFAULT_EVAL_BATCH_SIZE}).")
+    p.add_argument("--batch-pipeline", default="prefetch", help="Mini-batch pipeline: prefetch (background gather) or copy (permuted epoch copy) (default: prefetch).")
+    p.add_argument("--profile-steps", action="store_true", help="Record per-epoch timing histograms of hot-loop phases in --metrics-out.")
+    p.add_argument("--compile", default="off", help="Compile the training step: off/auto/inductor/trace; auto falls back to eager (default: off).")
+    p.add_argument("--precision", default="fp32", help="Training precision: fp32 or bf16 autocast with fp32 master weights; ONNX export stays fp32 (default: fp32).")
+    p.add_argument("--precision-ref-epochs", type=int, default=1, help="Epochs of the short fp32 reference run a non-fp32 --precision is compared against for accuracy (default: 1; 0=skip).")
     p.add_argument("--min-visits", type=int, default=12, help="Minimum visits per state to keep in policy-table output.")
+    p.add_argument("--compact-table", action="store_true", help="Write the policy table with compact separators and no indentation.")
     p.add_argument("--shape-immediate", type=float, default=0.25, help="Blend ratio [0..1] of immediate disc-diff delta into utility target.")
-    return p.parse_args()
+    p.add_argument("--max-hours", type=float, default=0.0, help="Wall-clock budget for the whole run; stages are cut to finish before it (default: 0=unlimited).")
+    p.add_argument("--cfr-time-share", type=float, default=0.3, help="Max share of the time budget spent on CFR+ iterations, in (0,1] (default: 0.3).")
+    export_tools.add_onnx_check_args(p)
+    export_tools.add_export_variant_args(p)
+    export_tools.add_quantize_args(p)
+    student_distill.add_student_args(p)
+    return p
+
+
+def load_config_file(path: str) -> dict:
+    try:
+        import yaml
+    except ImportError as exc:
+        raise ValueError(f"PyYAML is required to read --config: {path}") from exc
+    with open(path, "r", encoding="utf-8") as f:
+        payload = yaml.safe_load(f)
+    if payload is None:
+        return {}
+    if not isinstance(payload, dict):
+        raise ValueError(f"invalid config format: {path}")
+    return payload
+
+
+def apply_config(args: argparse.Namespace, config: dict, explicit: set[str]) -> list[str]:
+    # Both stages always run here; a config that turns one off is rejected, not ignored.
+    for section in ("cfr_plus", "deep_cfr"):
+        node = config.get(section)
+        if isinstance(node, dict) and node.get("enabled", True) is not True:
+            raise ValueError(f"config {section}.enabled must be true for train_deepcfr_onnx.py: {node.get('enabled')!r}")
+    applied: list[str] = []
+    for keys, dest, cast in CONFIG_ARG_MAP:
+        if dest in explicit:
+            continue
+        node = config
+        for key in keys:
+            node = node.get(key) if isinstance(node, dict) else None
+        if node is None:
+            continue
+        try:
+            setattr(args, dest, cast(node))
+        except (TypeError, ValueError) as exc:
+            raise ValueError(f"invalid config value for {'.'.join(keys)}: {node!r}") from exc
+        applied.append(dest)
+    return applied
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    p = build_arg_parser()
+    args = p.parse_args(argv)
+
+    # Re-parse into a namespace pre-filled with a marker: argparse only fills defaults for
+    # missing attributes, so every attribute that changed was given on the command line.
+    unset = object()
+    probe = p.parse_args(argv, namespace=argparse.Namespace(**{dest: unset for dest in vars(args)}))
+    explicit = {dest for dest, value in vars(probe).items() if value is not unset}
+
+    args.config_applied = []
+    args.config = (args.config or "").strip()
+    if args.config:
+        if not os.path.exists(args.config):
+            raise ValueError(f"config not found: {args.config}")
+        args.config_applied = apply_config(args, load_config_file(args.config), explicit)
+    return args
 
 
 def is_supported_action(rec: dict) -> bool:
@@ -148,7 +350,13 @@ def transform_place_to_original(row: int, col: int, transform_id: int) -> tuple[
     return int(rr), int(cc)
 
 
-def run_cfr_plus(infosets: Dict[str, Dict[str, ActionAggregate]], iterations: int, regret_floor: float, strategy_decay: float) -> dict:
+def run_cfr_plus(
+    infosets: Dict[str, Dict[str, ActionAggregate]],
+    iterations: int,
+    regret_floor: float,
+    strategy_decay: float,
+    scheduler: RunScheduler | None = None,
+) -> dict:
     if iterations < 1:
         raise ValueError("--cfr-iterations must be >= 1")
     if strategy_decay <= 0 or strategy_decay > 1:
@@ -156,7 +364,12 @@ def run_cfr_plus(infosets: Dict[str, Dict[str, ActionAggregate]], iterations: in
     if len(infosets) <= 0:
         raise ValueError("no infosets available for CFR+")
 
+    if scheduler is not None:
+        scheduler.begin("cfr")
     for _ in range(iterations):
+        if scheduler is not None and not scheduler.allow_cfr_iteration():
+            break
+        iteration_started = time.perf_counter()
         for action_map in infosets.values():
             actions = list(action_map.keys())
             if len(actions) <= 0:
@@ -186,6 +399,8 @@ def run_cfr_plus(infosets: Dict[str, Dict[str, ActionAggregate]], iterations: in
                 instant_regret = agg.avg_utility - expected_utility
                 agg.regret = max(regret_floor, agg.regret + instant_regret)
                 agg.avg_strategy_mass = (agg.avg_strategy_mass * strategy_decay) + strategy[action_key]
+        if scheduler is not None:
+            scheduler.record("cfr", time.perf_counter() - iteration_started)
 
     final_policy: dict[str, dict[str, float]] = {}
     for infoset_key, action_map in infosets.items():
@@ -366,21 +581,77 @@ def build_distill_dataset(samples: list[DistillSample], final_policy: dict[str,
     )
 
 
-def _soft_accuracy(logits: torch.Tensor, target_prob: torch.Tensor) -> tuple[int, int]:
-    if logits.numel() <= 0 or target_prob.numel() <= 0:
-        return 0, 0
+def _soft_accuracy_counts(logits: torch.Tensor, target_prob: torch.Tensor, mask: torch.Tensor) -> tuple[torch.Tensor, torch.Tensor]:
+    # Device-side (correct, samples) counts over masked rows; reading them is left to the caller.
     target_idx = torch.argmax(target_prob, dim=1)
     pred_idx = torch.argmax(logits, dim=1)
-    samples = int(target_idx.shape[0])
-    if samples <= 0:
-        return 0, 0
-    correct = int((pred_idx == target_idx).sum().item())
-    return correct, samples
+    correct = ((pred_idx == target_idx) & mask).sum()
+    return correct, mask.sum()
 
 
-def _kl_loss(logits: torch.Tensor, target_prob: torch.Tensor) -> torch.Tensor:
+def _masked_kl_sum(logits: torch.Tensor, target_prob: torch.Tensor, mask: torch.Tensor) -> tuple[torch.Tensor, torch.Tensor]:
+    # (KL sum, row count) over masked rows without boolean indexing or a host branch.
     logp = F.log_softmax(logits, dim=1)
-    return F.kl_div(logp, target_prob, reduction="batchmean")
+    per_row = F.kl_div(logp, target_prob, reduction="none").sum(dim=1)
+    weights = mask.to(per_row.dtype)
+    return (per_row * weights).sum(), weights.sum()
+
+
+def _masked_kl_loss(logits: torch.Tensor, target_prob: torch.Tensor, mask: torch.Tensor) -> torch.Tensor:
+    # Batch-mean KL over masked rows (0 when none are set).
+    total, count = _masked_kl_sum(logits, target_prob, mask)
+    return total / count.clamp(min=1.0)
+
+
+def evaluate_distillation(
+    model: nn.Module,
+    tensors: list[torch.Tensor],
+    device: str,
+    eval_batch_size: int,
+    idx: torch.Tensor | None = None,
+    card_loss_weight: float = 1.0,
+) -> onnx_base.EvalResult:
+    """Chunked masked-KL loss and soft accuracy over (x, place, card, place_mask, card_mask).
+
+    Per-head KL sums and row counts are accumulated across chunks and divided once, so
+    the loss matches a single full-batch `_masked_kl_loss` per head.
+    """
+    zero_f = torch.zeros((), dtype=torch.float64, device=device)
+    zero_l = torch.zeros((), dtype=torch.long, device=device)
+    place_kl, place_rows, card_kl, card_rows = zero_f.clone(), zero_f.clone(), zero_f.clone(), zero_f.clone()
+    place_correct, place_samples = zero_l.clone(), zero_l.clone()
+    card_correct, card_samples = zero_l.clone(), zero_l.clone()
+    has_card_head = False
+    with torch.no_grad():
+        for xb, pb, cb, pmb, cmb in onnx_base.iter_eval_chunks(tensors, eval_batch_size, idx, device):
+            place_logits, card_logits = onnx_base._split_outputs(model(xb))
+            kl_sum, rows = _masked_kl_sum(place_logits, pb, pmb)
+            place_kl += kl_sum
+            place_rows += rows
+            correct, samples = _soft_accuracy_counts(place_logits, pb, pmb)
+            place_correct += correct
+            place_samples += samples
+            if card_logits is not None and onnx_base.CARD_ACTION_DIM > 0:
+                has_card_head = True
+                kl_sum, rows = _masked_kl_sum(card_logits, cb, cmb)
+                card_kl += kl_sum
+                card_rows += rows
+                correct, samples = _soft_accuracy_counts(card_logits, cb, cmb)
+                card_correct += correct
+                card_samples += samples
+    place_kl_n, place_rows_n, card_kl_n, card_rows_n, place_correct_n, place_samples_n, card_correct_n, card_samples_n = (
+        onnx_base._read_counters(place_kl, place_rows, card_kl, card_rows, place_correct, place_samples, card_correct, card_samples)
+    )
+    loss = place_kl_n / max(1.0, place_rows_n)
+    if has_card_head:
+        loss += (card_kl_n / max(1.0, card_rows_n)) * card_loss_weight
+    return onnx_base.EvalResult(
+        loss=loss,
+        place_correct=int(place_correct_n),
+        place_samples=int(place_samples_n),
+        card_correct=int(card_correct_n),
+        card_samples=int(card_samples_n),
+    )
 
 
 def train_distillation(
@@ -398,6 +669,13 @@ def train_distillation(
     resume_checkpoint: str,
     log_interval_steps: int,
     card_loss_weight: float,
+    scheduler: RunScheduler | None = None,
+    batch_pipeline: str = "prefetch",
+    profile_steps: bool = False,
+    compile_mode: str = "off",
+    precision: str = "fp32",
+    precision_ref_epochs: int = 1,
+    eval_batch_size: int = onnx_base.DEFAULT_EVAL_BATCH_SIZE,
 ) -> tuple[nn.Module, torch.optim.Optimizer, DistillSummary, str | None, list[dict]]:
     if epochs < 1:
         raise ValueError("--epochs must be >= 1")
@@ -417,9 +695,19 @@ def train_distillation(
         raise ValueError("--log-interval-steps must be >= 0")
     if card_loss_weight <= 0:
         raise ValueError("--card-loss-weight must be > 0")
+    if eval_batch_size < 1:
+        raise ValueError("--eval-batch-size must be >= 1")
+    if precision_ref_epochs < 0:
+        raise ValueError("--precision-ref-epochs must be >= 0")
     monitor = str(early_stop_monitor or "").strip().lower()
     if monitor not in ("val_loss", "train_loss"):
         raise ValueError("--early-stop-monitor must be val_loss or train_loss")
+    if batch_pipeline not in onnx_base.BATCH_PIPELINES:
+        raise ValueError(f"--batch-pipeline must be one of: {', '.join(onnx_base.BATCH_PIPELINES)}")
+    if compile_mode not in onnx_base.COMPILE_MODES:
+        raise ValueError(f"--compile must be one of: {', '.join(onnx_base.COMPILE_MODES)}")
+    if precision not in onnx_base.PRECISION_MODES:
+        raise ValueError(f"--precision must be one of: {', '.join(onnx_base.PRECISION_MODES)}")
 
     torch.manual_seed(seed)
     if device == "cuda":
@@ -464,24 +752,48 @@ def train_distillation(
     else:
         val_idx = torch.empty((0,), dtype=torch.long, device=device)
         train_idx = all_perm
+    # Rows without any target would form all-masked batches: a zero loss on which Adam
+    # momentum still moves the weights. Dropping them once keeps every batch non-empty
+    # without a per-batch host sync, and keeps them out of the epoch loss average.
+    has_target = place_mask[train_idx]
+    if onnx_base.CARD_ACTION_DIM > 0:
+        has_target = has_target | card_mask[train_idx]
+    train_idx = train_idx[has_target]
     if int(train_idx.shape[0]) <= 0:
-        raise ValueError("training split became empty; reduce --val-split")
-
-    def select_rows(t: torch.Tensor, idx: torch.Tensor) -> torch.Tensor:
-        return t[idx] if idx.numel() > 0 else t.new_zeros((0,) + t.shape[1:])
-
-    x_train = x[train_idx]
-    p_train = place_target[train_idx]
-    c_train = card_target[train_idx]
-    pm_train = place_mask[train_idx]
-    cm_train = card_mask[train_idx]
-    x_val = select_rows(x, val_idx)
-    p_val = select_rows(place_target, val_idx)
-    c_val = select_rows(card_target, val_idx)
-    pm_val = place_mask[val_idx] if val_idx.numel() > 0 else place_mask.new_zeros((0,))
-    cm_val = card_mask[val_idx] if val_idx.numel() > 0 else card_mask.new_zeros((0,))
-
-    train_n = int(x_train.shape[0])
+        raise ValueError("training split has no rows with targets; reduce --val-split")
+
+    if batch_pipeline == "prefetch" and device != "cpu":
+        # Keep the training split on the host; batches are staged to the device by the prefetcher.
+        train_idx_host = train_idx.cpu()
+        x_train = data.x[train_idx_host]
+        p_train = data.place_target[train_idx_host]
+        c_train = data.card_target[train_idx_host]
+        pm_train = data.place_mask[train_idx_host]
+        cm_train = data.card_mask[train_idx_host]
+    else:
+        x_train = x[train_idx]
+        p_train = place_target[train_idx]
+        c_train = card_target[train_idx]
+        pm_train = place_mask[train_idx]
+        cm_train = card_mask[train_idx]
+    eval_tensors = [x, place_target, card_target, place_mask, card_mask]
+
+    example_batch = x_train[:batch_size].to(device)
+    runner, compile_info = onnx_base.compile_policy_model(model, compile_mode, example_batch, precision)
+    if compile_info is not None:
+        print(
+            f"[train_deepcfr_onnx] compile={compile_info['backend']} requested={compile_mode} "
+            f"eager_step_ms={compile_info['eagerStepMs']:.3f} compiled_step_ms={compile_info['compiledStepMs']:.3f}",
+            flush=True,
+        )
+    precision_info = onnx_base.benchmark_precision(runner, model, example_batch, precision)
+    if precision_info is not None:
+        print(
+            f"[train_deepcfr_onnx] precision={precision} fp32_step_ms={precision_info['fp32StepMs']:.3f} "
+            f"step_ms={precision_info['stepMs']:.3f}",
+            flush=True,
+        )
+
     global_step = 0
     best_monitor = float("inf")
     best_epoch = 0
@@ -489,108 +801,103 @@ def train_distillation(
     stopped_early = False
     early_stop_epoch = None
     best_state: dict | None = None
+    stopped_by_deadline = False
     epoch_metrics: list[dict] = []
+    timer = onnx_base.StepTimer(enabled=profile_steps, device=device)
 
+    if scheduler is not None:
+        scheduler.begin("epoch")
     for epoch_index in range(epochs):
-        perm = torch.randperm(train_n, device=device)
-        xb = x_train[perm]
-        pb = p_train[perm]
-        cb = c_train[perm]
-        pmb = pm_train[perm]
-        cmb = cm_train[perm]
-
-        epoch_loss_sum = 0.0
+        if scheduler is not None and not scheduler.allow_epoch():
+            stopped_by_deadline = True
+            print(
+                f"[train_deepcfr_onnx] time budget reached before epoch={epoch_index + 1}/{epochs} "
+                f"avg_epoch_sec={scheduler.unit_seconds('epoch') or 0.0:.1f}",
+                flush=True,
+            )
+            break
+        epoch_started = time.perf_counter()
+        timer.reset()
+        # Accumulated on the training device and read back once per epoch.
+        epoch_loss_sum = torch.zeros((), dtype=torch.float64, device=device)
+        epoch_place_correct = torch.zeros((), dtype=torch.long, device=device)
+        epoch_place_samples = torch.zeros((), dtype=torch.long, device=device)
+        epoch_card_correct = torch.zeros((), dtype=torch.long, device=device)
+        epoch_card_samples = torch.zeros((), dtype=torch.long, device=device)
         epoch_samples = 0
-        epoch_place_correct = 0
-        epoch_place_samples = 0
-        epoch_card_correct = 0
-        epoch_card_samples = 0
-
-        for start in range(0, train_n, batch_size):
-            end = start + batch_size
-            x_batch = xb[start:end]
-            p_batch = pb[start:end]
-            c_batch = cb[start:end]
-            pm_batch = pmb[start:end]
-            cm_batch = cmb[start:end]
-
-            outputs = model(x_batch)
-            place_logits, card_logits = onnx_base._split_outputs(outputs)
+        use_card_head = onnx_base.CARD_ACTION_DIM > 0
 
-            losses = []
-            if int(pm_batch.sum().item()) > 0:
-                losses.append(_kl_loss(place_logits[pm_batch], p_batch[pm_batch]))
-                with torch.no_grad():
-                    correct, samples = _soft_accuracy(place_logits[pm_batch], p_batch[pm_batch])
-                    epoch_place_correct += correct
-                    epoch_place_samples += samples
-            if card_logits is not None and onnx_base.CARD_ACTION_DIM > 0 and int(cm_batch.sum().item()) > 0:
-                losses.append(_kl_loss(card_logits[cm_batch], c_batch[cm_batch]) * card_loss_weight)
-                with torch.no_grad():
-                    correct, samples = _soft_accuracy(card_logits[cm_batch], c_batch[cm_batch])
+        batches = onnx_base.iter_minibatches([x_train, p_train, c_train, pm_train, cm_train], batch_size, device, batch_pipeline)
+        for x_batch, p_batch, c_batch, pm_batch, cm_batch in batches:
+            timer.lap("gather")
+            with onnx_base.autocast_context(device, precision):
+                outputs = runner(x_batch)
+            place_logits, card_logits = onnx_base._split_outputs(outputs)
+            # Losses are taken in fp32 even when the forward pass ran under bf16 autocast.
+            place_logits = place_logits.float()
+            card_logits = card_logits.float() if card_logits is not None else None
+            timer.lap("forward")
+
+            loss = _masked_kl_loss(place_logits, p_batch, pm_batch)
+            if card_logits is not None and use_card_head:
+                loss = loss + (_masked_kl_loss(card_logits, c_batch, cm_batch) * card_loss_weight)
+            with torch.no_grad():
+                correct, samples = _soft_accuracy_counts(place_logits, p_batch, pm_batch)
+                epoch_place_correct += correct
+                epoch_place_samples += samples
+                if card_logits is not None and use_card_head:
+                    correct, samples = _soft_accuracy_counts(card_logits, c_batch, cm_batch)
                     epoch_card_correct += correct
                     epoch_card_samples += samples
-            if len(losses) <= 0:
-                continue
-
-            loss = losses[0]
-            for extra in losses[1:]:
-                loss = loss + extra
+            timer.lap("loss")
 
             opt.zero_grad(set_to_none=True)
             loss.backward()
+            timer.lap("backward")
             opt.step()
+            timer.lap("optimizer")
 
             global_step += 1
             batch_size_now = int(x_batch.shape[0])
             epoch_samples += batch_size_now
-            epoch_loss_sum += float(loss.item()) * batch_size_now
+            epoch_loss_sum += loss.detach() * batch_size_now
+            timer.lap("metrics")
 
             if log_interval_steps > 0 and (global_step % log_interval_steps) == 0:
+                timer.count_sync()
                 print(f"[train_deepcfr_onnx] step={global_step} epoch={epoch_index + 1}/{epochs} loss={float(loss.item()):.6f}", flush=True)
-
-        train_loss = epoch_loss_sum / max(1, epoch_samples)
-        train_place_acc = epoch_place_correct / max(1, epoch_place_samples)
+                timer.lap("log")
+        loss_sum, place_correct_n, place_samples_n, card_correct_n, card_samples_n = onnx_base._read_counters(
+            epoch_loss_sum, epoch_place_correct, epoch_place_samples, epoch_card_correct, epoch_card_samples
+        )
+        timer.count_sync()
+        train_loop_seconds = time.perf_counter() - epoch_started
+
+        train_loss = loss_sum / max(1, epoch_samples)
+        train_place_acc = place_correct_n / max(1, place_samples_n)
         train_card_acc = None
-        if epoch_card_samples > 0:
-            train_card_acc = epoch_card_correct / epoch_card_samples
-        train_total_samples = epoch_place_samples + epoch_card_samples
-        train_total_correct = epoch_place_correct + epoch_card_correct
+        if card_samples_n > 0:
+            train_card_acc = card_correct_n / card_samples_n
+        train_total_samples = place_samples_n + card_samples_n
+        train_total_correct = place_correct_n + card_correct_n
         train_acc = train_total_correct / max(1, train_total_samples)
 
         val_loss = None
         val_acc = None
         val_place_acc = None
         val_card_acc = None
-        if int(x_val.shape[0]) > 0:
-            with torch.no_grad():
-                outputs_val = model(x_val)
-                place_logits_val, card_logits_val = onnx_base._split_outputs(outputs_val)
-                val_losses = []
-                val_place_correct = 0
-                val_place_samples = 0
-                val_card_correct = 0
-                val_card_samples = 0
-
-                if int(pm_val.sum().item()) > 0:
-                    val_losses.append(_kl_loss(place_logits_val[pm_val], p_val[pm_val]))
-                    val_place_correct, val_place_samples = _soft_accuracy(place_logits_val[pm_val], p_val[pm_val])
-                if card_logits_val is not None and onnx_base.CARD_ACTION_DIM > 0 and int(cm_val.sum().item()) > 0:
-                    val_losses.append(_kl_loss(card_logits_val[cm_val], c_val[cm_val]) * card_loss_weight)
-                    val_card_correct, val_card_samples = _soft_accuracy(card_logits_val[cm_val], c_val[cm_val])
-
-                if len(val_losses) > 0:
-                    total_val_loss = val_losses[0]
-                    for extra in val_losses[1:]:
-                        total_val_loss = total_val_loss + extra
-                    val_loss = float(total_val_loss.item())
-
-                    val_place_acc = val_place_correct / max(1, val_place_samples)
-                    if val_card_samples > 0:
-                        val_card_acc = val_card_correct / val_card_samples
-                    total_val_samples = val_place_samples + val_card_samples
-                    total_val_correct = val_place_correct + val_card_correct
-                    val_acc = total_val_correct / max(1, total_val_samples)
+        if int(val_idx.shape[0]) > 0:
+            val_result = evaluate_distillation(
+                model, eval_tensors, device, eval_batch_size, idx=val_idx, card_loss_weight=card_loss_weight
+            )
+            total_val_samples = val_result.place_samples + val_result.card_samples
+            if total_val_samples > 0:
+                val_loss = val_result.loss
+                val_place_acc = val_result.place_correct / max(1, val_result.place_samples)
+                if val_result.card_samples > 0:
+                    val_card_acc = val_result.card_correct / val_result.card_samples
+                total_val_correct = val_result.place_correct + val_result.card_correct
+                val_acc = total_val_correct / max(1, total_val_samples)
 
         monitor_value = train_loss
         if monitor == "val_loss" and val_loss is not None:
@@ -604,6 +911,9 @@ def train_distillation(
             best_state = {k: v.detach().cpu().clone() for k, v in model.state_dict().items()}
         else:
             no_improve_count += 1
+        epoch_seconds = time.perf_counter() - epoch_started
+        if scheduler is not None:
+            scheduler.record("epoch", epoch_seconds)
 
         epoch_metrics.append({
             "epoch": epoch_index + 1,
@@ -624,6 +934,11 @@ def train_distillation(
             "bestEpoch": best_epoch,
             "noImproveCount": no_improve_count,
             "cardLossWeight": card_loss_weight,
+            "batchPipeline": batch_pipeline,
+            "precision": precision,
+            "epochSeconds": epoch_seconds,
+            "samplesPerSec": epoch_samples / train_loop_seconds if train_loop_seconds > 0 else None,
+            "stepTiming": timer.summary(epoch_samples, train_loop_seconds),
         })
 
         parts = [
@@ -659,20 +974,14 @@ def train_distillation(
     if epoch_metrics:
         epoch_metrics[-1]["stoppedEarly"] = stopped_early
         epoch_metrics[-1]["earlyStopEpoch"] = early_stop_epoch
+        epoch_metrics[-1]["stoppedByDeadline"] = stopped_by_deadline
         epoch_metrics[-1]["bestEpoch"] = best_epoch
         epoch_metrics[-1]["bestMonitor"] = best_monitor
 
-    with torch.no_grad():
-        outputs_all = model(x)
-        place_logits_all, card_logits_all = onnx_base._split_outputs(outputs_all)
-        all_place_correct = 0
-        all_place_samples = 0
-        all_card_correct = 0
-        all_card_samples = 0
-        if int(place_mask.sum().item()) > 0:
-            all_place_correct, all_place_samples = _soft_accuracy(place_logits_all[place_mask], place_target[place_mask])
-        if card_logits_all is not None and onnx_base.CARD_ACTION_DIM > 0 and int(card_mask.sum().item()) > 0:
-            all_card_correct, all_card_samples = _soft_accuracy(card_logits_all[card_mask], card_target[card_mask])
+    # Summary accuracy is measured in fp32, matching the exported ONNX model.
+    final_result = evaluate_distillation(model, eval_tensors, device, eval_batch_size)
+    all_place_correct, all_place_samples = final_result.place_correct, final_result.place_samples
+    all_card_correct, all_card_samples = final_result.card_correct, final_result.card_samples
 
     place_acc_all = all_place_correct / max(1, all_place_samples)
     card_acc_all = None
@@ -681,6 +990,50 @@ def train_distillation(
     total_samples = all_place_samples + all_card_samples
     total_correct = all_place_correct + all_card_correct
     overall_acc = total_correct / max(1, total_samples)
+    ref_epochs = min(precision_ref_epochs, epoch_metrics[-1]["epoch"]) if epoch_metrics else 0
+    if precision_info is not None and ref_epochs > 0 and scheduler is not None:
+        # The reference counts against --max-hours: its epochs cost the measured epoch time
+        # scaled by the fp32/low-precision step-time ratio.
+        ref_seconds = ref_epochs * (scheduler.unit_seconds("epoch") or 0.0) * (precision_info["speedup"] or 1.0)
+        if not scheduler.allow_seconds(ref_seconds):
+            precision_info["skipped"] = "deadline"
+            print(
+                f"[train_deepcfr_onnx] precision_ref=skipped reason=deadline est_sec={ref_seconds:.1f}",
+                flush=True,
+            )
+            ref_epochs = 0
+    if precision_info is not None and ref_epochs > 0:
+        # Same seed, split and initial weights, trained in fp32.
+        print(f"[train_deepcfr_onnx] precision_ref=fp32 epochs={ref_epochs}", flush=True)
+        ref_started = time.perf_counter()
+        _, _, _, _, ref_metrics = train_distillation(
+            data=data,
+            epochs=ref_epochs,
+            batch_size=batch_size,
+            lr=lr,
+            hidden_size=hidden_size,
+            device=device,
+            seed=seed,
+            val_split=val_split,
+            early_stop_patience=0,
+            early_stop_min_delta=0.0,
+            early_stop_monitor=monitor,
+            resume_checkpoint="",
+            log_interval_steps=0,
+            card_loss_weight=card_loss_weight,
+            batch_pipeline=batch_pipeline,
+            precision="fp32",
+            eval_batch_size=eval_batch_size,
+        )
+        if scheduler is not None:
+            scheduler.record("precisionRef", time.perf_counter() - ref_started, ref_epochs)
+        onnx_base.compare_precision_accuracy(precision_info, epoch_metrics, ref_metrics)
+        print(
+            f"[train_deepcfr_onnx] precision={precision} epoch={ref_epochs} {precision_info['accMetric']}="
+            f"{precision_info['acc'] if precision_info['acc'] is not None else float('nan'):.4f} "
+            f"fp32_{precision_info['accMetric']}={precision_info['fp32Acc']:.4f}",
+            flush=True,
+        )
 
     summary = DistillSummary(
         overall_acc=overall_acc,
@@ -688,19 +1041,16 @@ def train_distillation(
         card_acc=card_acc_all,
         place_samples=all_place_samples,
         card_samples=all_card_samples,
+        compile=compile_info,
+        precision=precision_info,
     )
     return model, opt, summary, resumed_from, epoch_metrics
 
-def build_policy_table_model(
+def _iter_policy_table_states(
     infosets: Dict[str, Dict[str, ActionAggregate]],
     final_policy: dict[str, dict[str, float]],
     min_visits: int,
-    shape_immediate: float,
-    cfr_iterations: int,
-    regret_floor: float,
-    strategy_decay: float,
-) -> dict:
-    states = {}
+) -> Iterator[tuple[str, dict]]:
     for infoset_key, action_map in infosets.items():
         total_visits = sum(agg.visits for agg in action_map.values())
         if total_visits < min_visits:
@@ -710,7 +1060,7 @@ def build_policy_table_model(
             uniform = 1.0 / float(max(1, len(action_map)))
             probs = {k: uniform for k in action_map.keys()}
         best_action = max(probs.keys(), key=lambda k: (probs[k], action_map[k].avg_utility, action_map[k].visits))
-        states[infoset_key] = {
+        yield infoset_key, {
             "visits": int(total_visits),
             "bestAction": best_action,
             "bestActionVisits": int(action_map[best_action].visits),
@@ -726,6 +1076,20 @@ def build_policy_table_model(
             },
         }
 
+
+def build_policy_table_model(
+    infosets: Dict[str, Dict[str, ActionAggregate]],
+    final_policy: dict[str, dict[str, float]],
+    min_visits: int,
+    shape_immediate: float,
+    cfr_iterations: int,
+    regret_floor: float,
+    strategy_decay: float,
+) -> dict:
+    """Policy-table model whose `states` are generated while `policy_table.dump_model` writes them."""
+    kept = sum(1 for action_map in infosets.values() if sum(agg.visits for agg in action_map.values()) >= min_visits)
+    states = policy_table.StateStream(lambda: _iter_policy_table_states(infosets, final_policy, min_visits), kept)
+
     return {
         "schemaVersion": POLICY_TABLE_SCHEMA_VERSION,
         "normalization": policy_table.NORMALIZATION,
@@ -733,7 +1097,7 @@ def build_policy_table_model(
         "algorithm": "deepcfr_cfrplus_distill.v1",
         "stats": {
             "statesRaw": len(infosets),
-            "statesKept": len(states),
+            "statesKept": kept,
             "minVisits": int(min_visits),
             "shapeImmediate": float(shape_immediate),
             "cfrIterations": int(cfr_iterations),
@@ -786,6 +1150,11 @@ def write_meta(path: str, args: argparse.Namespace, stats: dict, summary: Distil
             "earlyStopMinDelta": float(args.early_stop_min_delta),
             "earlyStopMonitor": str(args.early_stop_monitor),
             "cardLossWeight": float(args.card_loss_weight),
+            "batchPipeline": str(args.batch_pipeline),
+            "compile": summary.compile,
+            "precision": str(args.precision),
+            "precisionReport": summary.precision,
+            "evalBatchSize": int(args.eval_batch_size),
             "resumeCheckpoint": (args.resume_checkpoint or "").strip() or None,
             "checkpointOut": (args.checkpoint_out or "").strip() or None,
             "cfrIterations": int(args.cfr_iterations),
@@ -819,6 +1188,7 @@ def maybe_write_checkpoint(
     summary: DistillSummary,
     device: str,
     resumed_from: str | None,
+    writer: onnx_base.ArtifactWriter | None = None,
 ) -> None:
     out = (checkpoint_out or "").strip()
     if not out:
@@ -867,7 +1237,11 @@ def maybe_write_checkpoint(
             "trainCardSamples": int(summary.card_samples),
         },
     }
-    torch.save(payload, out)
+    if writer is None:
+        torch.save(payload, out)
+        return
+    snapshot = onnx_base.detached_cpu_copy(payload)
+    writer.submit("checkpoint", out, lambda tmp_path: torch.save(snapshot, tmp_path))
 
 
 def maybe_write_json(path_value: str, payload: dict) -> None:
@@ -879,26 +1253,6 @@ def maybe_write_json(path_value: str, payload: dict) -> None:
         json.dump(payload, f, ensure_ascii=False, indent=2)
 
 
-def maybe_write_metrics(metrics_out: str, metrics: list[dict]) -> None:
-    out = (metrics_out or "").strip()
-    if not out:
-        return
-    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
-    with open(out, "w", encoding="utf-8") as f:
-        for entry in metrics:
-            f.write(json.dumps(entry, ensure_ascii=False))
-            f.write("\n")
-
-
-def maybe_write_policy_table(path_value: str, model_payload: dict) -> None:
-    out = (path_value or "").strip()
-    if not out:
-        return
-    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
-    with open(out, "w", encoding="utf-8") as f:
-        json.dump(model_payload, f, ensure_ascii=False, indent=2)
-
-
 def main() -> int:
     args = parse_args()
     device = onnx_base.choose_device(str(args.device).strip().lower())
@@ -906,20 +1260,57 @@ def main() -> int:
 
     if args.min_visits < 1:
         raise ValueError("--min-visits must be >= 1")
+    if args.max_hours < 0:
+        raise ValueError("--max-hours must be >= 0")
+    if args.cfr_time_share <= 0 or args.cfr_time_share > 1:
+        raise ValueError("--cfr-time-share must be in (0,1]")
+    run_check = export_tools.validate_onnx_check_args(args)
+    write_variants = export_tools.validate_export_variant_args(args)
+    quantize = export_tools.validate_quantize_args(args) != "off"
+    student_specs = student_distill.validate_student_args(args)
+    scheduler = RunScheduler(
+        max_seconds=float(args.max_hours) * 3600.0,
+        cfr_time_share=float(args.cfr_time_share),
+        post_export_checks=int(run_check) + int(write_variants) + int(quantize),
+        student_epochs=len(student_specs) * int(args.student_epochs),
+    )
+
+    def allow_post_export(stage: str, seconds: float = 0.0) -> bool:
+        # The runtime check is a promotion gate and always runs; optional outputs are
+        # dropped when the schedule estimates were off and the deadline is already near.
+        if scheduler.allow_post_export(stage, seconds):
+            return True
+        print(f"[train_deepcfr_onnx] {stage}=skipped reason=deadline", flush=True)
+        return False
 
+    if args.config:
+        print(f"[train_deepcfr_onnx] config={args.config} applied={','.join(args.config_applied) or '-'}", flush=True)
+
+    stage_started = time.perf_counter()
     infosets, samples, stats = load_infosets_and_samples(
         input_path=args.input,
         max_samples=int(args.max_samples),
         seed=int(args.seed),
         shape_immediate=float(args.shape_immediate),
     )
+    scheduler.record("ingest", time.perf_counter() - stage_started)
     final_policy = run_cfr_plus(
         infosets=infosets,
         iterations=int(args.cfr_iterations),
         regret_floor=float(args.cfr_regret_floor),
         strategy_decay=float(args.cfr_strategy_decay),
+        scheduler=scheduler,
     )
+    cfr_iterations_done = int(scheduler.stage_units.get("cfr", 0))
+    if cfr_iterations_done < int(args.cfr_iterations):
+        print(
+            f"[train_deepcfr_onnx] time budget limited cfr_iterations={cfr_iterations_done}/{args.cfr_iterations} "
+            f"avg_iteration_sec={scheduler.unit_seconds('cfr') or 0.0:.1f}",
+            flush=True,
+        )
+    stage_started = time.perf_counter()
     distill_data = build_distill_dataset(samples, final_policy)
+    scheduler.record("dataset", time.perf_counter() - stage_started)
 
     model, optimizer, train_summary, resumed_from, epoch_metrics = train_distillation(
         data=distill_data,
@@ -936,11 +1327,36 @@ def main() -> int:
         resume_checkpoint=str(args.resume_checkpoint or ""),
         log_interval_steps=int(args.log_interval_steps),
         card_loss_weight=float(args.card_loss_weight),
+        scheduler=scheduler,
+        batch_pipeline=str(args.batch_pipeline or "").strip().lower(),
+        profile_steps=bool(args.profile_steps),
+        compile_mode=str(args.compile or "").strip().lower(),
+        precision=str(args.precision or "").strip().lower(),
+        precision_ref_epochs=int(args.precision_ref_epochs),
+        eval_batch_size=int(args.eval_batch_size),
+    )
+
+    stage_started = time.perf_counter()
+    policy_table_model = build_policy_table_model(
+        infosets=infosets,
+        final_policy=final_policy,
+        min_visits=int(args.min_visits),
+        shape_immediate=float(args.shape_immediate),
+        cfr_iterations=int(args.cfr_iterations),
+        regret_floor=float(args.cfr_regret_floor),
+        strategy_decay=float(args.cfr_strategy_decay),
     )
+    writer = onnx_base.ArtifactWriter()
+    if (args.policy_table_out or "").strip():
 
-    onnx_base.export_onnx(model, args.onnx_out)
-    write_meta(meta_out, args, stats, train_summary, device)
-    maybe_write_metrics(str(args.metrics_out or ""), epoch_metrics)
+        def write_policy_table(path: str) -> None:
+            with open(path, "w", encoding="utf-8") as f:
+                policy_table.dump_model(policy_table_model, f, bool(args.compact_table))
+
+        writer.submit("policy_table", args.policy_table_out, write_policy_table)
+    meta_written = writer.submit("meta", meta_out, lambda path: write_meta(path, args, stats, train_summary, device))
+    if (args.metrics_out or "").strip():
+        writer.submit("metrics", args.metrics_out, onnx_base.write_jsonl_file(epoch_metrics))
     maybe_write_checkpoint(
         checkpoint_out=str(args.checkpoint_out or ""),
         model=model,
@@ -950,23 +1366,57 @@ def main() -> int:
         summary=train_summary,
         device=device,
         resumed_from=resumed_from,
+        writer=writer,
     )
-
-    policy_table_model = build_policy_table_model(
-        infosets=infosets,
-        final_policy=final_policy,
-        min_visits=int(args.min_visits),
-        shape_immediate=float(args.shape_immediate),
-        cfr_iterations=int(args.cfr_iterations),
-        regret_floor=float(args.cfr_regret_floor),
-        strategy_decay=float(args.cfr_strategy_decay),
-    )
-    maybe_write_policy_table(str(args.policy_table_out or ""), policy_table_model)
+    export_started = time.perf_counter()
+    onnx_base.export_onnx_atomic(model, args.onnx_out)
+    writer.record("onnx", args.onnx_out, time.perf_counter() - export_started, onnx_base.onnx_file_bytes(args.onnx_out))
+    meta_written.result()
+    export_tools.maybe_check_onnx_export(args, model, args.onnx_out, meta_out, distill_data.x, "train_deepcfr_onnx")
+    if write_variants and allow_post_export("exportVariants"):
+        export_tools.maybe_write_export_variants(
+            args, model, args.onnx_out, meta_out, distill_data.x, onnx_base.export_onnx, "train_deepcfr_onnx"
+        )
+    if quantize and allow_post_export("quantize"):
+        export_tools.maybe_quantize_onnx(args, args.onnx_out, meta_out, distill_data.x, "train_deepcfr_onnx")
+    distill_tensors = [
+        distill_data.x,
+        distill_data.place_target,
+        distill_data.card_target,
+        distill_data.place_mask,
+        distill_data.card_mask,
+    ]
+    student_seconds = (scheduler.unit_seconds("epoch") or 0.0) * scheduler.student_epochs
+    if student_specs and allow_post_export("students", student_seconds):
+        student_distill.maybe_distill_students(
+            args,
+            model,
+            args.onnx_out,
+            meta_out,
+            distill_data.x,
+            make_student=lambda hidden, layers: onnx_base.PolicyNet(
+                onnx_base.INPUT_DIM, hidden, onnx_base.PLACE_OUTPUT_DIM, onnx_base.CARD_ACTION_DIM, num_layers=layers
+            ),
+            eval_fn=lambda student, idx: evaluate_distillation(
+                student, distill_tensors, device, int(args.eval_batch_size), idx=idx
+            ),
+            export_fn=onnx_base.export_onnx,
+            device=device,
+            log_prefix="train_deepcfr_onnx",
+        )
+    try:
+        artifacts = writer.wait()
+    finally:
+        writer.close()
+    onnx_base.log_artifact_report(artifacts, writer.wall_seconds, "train_deepcfr_onnx")
+    scheduler.record("export", time.perf_counter() - stage_started)
 
     report_payload = {
         "schemaVersion": "deepcfr_report.v1",
         "algorithm": "deepcfr_cfrplus_distill.v1",
         "input": os.path.abspath(args.input),
+        "config": os.path.abspath(args.config) if args.config else None,
+        "configApplied": list(args.config_applied),
         "outputs": {
             "onnx": os.path.abspath(args.onnx_out),
             "meta": os.path.abspath(meta_out),
@@ -1002,10 +1452,19 @@ def main() -> int:
             "cardLossWeight": float(args.card_loss_weight),
             "resumedFrom": resumed_from,
             "cfrIterations": int(args.cfr_iterations),
+            "cfrIterationsCompleted": cfr_iterations_done,
             "cfrRegretFloor": float(args.cfr_regret_floor),
             "cfrStrategyDecay": float(args.cfr_strategy_decay),
             "shapeImmediate": float(args.shape_immediate),
+            "maxHours": float(args.max_hours),
+            "compile": train_summary.compile,
+            "precision": str(args.precision),
+            "precisionReport": train_summary.precision,
         },
+        "schedule": scheduler.report(),
+        "artifacts": [
+            {"name": e["name"], "bytes": e["bytes"], "writeSeconds": round(e["seconds"], 4)} for e in artifacts
+        ],
         "metricsCount": len(epoch_metrics),
     }
     maybe_write_json(str(args.report_out or ""), report_payload)
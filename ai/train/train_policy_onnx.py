@@ -6,12 +6,27 @@ from __future__ import annotations
 import argparse
 import json
 import os
+import queue
+import tempfile
+import threading
+import time
+from array import array
 from collections import Counter
-from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterator
 
 import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
 from torch import nn
+from torch.nn import functional as F
 
+import artifact_cache
+import ndjson_follow
+import onnx_export_tools as export_tools
+import student_distill
 import train_policy_table as policy_table
 
 
@@ -22,6 +37,15 @@ PLACE_OUTPUT_DIM = BOARD_SIZE * BOARD_SIZE
 IGNORE_INDEX = -100
 MAX_HAND_SIZE = 5.0
 NO_CARD_ACTION_ID = "__no_card__"
+BATCH_PIPELINES = ("prefetch", "copy")
+DEFAULT_PREFETCH_BATCHES = 2
+COMPILE_MODES = ("off", "auto", "inductor", "trace")
+# Max compiled-vs-eager deviation (relative to the eager magnitude, floored at 1) per precision.
+COMPILE_PARITY_TOLERANCE = {"fp32": 1e-4, "bf16": 5e-2}
+PRECISION_MODES = ("fp32", "bf16")
+DEFAULT_EVAL_BATCH_SIZE = 8192
+DEDUPE_MODES = ("off", "exact", "dihedral")
+STEP_TIMING_BUCKETS_MS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0)
 
 
 def load_card_action_ids() -> list[str]:
@@ -73,6 +97,16 @@ class DatasetBundle:
     train_records: int
     place_records: int
     card_records: int
+    # With --dedupe: per-unique-row target counts; y_place/y_card then hold each row's majority target.
+    place_hist: torch.Tensor | None = None
+    card_hist: torch.Tensor | None = None
+    dedupe: dict | None = None
+
+    def targets(self) -> tuple[torch.Tensor, torch.Tensor]:
+        """Training targets per head: class indices, or float target-count histograms after --dedupe."""
+        if self.place_hist is not None and self.card_hist is not None:
+            return self.place_hist, self.card_hist
+        return self.y_place, self.y_card
 
 
 @dataclass
@@ -82,11 +116,260 @@ class TrainSummary:
     card_acc: float | None
     place_samples: int
     card_samples: int
+    compile: dict | None = None
+    precision: dict | None = None
+
+
+@dataclass
+class DataParallelContext:
+    """Rank layout for --dp-workers; a world size of 1 is plain single-process training."""
+
+    rank: int = 0
+    world_size: int = 1
+
+    @property
+    def enabled(self) -> bool:
+        return self.world_size > 1
+
+    @property
+    def is_main(self) -> bool:
+        return self.rank == 0
+
+    def all_reduce_sum(self, values: list[float]) -> list[float]:
+        if not self.enabled:
+            return values
+        t = torch.tensor(values, dtype=torch.float64)
+        dist.all_reduce(t)
+        return t.tolist()
+
+    def broadcast_flag(self, flag: bool) -> bool:
+        if not self.enabled:
+            return flag
+        t = torch.tensor([1 if flag else 0], dtype=torch.long)
+        dist.broadcast(t, src=0)
+        return bool(t.item())
+
+
+def save_atomic(payload: dict, path: str) -> None:
+    """torch.save to a temp file next to `path`, then rename over it."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    torch.save(payload, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def detached_cpu_copy(obj):
+    """Deep copy of a (nested) state dict with every tensor cloned to the host."""
+    if isinstance(obj, torch.Tensor):
+        return obj.detach().to("cpu", copy=True)
+    if isinstance(obj, dict):
+        return {k: detached_cpu_copy(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(detached_cpu_copy(v) for v in obj)
+    return obj
+
+
+class BackgroundCheckpointWriter:
+    """Serializes checkpoint payloads on one background thread.
+
+    The caller snapshots tensors to the host before `submit`, so training can keep
+    mutating the live weights while the previous snapshot is written. A new submit
+    waits for the write in flight; errors surface on the next `submit`/`wait`.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.writes = 0
+        self.last_write_seconds: float | None = None
+        self._thread: threading.Thread | None = None
+        self._error: BaseException | None = None
+
+    def _write(self, payload: dict) -> None:
+        started = time.perf_counter()
+        try:
+            save_atomic(payload, self.path)
+        except BaseException as exc:  # surfaced on the training thread
+            self._error = exc
+            return
+        self.writes += 1
+        self.last_write_seconds = time.perf_counter() - started
+
+    def submit(self, payload: dict) -> None:
+        self.wait()
+        self._thread = threading.Thread(target=self._write, args=(payload,), daemon=True)
+        self._thread.start()
+
+    def wait(self) -> None:
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+
+class ArtifactWriter:
+    """Writes end-of-run artifacts on background threads, each via a temp file and rename.
+
+    `submit` runs `write_fn(tmp_path)` on a worker and renames the temp file over the
+    target, so independent artifacts are written concurrently while the main thread
+    keeps exporting and checking the model. `record` adds an artifact the caller wrote
+    itself (the ONNX export). `wait` re-raises the first failure and returns one
+    `{name, path, bytes, seconds}` entry per artifact.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="artifact-writer")
+        self._futures: list[Future] = []
+        self._entries: list[dict] = []
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+
+    def _add(self, name: str, path: str, seconds: float, nbytes: int) -> None:
+        with self._lock:
+            self._entries.append({"name": name, "path": path, "bytes": int(nbytes), "seconds": float(seconds)})
+
+    def _write(self, name: str, path: str, write_fn: Callable[[str], None]) -> None:
+        started = time.perf_counter()
+        out_dir = os.path.dirname(path) or "."
+        os.makedirs(out_dir, exist_ok=True)
+        # A plain open() in write_fn creates the file with the umask default mode, unlike mkstemp's 0600.
+        tmp_path = os.path.join(out_dir, f".{os.path.basename(path)}.{os.getpid()}-{threading.get_ident()}.tmp")
+        try:
+            write_fn(tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._add(name, path, time.perf_counter() - started, os.path.getsize(path))
+
+    def submit(self, name: str, path: str, write_fn: Callable[[str], None]) -> Future:
+        future = self._pool.submit(self._write, name, path, write_fn)
+        self._futures.append(future)
+        return future
+
+    def record(self, name: str, path: str, seconds: float, nbytes: int) -> None:
+        self._add(name, path, seconds, nbytes)
+
+    def wait(self) -> list[dict]:
+        for future in self._futures:
+            future.result()
+        self._futures = []
+        with self._lock:
+            return list(self._entries)
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+
+    @property
+    def wall_seconds(self) -> float:
+        return time.perf_counter() - self._started
+
+
+def write_jsonl_file(entries: list[dict]) -> Callable[[str], None]:
+    def write(path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False))
+                f.write("\n")
+
+    return write
+
+
+def log_artifact_report(entries: list[dict], wall_seconds: float, log_prefix: str) -> None:
+    """One line per artifact, then serial (sum) vs wall time of the whole output stage."""
+    for entry in sorted(entries, key=lambda e: -e["seconds"]):
+        print(f"[{log_prefix}] artifact name={entry['name']} bytes={entry['bytes']} write_seconds={entry['seconds']:.3f}")
+    print(
+        f"[{log_prefix}] artifacts={len(entries)} bytes={sum(e['bytes'] for e in entries)} "
+        f"serial_seconds={sum(e['seconds'] for e in entries):.3f} wall_seconds={wall_seconds:.3f}",
+        flush=True,
+    )
+
+
+@dataclass
+class StepTimer:
+    """Per-phase wall-clock breakdown of the training hot loop.
+
+    Disabled timers return immediately from every method, so the loop gains no extra
+    device syncs. Enabled timers synchronize CUDA before reading the clock (counted
+    separately as profiler syncs) so queued kernels are charged to the right phase.
+    """
+
+    enabled: bool = False
+    device: str = "cpu"
+    phases: dict = field(default_factory=dict)
+    device_syncs: int = 0
+    profiler_syncs: int = 0
+    last: float = 0.0
+
+    def reset(self) -> None:
+        if not self.enabled:
+            return
+        self.phases = {}
+        self.device_syncs = 0
+        self.profiler_syncs = 0
+        self.mark()
+
+    def mark(self) -> None:
+        if not self.enabled:
+            return
+        if self.device == "cuda":
+            torch.cuda.synchronize()
+            self.profiler_syncs += 1
+        self.last = time.perf_counter()
+
+    def lap(self, phase: str) -> None:
+        if not self.enabled:
+            return
+        started = self.last
+        self.mark()
+        self.phases.setdefault(phase, []).append(self.last - started)
+
+    def count_sync(self, n: int = 1) -> None:
+        if self.enabled:
+            self.device_syncs += int(n)
+
+    def summary(self, samples: int, seconds: float) -> dict | None:
+        if not self.enabled:
+            return None
+        phases = {}
+        for phase, values in self.phases.items():
+            ordered = sorted(values)
+            count = len(ordered)
+            histogram = {f"<={edge:g}": 0 for edge in STEP_TIMING_BUCKETS_MS}
+            histogram[f">{STEP_TIMING_BUCKETS_MS[-1]:g}"] = 0
+            for value in ordered:
+                ms = value * 1000.0
+                for edge in STEP_TIMING_BUCKETS_MS:
+                    if ms <= edge:
+                        histogram[f"<={edge:g}"] += 1
+                        break
+                else:
+                    histogram[f">{STEP_TIMING_BUCKETS_MS[-1]:g}"] += 1
+            phases[phase] = {
+                "count": count,
+                "totalSec": sum(ordered),
+                "meanMs": (sum(ordered) / max(1, count)) * 1000.0,
+                "p50Ms": ordered[int(0.5 * (count - 1))] * 1000.0,
+                "p90Ms": ordered[int(0.9 * (count - 1))] * 1000.0,
+                "p99Ms": ordered[int(0.99 * (count - 1))] * 1000.0,
+                "maxMs": ordered[-1] * 1000.0,
+                "histogramMs": histogram,
+            }
+        return {
+            "phases": phases,
+            "loopSeconds": seconds,
+            "samplesPerSec": samples / seconds if seconds > 0 else None,
+            "deviceSyncs": self.device_syncs,
+            "profilerSyncs": self.profiler_syncs,
+        }
 
 
-def parse_args() -> argparse.Namespace:
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     p = argparse.ArgumentParser(description="Train ONNX policy model from self-play NDJSON.")
-    p.add_argument("--input", required=True, help="Path to NDJSON self-play data.")
+    p.add_argument("--input", required=True, help="Path to NDJSON self-play data (with --follow: file, shard directory or glob).")
     p.add_argument(
         "--onnx-out",
         default=os.path.join("data", "models", "policy-net.onnx"),
@@ -151,6 +434,23 @@ def parse_args() -> argparse.Namespace:
         default="",
         help="Optional checkpoint output path (.pt).",
     )
+    p.add_argument(
+        "--checkpoint-every-steps",
+        type=int,
+        default=0,
+        help="Write a resumable progress checkpoint every N optimizer steps (default: 0=off).",
+    )
+    p.add_argument(
+        "--checkpoint-every-minutes",
+        type=float,
+        default=0.0,
+        help="Write a resumable progress checkpoint every N minutes of training (default: 0=off).",
+    )
+    p.add_argument(
+        "--progress-checkpoint-out",
+        default="",
+        help="Progress checkpoint path (default: <checkpoint-out stem>.progress.checkpoint.pt).",
+    )
     p.add_argument(
         "--device",
         default="auto",
@@ -162,14 +462,82 @@ def parse_args() -> argparse.Namespace:
         default=2.0,
         help="Loss weight for card action head (default: 2.0).",
     )
+    p.add_argument(
+        "--batch-pipeline",
+        default="prefetch",
+        help="Mini-batch pipeline: prefetch (background gather) or copy (permuted epoch copy) (default: prefetch).",
+    )
+    p.add_argument(
+        "--compile",
+        default="off",
+        help="Compile the training step: off/auto/inductor (torch.compile)/trace (TorchScript). "
+        "auto tries inductor then trace and falls back to eager (default: off).",
+    )
+    p.add_argument(
+        "--dedupe",
+        default="off",
+        help="Collapse duplicate feature rows into weighted rows with target histograms: off/exact/dihedral "
+        "(dihedral also merges the 8 board symmetries and trains on a random symmetry per batch) (default: off).",
+    )
+    p.add_argument(
+        "--eval-batch-size",
+        type=int,
+        default=DEFAULT_EVAL_BATCH_SIZE,
+        help=f"Rows per forward pass in validation and final accuracy evaluation (default: {DEFAULT_EVAL_BATCH_SIZE}).",
+    )
+    p.add_argument(
+        "--dp-workers",
+        type=int,
+        default=1,
+        help="Local data-parallel worker processes (DistributedDataParallel over gloo, CPU only). "
+        "--batch-size stays the global batch; rank 0 evaluates and writes outputs (default: 1).",
+    )
+    p.add_argument(
+        "--dp-threads",
+        type=int,
+        default=0,
+        help="Intra-op threads per data-parallel worker (default: 0=cpu_count/dp-workers).",
+    )
+    p.add_argument(
+        "--precision",
+        default="fp32",
+        help="Training precision: fp32 or bf16 (autocast forward/backward, fp32 master weights and optimizer; "
+        "ONNX export stays fp32) (default: fp32).",
+    )
+    p.add_argument(
+        "--precision-ref-epochs",
+        type=int,
+        default=1,
+        help="Epochs of the short fp32 reference run a non-fp32 --precision is compared against for accuracy "
+        "(same seed, split and initial weights) (default: 1; 0=skip).",
+    )
+    p.add_argument(
+        "--profile-steps",
+        action="store_true",
+        help="Record per-epoch timing histograms of batch gather/forward/backward/optimizer/metrics phases in --metrics-out.",
+    )
     p.add_argument("--min-visits", type=int, default=12, help="Compat policy-table --min-visits.")
+    p.add_argument("--compact-table", action="store_true", help="Compat policy-table --compact-table.")
     p.add_argument(
         "--shape-immediate",
         type=float,
         default=0.4,
         help="Compat policy-table --shape-immediate in [0,1].",
     )
-    return p.parse_args()
+    p.add_argument(
+        "--policy-table-buffer",
+        type=int,
+        default=65536,
+        help="Max parsed records queued for the background policy-table aggregator; ingestion waits when full "
+        "(default: 65536, 0=unbounded).",
+    )
+    export_tools.add_onnx_check_args(p)
+    export_tools.add_export_variant_args(p)
+    export_tools.add_quantize_args(p)
+    student_distill.add_student_args(p)
+    artifact_cache.add_cache_args(p)
+    ndjson_follow.add_follow_args(p)
+    return p.parse_args(argv)
 
 
 def parse_board(board: str) -> list[list[str]]:
@@ -292,62 +660,157 @@ def card_target_index(rec: dict) -> int | None:
     return None
 
 
-def load_dataset(path: str) -> DatasetBundle:
-    xs: list[list[float]] = []
-    y_place: list[int] = []
-    y_card: list[int] = []
-    records_read = 0
-    train_records = 0
-    place_records = 0
-    card_records = 0
+def board_symmetry_index(t: int) -> list[int]:
+    """Source cell for every destination cell under dihedral transform `t` (policy-table numbering)."""
+    src = [0] * PLACE_OUTPUT_DIM
+    for row in range(BOARD_SIZE):
+        for col in range(BOARD_SIZE):
+            nr, nc = policy_table.transform_coord(row, col, BOARD_SIZE, t)
+            src[(nr * BOARD_SIZE) + nc] = (row * BOARD_SIZE) + col
+    return src
+
+
+BOARD_SYMMETRIES = [board_symmetry_index(t) for t in range(8)]
+
+
+def canonicalize_features(features: list[float], place_t: int | None) -> tuple[list[float], int | None]:
+    """Rotate/reflect the board block to its lexicographically smallest form and move the place target along."""
+    board = features[:PLACE_OUTPUT_DIM]
+    best_t = min(range(8), key=lambda t: [board[i] for i in BOARD_SYMMETRIES[t]])
+    src = BOARD_SYMMETRIES[best_t]
+    out = [board[i] for i in src] + features[PLACE_OUTPUT_DIM:]
+    if place_t is not None:
+        place_t = src.index(place_t)
+    return out, place_t
+
+
+class DatasetBuilder:
+    """Featurizes records one at a time; `bundle` turns everything added so far into tensors.
+
+    With `dedupe` identical rows collapse into target-count histograms. Training on a
+    unique row with its histogram has the same loss as training on every copy, so an
+    epoch needs far fewer steps when positions repeat (openings above all).
+    """
+
+    def __init__(self, dedupe: str = "off"):
+        if dedupe not in DEDUPE_MODES:
+            raise ValueError(f"--dedupe must be one of: {', '.join(DEDUPE_MODES)}")
+        self.dedupe = dedupe
+        self.xs: list[list[float]] = []
+        self.y_place: list = []
+        self.y_card: list = []
+        self.row_index: dict[bytes, int] = {}
+        self.records_read = 0
+        self.train_records = 0
+        self.place_records = 0
+        self.card_records = 0
+
+    def add(self, rec: dict) -> None:
+        self.records_read += 1
+        place_t = place_target_index(rec)
+        card_t = card_target_index(rec)
+        if place_t is None and card_t is None:
+            return
+
+        features = feature_vector(rec)
+        if self.dedupe == "dihedral":
+            features, place_t = canonicalize_features(features, place_t)
+        if self.dedupe != "off":
+            key = array("f", features).tobytes()
+            row = self.row_index.setdefault(key, len(self.row_index))
+            if row == len(self.xs):
+                self.xs.append(features)
+            # Rows map to their unique feature row; targets become (row, target) pairs.
+            self.y_place.append((row, place_t))
+            self.y_card.append((row, card_t))
+        else:
+            self.xs.append(features)
+            self.y_place.append(place_t if place_t is not None else IGNORE_INDEX)
+            self.y_card.append(card_t if card_t is not None else IGNORE_INDEX)
+        self.train_records += 1
+        if place_t is not None:
+            self.place_records += 1
+        if card_t is not None:
+            self.card_records += 1
+
+    def bundle(self) -> DatasetBundle:
+        if self.train_records <= 0:
+            raise ValueError("no training records were found in input data")
+
+        x = torch.tensor(self.xs, dtype=torch.float32)
+        counts = dict(
+            records_read=self.records_read,
+            train_records=self.train_records,
+            place_records=self.place_records,
+            card_records=self.card_records,
+        )
+        if self.dedupe != "off":
+            place_hist = _target_histogram(self.y_place, len(self.xs), PLACE_OUTPUT_DIM)
+            card_hist = _target_histogram(self.y_card, len(self.xs), CARD_ACTION_DIM)
+            return DatasetBundle(
+                x=x,
+                y_place=_majority_target(place_hist),
+                y_card=_majority_target(card_hist),
+                **counts,
+                place_hist=place_hist,
+                card_hist=card_hist,
+                dedupe={
+                    "mode": self.dedupe,
+                    "records": self.train_records,
+                    "uniqueRows": len(self.xs),
+                    "ratio": len(self.xs) / max(1, self.train_records),
+                },
+            )
+        return DatasetBundle(
+            x=x,
+            y_place=torch.tensor(self.y_place, dtype=torch.long),
+            y_card=torch.tensor(self.y_card, dtype=torch.long),
+            **counts,
+        )
+
+
+def load_dataset(path: str, dedupe: str = "off", record_sink: Callable[[dict], None] | None = None) -> DatasetBundle:
+    """Featurize NDJSON records through a `DatasetBuilder`.
 
+    Every parsed record is also handed to `record_sink`, so other consumers (the
+    compatibility policy table) share this single pass over the input.
+    """
+    builder = DatasetBuilder(dedupe)
     with open(path, "r", encoding="utf-8") as f:
         for line in f:
             line = line.strip()
             if not line:
                 continue
-            records_read += 1
             rec = json.loads(line)
-            place_t = place_target_index(rec)
-            card_t = card_target_index(rec)
-            if place_t is None and card_t is None:
-                continue
+            if record_sink is not None:
+                record_sink(rec)
+            builder.add(rec)
+    return builder.bundle()
 
-            xs.append(feature_vector(rec))
-            y_place.append(place_t if place_t is not None else IGNORE_INDEX)
-            y_card.append(card_t if card_t is not None else IGNORE_INDEX)
-            train_records += 1
-            if place_t is not None:
-                place_records += 1
-            if card_t is not None:
-                card_records += 1
-
-    if train_records <= 0:
-        raise ValueError("no training records were found in input data")
-
-    x = torch.tensor(xs, dtype=torch.float32)
-    y_place_tensor = torch.tensor(y_place, dtype=torch.long)
-    y_card_tensor = torch.tensor(y_card, dtype=torch.long)
-    return DatasetBundle(
-        x=x,
-        y_place=y_place_tensor,
-        y_card=y_card_tensor,
-        records_read=records_read,
-        train_records=train_records,
-        place_records=place_records,
-        card_records=card_records,
-    )
+
+def _target_histogram(pairs: list[tuple[int, int | None]], rows: int, classes: int) -> torch.Tensor:
+    hist = torch.zeros((rows, classes), dtype=torch.float32)
+    kept = [(row, target) for row, target in pairs if target is not None]
+    if kept and classes > 0:
+        index = torch.tensor(kept, dtype=torch.long)
+        hist.index_put_((index[:, 0], index[:, 1]), torch.ones(len(kept)), accumulate=True)
+    return hist
+
+
+def _majority_target(hist: torch.Tensor) -> torch.Tensor:
+    if hist.shape[1] == 0:
+        return torch.full((hist.shape[0],), IGNORE_INDEX, dtype=torch.long)
+    return torch.where(hist.sum(dim=1) > 0, hist.argmax(dim=1), torch.full_like(hist[:, 0], IGNORE_INDEX, dtype=torch.long))
 
 
 class PolicyNet(nn.Module):
-    def __init__(self, input_dim: int, hidden_size: int, place_output_dim: int, card_output_dim: int):
+    def __init__(self, input_dim: int, hidden_size: int, place_output_dim: int, card_output_dim: int, num_layers: int = 2):
         super().__init__()
-        self.backbone = nn.Sequential(
-            nn.Linear(input_dim, hidden_size),
-            nn.ReLU(),
-            nn.Linear(hidden_size, hidden_size),
-            nn.ReLU(),
-        )
+        # Linear+ReLU pairs; the default two keep the backbone.0/backbone.2 state-dict layout.
+        layers: list[nn.Module] = []
+        for i in range(max(1, int(num_layers))):
+            layers += [nn.Linear(input_dim if i == 0 else hidden_size, hidden_size), nn.ReLU()]
+        self.backbone = nn.Sequential(*layers)
         self.place_head = nn.Linear(hidden_size, place_output_dim)
         self.card_head = nn.Linear(hidden_size, card_output_dim) if card_output_dim > 0 else None
 
@@ -378,14 +841,362 @@ def _split_outputs(outputs):
     return outputs, None
 
 
-def _accuracy_from_logits(logits: torch.Tensor, target: torch.Tensor) -> tuple[int, int]:
-    mask = target != IGNORE_INDEX
-    samples = int(mask.sum().item())
-    if samples <= 0:
-        return 0, 0
+def _prefetch_worker(
+    tensors: list[torch.Tensor],
+    perm: torch.Tensor,
+    batch_size: int,
+    pin: bool,
+    out: queue.Queue,
+    stop: threading.Event,
+) -> None:
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                out.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    try:
+        for start in range(0, int(perm.shape[0]), batch_size):
+            idx = perm[start:start + batch_size]
+            batch = [t.index_select(0, idx) for t in tensors]
+            if pin:
+                batch = [b.pin_memory() for b in batch]
+            if not put(batch):
+                return
+        put(None)
+    except BaseException as exc:  # surfaced on the consumer thread
+        put(exc)
+
+
+def iter_minibatches(
+    tensors: list[torch.Tensor],
+    batch_size: int,
+    device: str,
+    pipeline: str = "prefetch",
+    prefetch_batches: int = DEFAULT_PREFETCH_BATCHES,
+    perm: torch.Tensor | None = None,
+) -> Iterator[list[torch.Tensor]]:
+    """Yield shuffled mini-batches of row-aligned tensors for one epoch.
+
+    `copy` materializes a permuted copy of every tensor and slices it (the original loop).
+    `prefetch` only permutes the row indices and gathers upcoming batches on a background
+    thread, staging them in pinned memory when the tensors live on the host but training
+    runs on CUDA. With the tensors on the training device both modes draw the same
+    permutation, so batches are identical and the modes can be timed against each other.
+    An explicit `perm` (e.g. the unfinished tail of a resumed epoch) replaces the draw.
+    """
+    if pipeline not in BATCH_PIPELINES:
+        raise ValueError(f"--batch-pipeline must be one of: {', '.join(BATCH_PIPELINES)}")
+    if perm is None:
+        perm = torch.randperm(int(tensors[0].shape[0]), device=tensors[0].device)
+    n = int(perm.shape[0])
+    if pipeline == "copy":
+        epoch = [t[perm] for t in tensors]
+        for start in range(0, n, batch_size):
+            yield [t[start:start + batch_size] for t in epoch]
+        return
+
+    host_to_device = tensors[0].device.type == "cpu" and device != "cpu"
+    out: queue.Queue = queue.Queue(maxsize=max(1, int(prefetch_batches)))
+    stop = threading.Event()
+    worker = threading.Thread(
+        target=_prefetch_worker,
+        args=(tensors, perm, batch_size, host_to_device and device == "cuda", out, stop),
+        daemon=True,
+    )
+    worker.start()
+    try:
+        while True:
+            item = out.get()
+            if item is None:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            if host_to_device:
+                item = [b.to(device, non_blocking=True) for b in item]
+            yield item
+    finally:
+        stop.set()
+        worker.join()
+
+
+def autocast_context(device: str, precision: str) -> torch.autocast:
+    """Autocast region for forward passes; parameters and optimizer state stay fp32."""
+    device_type = "cuda" if str(device).startswith("cuda") else "cpu"
+    return torch.autocast(device_type=device_type, dtype=torch.bfloat16, enabled=precision == "bf16")
+
+
+def _probe_step(runner: nn.Module, example: torch.Tensor, precision: str = "fp32") -> None:
+    with autocast_context(example.device.type, precision):
+        place_logits, card_logits = _split_outputs(runner(example))
+    loss = place_logits.float().sum()
+    if card_logits is not None:
+        loss = loss + card_logits.float().sum()
+    loss.backward()
+
+
+def _parity_step(runner: nn.Module, model: nn.Module, example: torch.Tensor, precision: str) -> tuple[list, torch.Tensor, list]:
+    """Outputs, a fixed cross-entropy loss (uniform target) and the resulting gradients."""
+    with autocast_context(example.device.type, precision):
+        outputs = [o.float() for o in _split_outputs(runner(example)) if o is not None]
+    loss = sum(-F.log_softmax(o, dim=1).mean() for o in outputs)
+    loss.backward()
+    grads = [p.grad.detach().clone() for p in model.parameters() if p.grad is not None]
+    model.zero_grad(set_to_none=True)
+    return [o.detach() for o in outputs], loss.detach(), grads
+
+
+def check_compile_parity(runner: nn.Module, model: nn.Module, example: torch.Tensor, precision: str = "fp32") -> dict:
+    """Compare a compiled runner with the eager module on one batch: outputs, loss and gradients."""
+    ref_out, ref_loss, ref_grads = _parity_step(model, model, example, precision)
+    out, loss, grads = _parity_step(runner, model, example, precision)
+
+    def deviation(a: torch.Tensor, b: torch.Tensor) -> float:
+        return float(((a - b).abs().max() / b.abs().max().clamp(min=1.0)).item())
+
+    result = {
+        "maxOutputDeviation": max(deviation(a, b) for a, b in zip(out, ref_out)),
+        "lossDeviation": deviation(loss, ref_loss),
+        "maxGradDeviation": max((deviation(a, b) for a, b in zip(grads, ref_grads)), default=0.0),
+        "tolerance": COMPILE_PARITY_TOLERANCE[precision],
+    }
+    result["ok"] = len(out) == len(ref_out) and len(grads) == len(ref_grads) and all(
+        result[key] <= result["tolerance"] for key in ("maxOutputDeviation", "lossDeviation", "maxGradDeviation")
+    )
+    return result
+
+
+def _time_steps(
+    runner: nn.Module,
+    model: nn.Module,
+    example: torch.Tensor,
+    precision: str = "fp32",
+    steps: int = 20,
+    warmup: int = 3,
+) -> float:
+    for i in range(warmup + steps):
+        if i == warmup:
+            if example.is_cuda:
+                torch.cuda.synchronize()
+            started = time.perf_counter()
+        _probe_step(runner, example, precision)
+        model.zero_grad(set_to_none=True)
+    if example.is_cuda:
+        torch.cuda.synchronize()
+    return ((time.perf_counter() - started) / steps) * 1000.0
+
+
+def compile_policy_model(
+    model: nn.Module,
+    mode: str,
+    example: torch.Tensor,
+    precision: str = "fp32",
+) -> tuple[nn.Module, dict | None]:
+    """Build the module used for forward/backward training steps.
+
+    The returned runner shares parameters with `model`, so the optimizer, checkpoints,
+    evaluation and ONNX export keep using the eager module. A backend that fails to
+    compile or run a probe step is skipped; `auto` ends at eager if nothing works.
+    A backend is also skipped when its outputs, loss or gradients on `example` deviate
+    from the eager module by more than `COMPILE_PARITY_TOLERANCE`.
+    Probe steps only accumulate gradients, which are cleared before returning.
+    """
+    if mode not in COMPILE_MODES:
+        raise ValueError(f"--compile must be one of: {', '.join(COMPILE_MODES)}")
+    if mode == "off":
+        return model, None
+
+    errors: dict[str, str] = {}
+    runner: nn.Module = model
+    backend = "eager"
+    compile_seconds = 0.0
+    parity = None
+    for candidate in (("inductor", "trace") if mode == "auto" else (mode,)):
+        started = time.perf_counter()
+        try:
+            if candidate == "inductor":
+                compiled = torch.compile(model)
+            else:
+                compiled = torch.jit.trace(model, example)
+            _probe_step(compiled, example, precision)
+            model.zero_grad(set_to_none=True)
+            candidate_parity = check_compile_parity(compiled, model, example, precision)
+            if not candidate_parity["ok"]:
+                raise RuntimeError(f"parity check failed against eager: {candidate_parity}")
+        except Exception as exc:
+            errors[candidate] = f"{type(exc).__name__}: {exc}"[:300]
+            continue
+        finally:
+            model.zero_grad(set_to_none=True)
+        runner = compiled
+        backend = candidate
+        parity = candidate_parity
+        compile_seconds = time.perf_counter() - started
+        break
+
+    eager_ms = _time_steps(model, model, example, precision)
+    compiled_ms = _time_steps(runner, model, example, precision) if runner is not model else eager_ms
+    return runner, {
+        "requested": mode,
+        "backend": backend,
+        "fallbackErrors": errors,
+        "compileSeconds": compile_seconds,
+        "parity": parity,
+        "benchBatchSize": int(example.shape[0]),
+        "eagerStepMs": eager_ms,
+        "compiledStepMs": compiled_ms,
+        "speedup": eager_ms / compiled_ms if compiled_ms > 0 else None,
+    }
+
+
+def benchmark_precision(runner: nn.Module, model: nn.Module, example: torch.Tensor, precision: str) -> dict | None:
+    """Steady-state fwd/bwd step time of `precision` against fp32 on the same batch."""
+    if precision not in PRECISION_MODES:
+        raise ValueError(f"--precision must be one of: {', '.join(PRECISION_MODES)}")
+    if precision == "fp32":
+        return None
+    fp32_ms = _time_steps(runner, model, example, "fp32")
+    step_ms = _time_steps(runner, model, example, precision)
+    return {
+        "mode": precision,
+        "benchBatchSize": int(example.shape[0]),
+        "fp32StepMs": fp32_ms,
+        "stepMs": step_ms,
+        "speedup": fp32_ms / step_ms if step_ms > 0 else None,
+    }
+
+
+def compare_precision_accuracy(precision_info: dict, metrics: list[dict], ref_metrics: list[dict]) -> None:
+    """Fill the accuracy half of a precision report from an fp32 reference run.
+
+    The reference is compared with this run at its own last epoch, on validation
+    accuracy when there is a validation split and on training accuracy otherwise.
+    """
+    ref = ref_metrics[-1]
+    key = "valAcc" if ref.get("valAcc") is not None else "trainAcc"
+    same = next((m for m in metrics if m["epoch"] == ref["epoch"]), None)
+    acc = same.get(key) if same is not None else None
+    precision_info["accEpoch"] = ref["epoch"]
+    precision_info["accMetric"] = key
+    precision_info["fp32Acc"] = ref[key]
+    precision_info["acc"] = acc
+    precision_info["accDelta"] = acc - ref[key] if acc is not None else None
+
+
+def _accuracy_counts(logits: torch.Tensor, target: torch.Tensor) -> tuple[torch.Tensor, torch.Tensor]:
+    # Device-side (correct, samples) counts; reading them is left to the caller.
     pred = torch.argmax(logits, dim=1)
-    correct = int((pred[mask] == target[mask]).sum().item())
-    return correct, samples
+    if target.is_floating_point():
+        # Target-count histograms (--dedupe): every copy whose target is the prediction counts.
+        return target.gather(1, pred.unsqueeze(1)).sum().long(), target.sum().long()
+    mask = target != IGNORE_INDEX
+    correct = ((pred == target) & mask).sum()
+    return correct, mask.sum()
+
+
+def _cross_entropy_sum(logits: torch.Tensor, target: torch.Tensor) -> torch.Tensor:
+    # Histogram targets give the summed loss of all the copies a deduplicated row stands for.
+    if target.is_floating_point():
+        return -(target * F.log_softmax(logits, dim=1)).sum()
+    return F.cross_entropy(logits, target, ignore_index=IGNORE_INDEX, reduction="sum")
+
+
+def _target_count(target: torch.Tensor) -> torch.Tensor:
+    return target.sum() if target.is_floating_point() else (target != IGNORE_INDEX).sum()
+
+
+def _masked_mean(loss_sum: torch.Tensor, target: torch.Tensor) -> torch.Tensor:
+    # Mean over non-ignored targets; an all-ignored batch yields 0 instead of NaN, without a host branch.
+    return loss_sum / _target_count(target).clamp(min=1)
+
+
+def _read_counters(*values: torch.Tensor) -> list[float]:
+    """Read device-side accumulators back to the host with a single sync."""
+    return torch.stack([v.detach().to(torch.float64) for v in values]).tolist()
+
+
+def iter_eval_chunks(
+    tensors: list[torch.Tensor],
+    eval_batch_size: int,
+    idx: torch.Tensor | None = None,
+    device: str | None = None,
+) -> Iterator[list[torch.Tensor]]:
+    """Yield aligned row chunks of `tensors`, optionally restricted to the rows in `idx`.
+
+    Without `idx` the chunks are views; with it only one chunk of rows is gathered at a
+    time, so evaluating a split never materializes the whole selection. With `device`
+    each chunk is moved there, so host-resident tensors can be evaluated on a GPU model.
+    """
+    n = int(tensors[0].shape[0]) if idx is None else int(idx.shape[0])
+    for start in range(0, n, eval_batch_size):
+        if idx is None:
+            chunk = [t[start : start + eval_batch_size] for t in tensors]
+        else:
+            rows = idx[start : start + eval_batch_size]
+            chunk = [t.index_select(0, rows.to(t.device)) for t in tensors]
+        yield chunk if device is None else [t.to(device) for t in chunk]
+
+
+@dataclass
+class EvalResult:
+    loss: float
+    place_correct: int
+    place_samples: int
+    card_correct: int
+    card_samples: int
+
+
+def evaluate_policy(
+    model: nn.Module,
+    x: torch.Tensor,
+    y_place: torch.Tensor,
+    y_card: torch.Tensor,
+    device: str,
+    eval_batch_size: int,
+    idx: torch.Tensor | None = None,
+    card_loss_weight: float = 1.0,
+) -> EvalResult:
+    """Chunked loss/accuracy over `x` (or its `idx` rows) with one host read at the end.
+
+    The loss equals a single full-batch `_masked_mean` of the cross entropy per head: per-head sums
+    and counts are accumulated across chunks and divided once. Targets may be class
+    indices or the float target-count histograms of a deduplicated dataset.
+    """
+    zero_f = torch.zeros((), dtype=torch.float64, device=device)
+    zero_l = torch.zeros((), dtype=torch.long, device=device)
+    place_loss_sum, card_loss_sum = zero_f.clone(), zero_f.clone()
+    place_correct, place_samples = zero_l.clone(), zero_l.clone()
+    card_correct, card_samples = zero_l.clone(), zero_l.clone()
+    has_card_head = False
+    with torch.no_grad():
+        for xb, yb_place, yb_card in iter_eval_chunks([x, y_place, y_card], eval_batch_size, idx, device):
+            place_logits, card_logits = _split_outputs(model(xb))
+            place_loss_sum += _cross_entropy_sum(place_logits, yb_place)
+            correct, samples = _accuracy_counts(place_logits, yb_place)
+            place_correct += correct
+            place_samples += samples
+            if card_logits is not None:
+                has_card_head = True
+                card_loss_sum += _cross_entropy_sum(card_logits, yb_card)
+                correct, samples = _accuracy_counts(card_logits, yb_card)
+                card_correct += correct
+                card_samples += samples
+    place_loss_n, card_loss_n, place_correct_n, place_samples_n, card_correct_n, card_samples_n = _read_counters(
+        place_loss_sum, card_loss_sum, place_correct, place_samples, card_correct, card_samples
+    )
+    loss = place_loss_n / max(1.0, place_samples_n)
+    if has_card_head:
+        loss += (card_loss_n / max(1.0, card_samples_n)) * card_loss_weight
+    return EvalResult(
+        loss=loss,
+        place_correct=int(place_correct_n),
+        place_samples=int(place_samples_n),
+        card_correct=int(card_correct_n),
+        card_samples=int(card_samples_n),
+    )
 
 
 def train_model(
@@ -403,7 +1214,31 @@ def train_model(
     resume_checkpoint: str = "",
     log_interval_steps: int = 0,
     card_loss_weight: float = 2.0,
-) -> tuple[nn.Module, torch.optim.Optimizer, TrainSummary, str | None, list[dict]]:
+    batch_pipeline: str = "prefetch",
+    profile_steps: bool = False,
+    compile_mode: str = "off",
+    precision: str = "fp32",
+    precision_ref_epochs: int = 1,
+    dp: DataParallelContext | None = None,
+    eval_batch_size: int = DEFAULT_EVAL_BATCH_SIZE,
+    checkpoint_every_steps: int = 0,
+    checkpoint_every_minutes: float = 0.0,
+    progress_checkpoint_out: str = "",
+) -> tuple[nn.Module, torch.optim.Optimizer, TrainSummary | None, str | None, list[dict]]:
+    """Train PolicyNet; with a data-parallel `dp`, non-zero ranks return no summary.
+
+    With a checkpoint interval, rank 0 periodically snapshots everything needed to
+    continue mid-epoch (weights, Adam state, RNG, split, epoch permutation and position,
+    partial epoch counters, early-stop state) and a background thread writes it to
+    `progress_checkpoint_out`. Resuming from such a file replays the remaining steps
+    exactly as the uninterrupted run would have. Whenever `progress_checkpoint_out` is
+    set, an epoch-boundary snapshot is also written after the last epoch, so a finished
+    run can be extended by resuming it with a larger `epochs`.
+
+    With a non-fp32 `precision`, rank 0 finally trains an fp32 reference for
+    `precision_ref_epochs` epochs and compares accuracy at that epoch.
+    """
+    dp = dp or DataParallelContext()
     if epochs < 1:
         raise ValueError("--epochs must be >= 1")
     if batch_size < 1:
@@ -422,9 +1257,29 @@ def train_model(
         raise ValueError("--early-stop-min-delta must be >= 0")
     if card_loss_weight <= 0:
         raise ValueError("--card-loss-weight must be > 0")
+    if eval_batch_size < 1:
+        raise ValueError("--eval-batch-size must be >= 1")
+    if precision_ref_epochs < 0:
+        raise ValueError("--precision-ref-epochs must be >= 0")
+    if checkpoint_every_steps < 0 or checkpoint_every_minutes < 0:
+        raise ValueError("--checkpoint-every-steps and --checkpoint-every-minutes must be >= 0")
+    checkpointing = checkpoint_every_steps > 0 or checkpoint_every_minutes > 0
+    if checkpointing and not (progress_checkpoint_out or "").strip():
+        raise ValueError("--checkpoint-every-steps/--checkpoint-every-minutes need --checkpoint-out or --progress-checkpoint-out")
+    if dp.enabled and checkpoint_every_minutes > 0:
+        # Ranks must all reach the counter all-reduce at the same step; wall-clock triggers cannot guarantee that.
+        raise ValueError("--checkpoint-every-minutes cannot be combined with --dp-workers > 1; use --checkpoint-every-steps")
     monitor = str(early_stop_monitor or "").strip().lower()
     if monitor not in ("val_loss", "train_loss"):
         raise ValueError("--early-stop-monitor must be val_loss or train_loss")
+    if batch_pipeline not in BATCH_PIPELINES:
+        raise ValueError(f"--batch-pipeline must be one of: {', '.join(BATCH_PIPELINES)}")
+    if compile_mode not in COMPILE_MODES:
+        raise ValueError(f"--compile must be one of: {', '.join(COMPILE_MODES)}")
+    if precision not in PRECISION_MODES:
+        raise ValueError(f"--precision must be one of: {', '.join(PRECISION_MODES)}")
+    if dp.enabled and compile_mode != "off":
+        raise ValueError("--compile cannot be combined with --dp-workers > 1")
 
     torch.manual_seed(seed)
     if device == "cuda":
@@ -432,12 +1287,19 @@ def train_model(
 
     model = PolicyNet(INPUT_DIM, hidden_size, PLACE_OUTPUT_DIM, CARD_ACTION_DIM).to(device)
     x = data.x.to(device)
-    y_place = data.y_place.to(device)
-    y_card = data.y_card.to(device)
+    place_targets, card_targets = data.targets()
+    y_place = place_targets.to(device)
+    y_card = card_targets.to(device)
+    symmetries = None
+    if data.dedupe is not None and data.dedupe.get("mode") == "dihedral":
+        # Canonical rows only cover one orientation; each batch gets a random board symmetry
+        # (features and place targets alike) so the model still sees every orientation.
+        symmetries = torch.tensor(
+            [sym + list(range(PLACE_OUTPUT_DIM, INPUT_DIM)) for sym in BOARD_SYMMETRIES], dtype=torch.long, device=device
+        )
     opt = torch.optim.Adam(model.parameters(), lr=lr)
-    loss_place_fn = nn.CrossEntropyLoss(ignore_index=IGNORE_INDEX)
-    loss_card_fn = nn.CrossEntropyLoss(ignore_index=IGNORE_INDEX) if CARD_ACTION_DIM > 0 else None
     resumed_from: str | None = None
+    progress: dict | None = None
 
     resume_path = (resume_checkpoint or "").strip()
     if resume_path:
@@ -461,7 +1323,15 @@ def train_model(
                 except Exception:
                     # Optimizer mismatch is non-fatal; keep resumed weights.
                     pass
+            progress = ckpt.get("progress")
         resumed_from = resume_path
+    if progress is not None:
+        expected = {"rows": int(x.shape[0]), "batchSize": batch_size, "worldSize": dp.world_size}
+        for key, value in expected.items():
+            if int(progress.get(key, -1)) != value:
+                raise ValueError(
+                    f"progress checkpoint does not match this run ({key}={progress.get(key)} vs {value}): {resume_path}"
+                )
 
     n = x.shape[0]
     all_perm = torch.randperm(n, device=device)
@@ -474,14 +1344,50 @@ def train_model(
         train_idx = all_perm
     if train_idx.shape[0] <= 0:
         raise ValueError("training split became empty; reduce --val-split")
-
-    x_train = x[train_idx]
-    y_place_train = y_place[train_idx]
-    y_card_train = y_card[train_idx]
-    x_val = x[val_idx] if val_idx.shape[0] > 0 else None
-    y_place_val = y_place[val_idx] if val_idx.shape[0] > 0 else None
-    y_card_val = y_card[val_idx] if val_idx.shape[0] > 0 else None
-    train_n = int(x_train.shape[0])
+    if progress is not None:
+        val_idx = progress["valIdx"].to(device)
+        train_idx = progress["trainIdx"].to(device)
+    split_val_idx, split_train_idx = val_idx, train_idx
+    requested_batch_size = batch_size
+    if dp.enabled:
+        # Every rank draws the same split from the shared seed and keeps one equal-length
+        # slice, so all ranks run the same number of steps per epoch.
+        shard_size = int(train_idx.shape[0]) // dp.world_size
+        if shard_size <= 0:
+            raise ValueError("training split is smaller than --dp-workers")
+        train_idx = train_idx[dp.rank * shard_size : (dp.rank + 1) * shard_size]
+        batch_size = max(1, batch_size // dp.world_size)
+        if not dp.is_main:
+            val_idx = val_idx[:0]
+
+    if batch_pipeline == "prefetch" and device != "cpu":
+        # Keep the training split on the host; batches are staged to the device by the prefetcher.
+        train_idx_host = train_idx.cpu()
+        x_train = data.x[train_idx_host]
+        y_place_train = place_targets[train_idx_host]
+        y_card_train = card_targets[train_idx_host]
+    else:
+        x_train = x[train_idx]
+        y_place_train = y_place[train_idx]
+        y_card_train = y_card[train_idx]
+
+    example_batch = x_train[:batch_size].to(device)
+    runner, compile_info = compile_policy_model(model, compile_mode, example_batch, precision)
+    if compile_info is not None:
+        print(
+            f"[train_policy_onnx] compile={compile_info['backend']} requested={compile_mode} "
+            f"eager_step_ms={compile_info['eagerStepMs']:.3f} compiled_step_ms={compile_info['compiledStepMs']:.3f}",
+            flush=True,
+        )
+    precision_info = benchmark_precision(runner, model, example_batch, precision) if dp.is_main else None
+    if precision_info is not None:
+        print(
+            f"[train_policy_onnx] precision={precision} fp32_step_ms={precision_info['fp32StepMs']:.3f} "
+            f"step_ms={precision_info['stepMs']:.3f}",
+            flush=True,
+        )
+    if dp.enabled:
+        runner = nn.parallel.DistributedDataParallel(model)
 
     epoch_metrics: list[dict] = []
     global_step = 0
@@ -491,89 +1397,207 @@ def train_model(
     stopped_early = False
     early_stop_epoch = None
     best_state: dict | None = None
-
-    for epoch_index in range(epochs):
-        perm = torch.randperm(train_n, device=device)
-        x_epoch = x_train[perm]
-        y_place_epoch = y_place_train[perm]
-        y_card_epoch = y_card_train[perm]
-        epoch_loss_sum = 0.0
-        epoch_samples = 0
-        epoch_place_correct = 0
-        epoch_place_samples = 0
-        epoch_card_correct = 0
-        epoch_card_samples = 0
-        for i in range(0, train_n, batch_size):
-            xb = x_epoch[i:i + batch_size]
-            yb_place = y_place_epoch[i:i + batch_size]
-            yb_card = y_card_epoch[i:i + batch_size]
-            outputs = model(xb)
+    timer = StepTimer(enabled=profile_steps, device=device)
+    start_epoch = 0
+    progress_path = (progress_checkpoint_out or "").strip()
+    writer = BackgroundCheckpointWriter(progress_path) if progress_path and dp.is_main else None
+
+    def write_progress(epoch_index: int, step_in_epoch: int, perm: torch.Tensor | None, counters: list[float]) -> None:
+        payload = {
+            "formatVersion": 1,
+            "schemaVersion": MODEL_SCHEMA_VERSION,
+            "model_state": detached_cpu_copy(model.state_dict()),
+            "optimizer_state": detached_cpu_copy(opt.state_dict()),
+            "progress": {
+                "epoch": epoch_index,
+                "epochs": epochs,
+                "stepInEpoch": step_in_epoch,
+                "globalStep": global_step,
+                "rows": int(n),
+                "batchSize": requested_batch_size,
+                "worldSize": dp.world_size,
+                "seed": seed,
+                "trainIdx": split_train_idx.cpu(),
+                "valIdx": split_val_idx.cpu(),
+                "epochPerm": perm.cpu() if perm is not None else None,
+                "epochCounters": counters,
+                "bestMonitor": best_monitor,
+                "bestEpoch": best_epoch,
+                "noImproveCount": no_improve_count,
+                "bestState": detached_cpu_copy(best_state) if best_state is not None else None,
+                "epochMetrics": list(epoch_metrics),
+                "rngState": torch.get_rng_state(),
+                "cudaRngState": torch.cuda.get_rng_state_all() if device == "cuda" else None,
+            },
+        }
+        writer.submit(payload)
+        position = (
+            f"epoch={epoch_index + 1}/{epochs} step_in_epoch={step_in_epoch}" if perm is not None else f"after_epoch={epoch_index}/{epochs}"
+        )
+        print(f"[train_policy_onnx] progress_checkpoint {position} global_step={global_step} out={writer.path}", flush=True)
+
+    if progress is not None:
+        start_epoch = int(progress["epoch"])
+        global_step = int(progress["globalStep"])
+        best_monitor = float(progress["bestMonitor"])
+        best_epoch = int(progress["bestEpoch"])
+        no_improve_count = int(progress["noImproveCount"])
+        best_state = progress.get("bestState") if dp.is_main else None
+        epoch_metrics = list(progress.get("epochMetrics") or []) if dp.is_main else []
+        torch.set_rng_state(progress["rngState"].cpu())
+        if device == "cuda" and progress.get("cudaRngState") is not None:
+            torch.cuda.set_rng_state_all([state.cpu() for state in progress["cudaRngState"]])
+        if dp.is_main:
+            position = (
+                f"epoch={start_epoch + 1}/{epochs} step_in_epoch={int(progress['stepInEpoch'])}"
+                if progress.get("epochPerm") is not None
+                else f"after_epoch={start_epoch}/{epochs}"
+            )
+            print(f"[train_policy_onnx] resumed progress {position} global_step={global_step}", flush=True)
+    last_checkpoint_at = time.perf_counter()
+    next_epoch = start_epoch
+
+    for epoch_index in range(start_epoch, epochs):
+        epoch_started = time.perf_counter()
+        timer.reset()
+        counters = [0.0] * 7
+        step_in_epoch = 0
+        if progress is not None and progress.get("epochPerm") is not None and int(progress["epoch"]) == epoch_index:
+            # Continue the interrupted epoch: same permutation, skip the finished steps.
+            perm = progress["epochPerm"].to(x_train.device)
+            step_in_epoch = int(progress["stepInEpoch"])
+            if dp.is_main:
+                counters = [float(v) for v in progress["epochCounters"]]
+        else:
+            perm = torch.randperm(int(x_train.shape[0]), device=x_train.device)
+        progress = None
+        # Accumulated on the training device and read back once per epoch. Per-head loss sums
+        # over target counts, so a deduplicated row contributes once per copy it stands for.
+        epoch_place_loss_sum = torch.tensor(counters[0], dtype=torch.float64, device=device)
+        epoch_place_correct = torch.tensor(int(counters[1]), dtype=torch.long, device=device)
+        epoch_place_samples = torch.tensor(int(counters[2]), dtype=torch.long, device=device)
+        epoch_card_correct = torch.tensor(int(counters[3]), dtype=torch.long, device=device)
+        epoch_card_samples = torch.tensor(int(counters[4]), dtype=torch.long, device=device)
+        epoch_samples = int(counters[5])
+        epoch_card_loss_sum = torch.tensor(counters[6], dtype=torch.float64, device=device)
+        batches = iter_minibatches(
+            [x_train, y_place_train, y_card_train],
+            batch_size,
+            device,
+            batch_pipeline,
+            perm=perm[step_in_epoch * batch_size :],
+        )
+        for xb, yb_place, yb_card in batches:
+            if symmetries is not None:
+                sym = symmetries[int(torch.randint(8, ()))]
+                xb = xb.index_select(1, sym)
+                yb_place = yb_place.index_select(1, sym[:PLACE_OUTPUT_DIM])
+            timer.lap("gather")
+            with autocast_context(device, precision):
+                outputs = runner(xb)
             place_logits, card_logits = _split_outputs(outputs)
-            place_loss = loss_place_fn(place_logits, yb_place)
-            loss = place_loss
-            if card_logits is not None and loss_card_fn is not None:
-                card_loss = loss_card_fn(card_logits, yb_card)
-                loss = place_loss + (card_loss * card_loss_weight)
+            # Losses are taken in fp32 even when the forward pass ran under bf16 autocast.
+            place_logits = place_logits.float()
+            card_logits = card_logits.float() if card_logits is not None else None
+            place_loss_sum = _cross_entropy_sum(place_logits, yb_place)
+            loss = _masked_mean(place_loss_sum, yb_place)
+            if card_logits is not None:
+                card_loss_sum = _cross_entropy_sum(card_logits, yb_card)
+                loss = loss + (_masked_mean(card_loss_sum, yb_card) * card_loss_weight)
+            timer.lap("forward")
             with torch.no_grad():
-                place_correct, place_samples = _accuracy_from_logits(place_logits, yb_place)
+                epoch_place_loss_sum += place_loss_sum.detach()
+                if card_logits is not None:
+                    epoch_card_loss_sum += card_loss_sum.detach()
+                place_correct, place_samples = _accuracy_counts(place_logits, yb_place)
                 epoch_place_correct += place_correct
                 epoch_place_samples += place_samples
                 if card_logits is not None:
-                    card_correct, card_samples = _accuracy_from_logits(card_logits, yb_card)
+                    card_correct, card_samples = _accuracy_counts(card_logits, yb_card)
                     epoch_card_correct += card_correct
                     epoch_card_samples += card_samples
-                batch_size_now = int(yb_place.shape[0])
-                epoch_samples += batch_size_now
-                epoch_loss_sum += float(loss.item()) * batch_size_now
+                epoch_samples += int(yb_place.shape[0])
+            timer.lap("metrics")
             opt.zero_grad(set_to_none=True)
             loss.backward()
+            timer.lap("backward")
             opt.step()
+            timer.lap("optimizer")
             global_step += 1
-            if log_interval_steps > 0 and (global_step % log_interval_steps) == 0:
+            if dp.is_main and log_interval_steps > 0 and (global_step % log_interval_steps) == 0:
+                timer.count_sync()
                 print(
                     f"[train_policy_onnx] step={global_step} epoch={epoch_index + 1}/{epochs} loss={float(loss.item()):.6f}",
                     flush=True,
                 )
-
-        train_loss = epoch_loss_sum / max(1, epoch_samples)
-        train_place_acc = epoch_place_correct / max(1, epoch_place_samples)
+                timer.lap("log")
+            step_in_epoch += 1
+            if checkpointing:
+                due = checkpoint_every_steps > 0 and (global_step % checkpoint_every_steps) == 0
+                if not due and checkpoint_every_minutes > 0:
+                    due = (time.perf_counter() - last_checkpoint_at) >= checkpoint_every_minutes * 60.0
+                if due:
+                    place_loss_n, place_correct_n, place_samples_n, card_correct_n, card_samples_n, card_loss_n = _read_counters(
+                        epoch_place_loss_sum,
+                        epoch_place_correct,
+                        epoch_place_samples,
+                        epoch_card_correct,
+                        epoch_card_samples,
+                        epoch_card_loss_sum,
+                    )
+                    snapshot = [
+                        place_loss_n, place_correct_n, place_samples_n, card_correct_n, card_samples_n, float(epoch_samples), card_loss_n
+                    ]
+                    timer.count_sync()
+                    snapshot = dp.all_reduce_sum(snapshot)
+                    if writer is not None:
+                        write_progress(epoch_index, step_in_epoch, perm, snapshot)
+                    last_checkpoint_at = time.perf_counter()
+                    timer.lap("checkpoint")
+        place_loss_n, place_correct_n, place_samples_n, card_correct_n, card_samples_n, card_loss_n = _read_counters(
+            epoch_place_loss_sum,
+            epoch_place_correct,
+            epoch_place_samples,
+            epoch_card_correct,
+            epoch_card_samples,
+            epoch_card_loss_sum,
+        )
+        timer.count_sync()
+        if dp.enabled:
+            place_loss_n, place_correct_n, place_samples_n, card_correct_n, card_samples_n, epoch_samples, card_loss_n = (
+                dp.all_reduce_sum(
+                    [place_loss_n, place_correct_n, place_samples_n, card_correct_n, card_samples_n, float(epoch_samples), card_loss_n]
+                )
+            )
+            epoch_samples = int(epoch_samples)
+        train_loop_seconds = time.perf_counter() - epoch_started
+
+        # Same per-head, per-target mean as the validation loss.
+        train_loss = place_loss_n / max(1.0, place_samples_n)
+        if card_samples_n > 0:
+            train_loss += (card_loss_n / card_samples_n) * card_loss_weight
+        train_place_acc = place_correct_n / max(1, place_samples_n)
         train_card_acc = None
-        if epoch_card_samples > 0:
-            train_card_acc = epoch_card_correct / epoch_card_samples
-        train_total_samples = epoch_place_samples + epoch_card_samples
-        train_total_correct = epoch_place_correct + epoch_card_correct
+        if card_samples_n > 0:
+            train_card_acc = card_correct_n / card_samples_n
+        train_total_samples = place_samples_n + card_samples_n
+        train_total_correct = place_correct_n + card_correct_n
         train_acc = train_total_correct / max(1, train_total_samples)
         val_loss = None
         val_acc = None
         val_place_acc = None
         val_card_acc = None
-        if (
-            x_val is not None
-            and y_place_val is not None
-            and y_card_val is not None
-            and int(y_place_val.shape[0]) > 0
-        ):
-            with torch.no_grad():
-                outputs_val = model(x_val)
-                val_place_logits, val_card_logits = _split_outputs(outputs_val)
-                val_place_loss = loss_place_fn(val_place_logits, y_place_val)
-                total_val_loss = val_place_loss
-                if val_card_logits is not None and loss_card_fn is not None:
-                    val_card_loss = loss_card_fn(val_card_logits, y_card_val)
-                    total_val_loss = val_place_loss + (val_card_loss * card_loss_weight)
-                val_loss = float(total_val_loss.item())
-
-                val_place_correct, val_place_samples = _accuracy_from_logits(val_place_logits, y_place_val)
-                val_card_correct = 0
-                val_card_samples = 0
-                if val_card_logits is not None:
-                    val_card_correct, val_card_samples = _accuracy_from_logits(val_card_logits, y_card_val)
-                val_place_acc = val_place_correct / max(1, val_place_samples)
-                if val_card_samples > 0:
-                    val_card_acc = val_card_correct / max(1, val_card_samples)
-                val_total_samples = val_place_samples + val_card_samples
-                val_total_correct = val_place_correct + val_card_correct
-                val_acc = val_total_correct / max(1, val_total_samples)
+        if int(val_idx.shape[0]) > 0:
+            val_result = evaluate_policy(
+                model, x, y_place, y_card, device, eval_batch_size, idx=val_idx, card_loss_weight=card_loss_weight
+            )
+            val_loss = val_result.loss
+            val_place_acc = val_result.place_correct / max(1, val_result.place_samples)
+            if val_result.card_samples > 0:
+                val_card_acc = val_result.card_correct / val_result.card_samples
+            val_total_samples = val_result.place_samples + val_result.card_samples
+            val_total_correct = val_result.place_correct + val_result.card_correct
+            val_acc = val_total_correct / max(1, val_total_samples)
 
         monitor_value = train_loss
         if monitor == "val_loss" and val_loss is not None:
@@ -584,9 +1608,24 @@ def train_model(
             best_monitor = monitor_value
             best_epoch = epoch_index + 1
             no_improve_count = 0
-            best_state = {k: v.detach().cpu().clone() for k, v in model.state_dict().items()}
+            if dp.is_main:
+                # Kept on the training device and refreshed in place, so an improvement
+                # costs a device-side copy instead of a synchronous transfer to the host.
+                if best_state is None:
+                    best_state = {k: v.detach().clone() for k, v in model.state_dict().items()}
+                else:
+                    for k, v in model.state_dict().items():
+                        best_state[k].copy_(v)
         else:
             no_improve_count += 1
+        next_epoch = epoch_index + 1
+        epoch_seconds = time.perf_counter() - epoch_started
+        # Rank 0 owns validation, so its early-stop decision is authoritative for every rank.
+        stop_now = dp.broadcast_flag(early_stop_patience > 0 and no_improve_count >= early_stop_patience)
+        if not dp.is_main:
+            if stop_now:
+                break
+            continue
 
         epoch_metrics.append(
             {
@@ -608,6 +1647,11 @@ def train_model(
                 "bestEpoch": best_epoch,
                 "noImproveCount": no_improve_count,
                 "cardLossWeight": card_loss_weight,
+                "batchPipeline": batch_pipeline,
+                "precision": precision,
+                "epochSeconds": epoch_seconds,
+                "samplesPerSec": epoch_samples / train_loop_seconds if train_loop_seconds > 0 else None,
+                "stepTiming": timer.summary(epoch_samples, train_loop_seconds),
             }
         )
 
@@ -630,7 +1674,7 @@ def train_model(
         parts.append(f"monitor_value={monitor_value:.6f}")
         print(" ".join(parts), flush=True)
 
-        if early_stop_patience > 0 and no_improve_count >= early_stop_patience:
+        if stop_now:
             stopped_early = True
             early_stop_epoch = epoch_index + 1
             print(
@@ -640,6 +1684,19 @@ def train_model(
             )
             break
 
+    if not dp.is_main:
+        return model, opt, None, resumed_from, epoch_metrics
+
+    if writer is not None:
+        if next_epoch > start_epoch:
+            write_progress(next_epoch, 0, None, [0.0] * 7)
+        writer.wait()
+        if writer.writes:
+            print(
+                f"[train_policy_onnx] progress_checkpoints={writer.writes} "
+                f"last_write_ms={writer.last_write_seconds * 1000.0:.1f} out={writer.path}",
+                flush=True,
+            )
     if best_state is not None:
         model.load_state_dict(best_state)
     if epoch_metrics:
@@ -648,15 +1705,10 @@ def train_model(
         epoch_metrics[-1]["bestEpoch"] = best_epoch
         epoch_metrics[-1]["bestMonitor"] = best_monitor
 
-    with torch.no_grad():
-        outputs_all = model(x)
-        place_logits_all, card_logits_all = _split_outputs(outputs_all)
-        place_correct_all, place_samples_all = _accuracy_from_logits(place_logits_all, y_place)
-        card_correct_all = 0
-        card_samples_all = 0
-        if card_logits_all is not None:
-            card_correct_all, card_samples_all = _accuracy_from_logits(card_logits_all, y_card)
-
+    # Summary accuracy is measured in fp32, matching the exported ONNX model.
+    final_result = evaluate_policy(model, x, y_place, y_card, device, eval_batch_size)
+    place_correct_all, place_samples_all = final_result.place_correct, final_result.place_samples
+    card_correct_all, card_samples_all = final_result.card_correct, final_result.card_samples
     place_acc_all = place_correct_all / max(1, place_samples_all)
     card_acc_all = None
     if card_samples_all > 0:
@@ -664,6 +1716,31 @@ def train_model(
     total_samples_all = place_samples_all + card_samples_all
     total_correct_all = place_correct_all + card_correct_all
     overall_acc = total_correct_all / max(1, total_samples_all)
+    ref_epochs = min(precision_ref_epochs, epoch_metrics[-1]["epoch"]) if epoch_metrics else 0
+    if precision_info is not None and ref_epochs > 0:
+        print(f"[train_policy_onnx] precision_ref=fp32 epochs={ref_epochs}", flush=True)
+        _, _, _, _, ref_metrics = train_model(
+            data=data,
+            epochs=ref_epochs,
+            batch_size=requested_batch_size,
+            lr=lr,
+            hidden_size=hidden_size,
+            device=device,
+            seed=seed,
+            val_split=val_split,
+            early_stop_monitor=monitor,
+            card_loss_weight=card_loss_weight,
+            batch_pipeline=batch_pipeline,
+            precision="fp32",
+            eval_batch_size=eval_batch_size,
+        )
+        compare_precision_accuracy(precision_info, epoch_metrics, ref_metrics)
+        print(
+            f"[train_policy_onnx] precision={precision} epoch={ref_epochs} {precision_info['accMetric']}="
+            f"{precision_info['acc'] if precision_info['acc'] is not None else float('nan'):.4f} "
+            f"fp32_{precision_info['accMetric']}={precision_info['fp32Acc']:.4f}",
+            flush=True,
+        )
 
     summary = TrainSummary(
         overall_acc=overall_acc,
@@ -671,11 +1748,116 @@ def train_model(
         card_acc=card_acc_all,
         place_samples=place_samples_all,
         card_samples=card_samples_all,
+        compile=compile_info,
+        precision=precision_info,
     )
     return model, opt, summary, resumed_from, epoch_metrics
 
 
-def export_onnx(model: nn.Module, onnx_out: str) -> None:
+def write_shared_dataset(data: DatasetBundle, path: str) -> None:
+    torch.save(
+        {
+            "x": data.x,
+            "y_place": data.y_place,
+            "y_card": data.y_card,
+            "place_hist": data.place_hist,
+            "card_hist": data.card_hist,
+            "dedupe": data.dedupe,
+            "records_read": data.records_read,
+            "train_records": data.train_records,
+            "place_records": data.place_records,
+            "card_records": data.card_records,
+        },
+        path,
+    )
+
+
+def load_shared_dataset(path: str) -> DatasetBundle:
+    # Memory-mapped: each data-parallel worker only pages in the rows of its own slice.
+    payload = torch.load(path, mmap=True, weights_only=True)
+    return DatasetBundle(
+        x=payload["x"],
+        y_place=payload["y_place"],
+        y_card=payload["y_card"],
+        records_read=int(payload.get("records_read", 0)),
+        train_records=int(payload.get("train_records", payload["x"].shape[0])),
+        place_records=int(payload.get("place_records", 0)),
+        card_records=int(payload.get("card_records", 0)),
+        place_hist=payload.get("place_hist"),
+        card_hist=payload.get("card_hist"),
+        dedupe=payload.get("dedupe"),
+    )
+
+
+def _dp_worker(rank: int, world_size: int, init_method: str, dataset_path: str, num_threads: int, train_kwargs: dict) -> None:
+    torch.set_num_threads(num_threads)
+    dist.init_process_group("gloo", init_method=init_method, rank=rank, world_size=world_size)
+    try:
+        train_model(data=load_shared_dataset(dataset_path), dp=DataParallelContext(rank, world_size), **train_kwargs)
+    finally:
+        dist.destroy_process_group()
+
+
+def train_model_data_parallel(
+    data: DatasetBundle,
+    workers: int,
+    threads: int,
+    **train_kwargs,
+) -> tuple[nn.Module, torch.optim.Optimizer, TrainSummary, str | None, list[dict]]:
+    """Run `train_model` as rank 0 of a local gloo group and spawn ranks 1..workers-1.
+
+    The dataset is written once to a temporary file that workers memory-map, and the
+    process group rendezvous through a file in the same directory, so no network
+    service is needed. Only rank 0 returns a summary and owns all outputs.
+    """
+    if workers < 2:
+        raise ValueError("--dp-workers must be >= 2 for data-parallel training")
+    if train_kwargs.get("device") != "cpu":
+        raise ValueError("--dp-workers > 1 requires --device cpu")
+    if train_kwargs.get("compile_mode", "off") != "off":
+        raise ValueError("--compile cannot be combined with --dp-workers > 1")
+    if threads <= 0:
+        threads = max(1, (os.cpu_count() or 1) // workers)
+
+    with tempfile.TemporaryDirectory(prefix="train_policy_onnx_dp_") as tmp_dir:
+        dataset_path = os.path.join(tmp_dir, "dataset.pt")
+        write_shared_dataset(data, dataset_path)
+        init_method = Path(tmp_dir, "rendezvous").as_uri()
+        ctx = mp.get_context("spawn")
+        procs = [
+            ctx.Process(
+                target=_dp_worker,
+                args=(rank, workers, init_method, dataset_path, threads, train_kwargs),
+                daemon=True,
+            )
+            for rank in range(1, workers)
+        ]
+        for proc in procs:
+            proc.start()
+        previous_threads = torch.get_num_threads()
+        torch.set_num_threads(threads)
+        print(f"[train_policy_onnx] dp_workers={workers} threads_per_worker={threads} backend=gloo", flush=True)
+        try:
+            dist.init_process_group("gloo", init_method=init_method, rank=0, world_size=workers)
+            try:
+                result = train_model(data=data, dp=DataParallelContext(0, workers), **train_kwargs)
+            finally:
+                dist.destroy_process_group()
+        except BaseException:
+            for proc in procs:
+                proc.terminate()
+            raise
+        finally:
+            torch.set_num_threads(previous_threads)
+            for proc in procs:
+                proc.join()
+        failed = [f"rank{rank}={proc.exitcode}" for rank, proc in enumerate(procs, start=1) if proc.exitcode != 0]
+        if failed:
+            raise RuntimeError(f"data-parallel workers failed: {', '.join(failed)}")
+    return result
+
+
+def export_onnx(model: nn.Module, onnx_out: str, static_batch: bool = False) -> None:
     os.makedirs(os.path.dirname(onnx_out) or ".", exist_ok=True)
     model.eval()
     dummy = torch.zeros((1, INPUT_DIM), dtype=torch.float32)
@@ -688,6 +1870,9 @@ def export_onnx(model: nn.Module, onnx_out: str) -> None:
     if CARD_ACTION_DIM > 0:
         output_names.append("card_logits")
         dynamic_axes["card_logits"] = {0: "batch"}
+    if static_batch:
+        # Fixed batch=1 graph for single-position inference.
+        dynamic_axes = None
 
     torch.onnx.export(
         model.cpu(),
@@ -706,6 +1891,7 @@ def write_meta(
     data: DatasetBundle,
     train_summary: TrainSummary,
     device: str,
+    follow: dict | None = None,
 ) -> None:
     feature_spec = [
         "board_8x8_perspective_flat",
@@ -749,8 +1935,16 @@ def write_meta(
             "earlyStopMinDelta": args.early_stop_min_delta,
             "earlyStopMonitor": args.early_stop_monitor,
             "cardLossWeight": args.card_loss_weight,
+            "batchPipeline": args.batch_pipeline,
+            "compile": train_summary.compile,
+            "precision": args.precision,
+            "precisionReport": train_summary.precision,
+            "dpWorkers": int(args.dp_workers),
+            "evalBatchSize": int(args.eval_batch_size),
+            "dedupe": data.dedupe,
             "resumeCheckpoint": (args.resume_checkpoint or "").strip() or None,
             "checkpointOut": (args.checkpoint_out or "").strip() or None,
+            "follow": follow,
         },
         "stats": {
             "recordsRead": data.records_read,
@@ -778,6 +1972,7 @@ def maybe_write_checkpoint(
     train_summary: TrainSummary,
     device: str,
     resumed_from: str | None,
+    writer: ArtifactWriter | None = None,
 ) -> None:
     out = (checkpoint_out or "").strip()
     if not out:
@@ -825,7 +2020,116 @@ def maybe_write_checkpoint(
             "trainCardSamples": int(train_summary.card_samples),
         },
     }
-    torch.save(payload, out)
+    if writer is None:
+        save_atomic(payload, out)
+        return
+    # Host copies decouple the background write from later use of the live tensors.
+    snapshot = detached_cpu_copy(payload)
+    writer.submit("checkpoint", out, lambda tmp_path: torch.save(snapshot, tmp_path))
+
+
+def progress_checkpoint_path(args: argparse.Namespace) -> str:
+    explicit = (args.progress_checkpoint_out or "").strip()
+    if explicit:
+        return explicit
+    out = (args.checkpoint_out or "").strip()
+    if not out or (int(args.checkpoint_every_steps) <= 0 and float(args.checkpoint_every_minutes) <= 0):
+        return ""
+    stem = out[: -len(".pt")] if out.endswith(".pt") else out
+    stem = stem[: -len(".checkpoint")] if stem.endswith(".checkpoint") else stem
+    return stem + ".progress.checkpoint.pt"
+
+
+def onnx_file_bytes(onnx_out: str) -> int:
+    """Size of an exported model plus its `.data` weights sidecar when present."""
+    sidecar = onnx_out + ".data"
+    return os.path.getsize(onnx_out) + (os.path.getsize(sidecar) if os.path.exists(sidecar) else 0)
+
+
+def export_onnx_atomic(model: nn.Module, onnx_out: str) -> None:
+    """Export into a temp dir next to `onnx_out` and rename into place, weights sidecar first."""
+    out_dir = os.path.dirname(onnx_out) or "."
+    os.makedirs(out_dir, exist_ok=True)
+    name = os.path.basename(onnx_out)
+    with tempfile.TemporaryDirectory(prefix=".export-", dir=out_dir) as tmp_dir:
+        export_onnx(model, os.path.join(tmp_dir, name))
+        for one in sorted(os.listdir(tmp_dir), key=lambda n: n == name):
+            os.replace(os.path.join(tmp_dir, one), os.path.join(out_dir, one))
+
+
+def follow_training(
+    args: argparse.Namespace,
+    device: str,
+    meta_out: str,
+    run_training: Callable[[DatasetBundle, str], tuple],
+) -> tuple[DatasetBundle, tuple, dict]:
+    """Train in rounds on completed games tailed from growing shards (`--follow`).
+
+    New games are featurized (and added to the policy-table aggregate) as they arrive.
+    Each snapshot round continues from the previous round's weights and Adam state for
+    `--epochs` epochs over everything seen so far, then replaces the ONNX model, meta,
+    metrics and table through temp files. Returns the last round's data and training
+    result; `main` writes the final outputs from them as in a regular run.
+    """
+    builder = DatasetBuilder(str(args.dedupe or "off").strip().lower())
+    table = policy_table.PolicyTableAggregator(float(args.shape_immediate)) if (args.policy_table_out or "").strip() else None
+    state: dict = {"rounds": 0, "games": 0, "trained_records": -1, "data": None, "result": None, "metrics": []}
+
+    with tempfile.TemporaryDirectory(prefix="policy-follow-") as tmp_dir:
+        round_checkpoint = (args.checkpoint_out or "").strip() or os.path.join(tmp_dir, "round.checkpoint.pt")
+
+        def follow_info() -> dict:
+            return {"rounds": state["rounds"], "games": state["games"], "input": args.input}
+
+        def on_games(games: list[list[dict]]) -> None:
+            for game in games:
+                for rec in game:
+                    builder.add(rec)
+                    if table is not None:
+                        table.add(rec)
+            state["games"] += len(games)
+
+        def train_round() -> None:
+            data = builder.bundle()
+            resume = round_checkpoint if state["rounds"] else str(args.resume_checkpoint or "")
+            model, optimizer, summary, resumed_from, metrics = run_training(data, resume)
+            state["rounds"] += 1
+            for entry in metrics:
+                entry["followRound"] = state["rounds"]
+            state["metrics"].extend(metrics)
+            maybe_write_checkpoint(round_checkpoint, model, optimizer, args, data, summary, device, resumed_from)
+            state.update(
+                data=data,
+                result=(model, optimizer, summary, resumed_from, state["metrics"]),
+                trained_records=builder.records_read,
+            )
+
+        def on_snapshot() -> None:
+            if builder.train_records <= 0:
+                return
+            train_round()
+            data = state["data"]
+            model, _, summary, _, _ = state["result"]
+            export_onnx_atomic(model, args.onnx_out)
+            tmp_meta = f"{meta_out}.tmp-{os.getpid()}"
+            write_meta(tmp_meta, args, data, summary, device, follow_info())
+            os.replace(tmp_meta, meta_out)
+            maybe_write_metrics(str(args.metrics_out or ""), state["metrics"])
+            if table is not None:
+                policy_table.write_model(table.stream(int(args.min_visits)), args.policy_table_out, args.compact_table)
+            print(
+                f"[train_policy_onnx] follow_snapshot round={state['rounds']} games={state['games']} "
+                f"records={data.records_read} train_records={data.train_records} "
+                f"train_acc={summary.overall_acc:.3f} onnx={args.onnx_out}",
+                flush=True,
+            )
+
+        ndjson_follow.follow_games(args, on_games, on_snapshot, "train_policy_onnx")
+        if builder.records_read != state["trained_records"]:
+            train_round()
+    if table is not None:
+        policy_table.write_model(table.stream(int(args.min_visits)), args.policy_table_out, args.compact_table)
+    return state["data"], state["result"], follow_info()
 
 
 def maybe_write_metrics(metrics_out: str, metrics: list[dict]) -> None:
@@ -839,20 +2143,107 @@ def maybe_write_metrics(metrics_out: str, metrics: list[dict]) -> None:
             f.write("\n")
 
 
-def maybe_write_policy_table(args: argparse.Namespace) -> None:
-    out = (args.policy_table_out or "").strip()
-    if not out:
-        return
+class BackgroundPolicyTable:
+    """Aggregates the compatibility policy table on a thread, fed by the ingestion pass.
+
+    `load_dataset` hands every parsed record to `submit`; records travel in chunks and
+    aggregation keeps running while the network trains. `result` waits for the aggregate
+    and returns a streamed model (see `policy_table.dump_model`).
+    Ingestion blocks once `max_buffered_records` records are queued (0 = unbounded).
+
+    The aggregator is pure Python and shares the GIL with ingestion and the training
+    loop, so it only overlaps with the parts of training that release the GIL (torch
+    kernels); it saves the separate second pass, not CPU time.
+    """
+
+    CHUNK_RECORDS = 1024
+
+    def __init__(self, min_visits: int, shape_immediate: float, max_buffered_records: int = 0):
+        self._shape_immediate = float(shape_immediate)
+        max_chunks = -(-max_buffered_records // self.CHUNK_RECORDS) if max_buffered_records > 0 else 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_chunks)
+        self._chunk: list[dict] = []
+        self._min_visits = int(min_visits)
+        self._aggregator: policy_table.PolicyTableAggregator | None = None
+        self._error: BaseException | None = None
+        self.seconds: float | None = None
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _records(self) -> Iterator[dict]:
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                return
+            yield from chunk
+
+    def _run(self) -> None:
+        try:
+            self._aggregator = policy_table.aggregate(self._records(), self._shape_immediate)
+        except BaseException as exc:  # surfaced by result()
+            self._error = exc
+            # Keep draining so a bounded queue never blocks the ingestion pass.
+            while self._queue.get() is not None:
+                pass
+        self.seconds = time.perf_counter() - self._started
+
+    def submit(self, rec: dict) -> None:
+        self._chunk.append(rec)
+        if len(self._chunk) >= self.CHUNK_RECORDS:
+            self._queue.put(self._chunk)
+            self._chunk = []
+
+    def close(self) -> None:
+        if self._chunk:
+            self._queue.put(self._chunk)
+            self._chunk = []
+        self._queue.put(None)
+
+    def result(self) -> dict:
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        return self._aggregator.stream(self._min_visits)
+
+
+def validate_policy_table_args(args: argparse.Namespace) -> bool:
+    """Return whether a policy table should be written."""
+    if not (args.policy_table_out or "").strip():
+        return False
     if args.min_visits < 1:
         raise ValueError("--min-visits must be >= 1")
     if args.shape_immediate < 0 or args.shape_immediate > 1:
         raise ValueError("--shape-immediate must be in [0,1]")
+    if int(args.policy_table_buffer) < 0:
+        raise ValueError("--policy-table-buffer must be >= 0")
+    return True
 
-    policy_table._TRAINING_CONTEXT["shape_immediate"] = float(args.shape_immediate)
-    model = policy_table.train(policy_table.iter_ndjson(args.input), int(args.min_visits))
-    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
-    with open(out, "w", encoding="utf-8") as f:
-        json.dump(model, f, ensure_ascii=False, indent=2)
+
+def maybe_write_policy_table(
+    args: argparse.Namespace, builder: BackgroundPolicyTable | None, writer: ArtifactWriter | None = None
+) -> None:
+    out = (args.policy_table_out or "").strip()
+    if not out or builder is None:
+        return
+    wait_started = time.perf_counter()
+
+    def write(path: str) -> None:
+        model = builder.result()
+        wait_seconds = time.perf_counter() - wait_started
+        with open(path, "w", encoding="utf-8") as f:
+            policy_table.dump_model(model, f, args.compact_table)
+        print(
+            f"[train_policy_onnx] policy_table_aggregate_seconds={builder.seconds:.2f} "
+            f"wait_after_training_seconds={wait_seconds:.2f}",
+            flush=True,
+        )
+
+    if writer is None:
+        os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+        write(out)
+        return
+    writer.submit("policy_table", out, write)
 
 
 def main() -> int:
@@ -860,9 +2251,48 @@ def main() -> int:
     device = choose_device(str(args.device).strip().lower())
     meta_out = args.meta_out or (args.onnx_out + ".meta.json")
 
-    data = load_dataset(args.input)
-    model, optimizer, train_summary, resumed_from, epoch_metrics = train_model(
-        data=data,
+    export_tools.validate_onnx_check_args(args)
+    export_tools.validate_export_variant_args(args)
+    export_tools.validate_quantize_args(args)
+    student_distill.validate_student_args(args)
+    write_table = validate_policy_table_args(args)
+    follow = ndjson_follow.validate_follow_args(args)
+    if follow:
+        if (args.artifact_cache_dir or "").strip():
+            raise ValueError("--artifact-cache-dir cannot be combined with --follow")
+        if int(args.checkpoint_every_steps) > 0 or float(args.checkpoint_every_minutes) > 0:
+            raise ValueError("--follow cannot be combined with --checkpoint-every-steps/--checkpoint-every-minutes")
+
+    stage_outputs = {
+        "onnx_out": args.onnx_out,
+        "meta_out": meta_out,
+        "policy_table_out": args.policy_table_out,
+        "checkpoint_out": args.checkpoint_out,
+        "progress_checkpoint_out": progress_checkpoint_path(args),
+        "metrics_out": args.metrics_out,
+        "quantize_out": args.quantize_out,
+        "student_manifest_out": args.student_manifest_out,
+    }
+    sibling_prefix = os.path.splitext(args.onnx_out)[0] + "."
+    cache = artifact_cache.open_stage_cache(
+        args,
+        "train_policy_onnx",
+        inputs={"input": args.input, "resume_checkpoint": args.resume_checkpoint},
+        outputs=tuple(stage_outputs),
+        extra={"torch": torch.__version__, "device": str(device)},
+    )
+    if cache is not None:
+        report = cache.restore(stage_outputs, sibling_prefix)
+        if report is not None:
+            artifact_cache.log_report("train_policy_onnx", report, str(args.metrics_out or ""))
+            print(f"[train_policy_onnx] onnx={args.onnx_out}")
+            print(f"[train_policy_onnx] meta={meta_out}")
+            return 0
+
+    dp_workers = int(args.dp_workers)
+    if dp_workers < 1:
+        raise ValueError("--dp-workers must be >= 1")
+    train_kwargs = dict(
         epochs=int(args.epochs),
         batch_size=int(args.batch_size),
         lr=float(args.lr),
@@ -876,10 +2306,57 @@ def main() -> int:
         resume_checkpoint=str(args.resume_checkpoint or ""),
         log_interval_steps=int(args.log_interval_steps),
         card_loss_weight=float(args.card_loss_weight),
+        batch_pipeline=str(args.batch_pipeline or "").strip().lower(),
+        profile_steps=bool(args.profile_steps),
+        compile_mode=str(args.compile or "").strip().lower(),
+        precision=str(args.precision or "").strip().lower(),
+        precision_ref_epochs=int(args.precision_ref_epochs),
+        eval_batch_size=int(args.eval_batch_size),
+        checkpoint_every_steps=int(args.checkpoint_every_steps),
+        checkpoint_every_minutes=float(args.checkpoint_every_minutes),
+        progress_checkpoint_out=progress_checkpoint_path(args),
+    )
+
+    def run_training(data: DatasetBundle, resume_checkpoint: str) -> tuple:
+        kwargs = dict(train_kwargs, resume_checkpoint=resume_checkpoint)
+        if dp_workers > 1:
+            return train_model_data_parallel(data, dp_workers, int(args.dp_threads), **kwargs)
+        return train_model(data=data, **kwargs)
+
+    table_builder = None
+    if follow:
+        data, (model, optimizer, train_summary, resumed_from, epoch_metrics), follow_info = follow_training(
+            args, device, meta_out, run_training
+        )
+    else:
+        if write_table:
+            table_builder = BackgroundPolicyTable(
+                int(args.min_visits), float(args.shape_immediate), int(args.policy_table_buffer)
+            )
+        data = load_dataset(
+            args.input,
+            str(args.dedupe or "off").strip().lower(),
+            record_sink=table_builder.submit if table_builder is not None else None,
+        )
+        if table_builder is not None:
+            table_builder.close()
+        if data.dedupe is not None:
+            print(
+                f"[train_policy_onnx] dedupe={data.dedupe['mode']} records={data.dedupe['records']} "
+                f"unique_rows={data.dedupe['uniqueRows']} ratio={data.dedupe['ratio']:.3f}",
+                flush=True,
+            )
+        follow_info = None
+        model, optimizer, train_summary, resumed_from, epoch_metrics = run_training(data, train_kwargs["resume_checkpoint"])
+    # Table, meta, metrics and checkpoint are written in the background while the model
+    # is exported and checked here; the meta must land before the checks update it.
+    writer = ArtifactWriter()
+    maybe_write_policy_table(args, table_builder, writer)
+    meta_written = writer.submit(
+        "meta", meta_out, lambda path: write_meta(path, args, data, train_summary, device, follow_info)
     )
-    export_onnx(model, args.onnx_out)
-    write_meta(meta_out, args, data, train_summary, device)
-    maybe_write_metrics(str(args.metrics_out or ""), epoch_metrics)
+    if (args.metrics_out or "").strip():
+        writer.submit("metrics", args.metrics_out, write_jsonl_file(epoch_metrics))
     maybe_write_checkpoint(
         checkpoint_out=str(args.checkpoint_out or ""),
         model=model,
@@ -889,8 +2366,38 @@ def main() -> int:
         train_summary=train_summary,
         device=device,
         resumed_from=resumed_from,
+        writer=writer,
     )
-    maybe_write_policy_table(args)
+    export_started = time.perf_counter()
+    export_onnx_atomic(model, args.onnx_out)
+    writer.record("onnx", args.onnx_out, time.perf_counter() - export_started, onnx_file_bytes(args.onnx_out))
+    meta_written.result()
+    export_tools.maybe_check_onnx_export(args, model, args.onnx_out, meta_out, data.x, "train_policy_onnx")
+    export_tools.maybe_write_export_variants(args, model, args.onnx_out, meta_out, data.x, export_onnx, "train_policy_onnx")
+    export_tools.maybe_quantize_onnx(args, args.onnx_out, meta_out, data.x, "train_policy_onnx")
+    student_distill.maybe_distill_students(
+        args,
+        model,
+        args.onnx_out,
+        meta_out,
+        data.x,
+        make_student=lambda hidden, layers: PolicyNet(INPUT_DIM, hidden, PLACE_OUTPUT_DIM, CARD_ACTION_DIM, num_layers=layers),
+        eval_fn=lambda student, idx: evaluate_policy(
+            student, data.x, *data.targets(), device, int(args.eval_batch_size), idx=idx
+        ),
+        export_fn=export_onnx,
+        device=device,
+        log_prefix="train_policy_onnx",
+    )
+    try:
+        artifacts = writer.wait()
+    finally:
+        writer.close()
+    log_artifact_report(artifacts, writer.wall_seconds, "train_policy_onnx")
+    if cache is not None:
+        artifact_cache.log_report(
+            "train_policy_onnx", cache.store(stage_outputs, sibling_prefix), str(args.metrics_out or "")
+        )
 
     card_acc_text = (
         f" train_card_acc={train_summary.card_acc:.3f}"
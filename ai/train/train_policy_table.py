@@ -8,11 +8,15 @@ import datetime as dt
 import json
 import os
 from dataclasses import dataclass
-from typing import Dict, Iterable, Tuple
+from typing import Callable, Dict, Iterable, Iterator, TextIO, Tuple
+
+import artifact_cache
+import ndjson_follow
 
 
 MODEL_SCHEMA_VERSION = "policy_table.v2"
 NORMALIZATION = "dihedral8_minlex"
+STATE_SECTIONS = ("states", "abstractStates")
 
 
 @dataclass
@@ -155,11 +159,22 @@ def build_abstract_state_key(rec: dict) -> str:
     legal_moves = int(rec.get("legalMoves", 0) or 0)
     board_raw = rec.get("board", "")
     canonical_board, _ = canonicalize_board(board_raw)
-    empties = _count_empties(canonical_board)
+    return abstract_state_key(
+        player,
+        pending,
+        legal_moves,
+        _count_empties(canonical_board),
+        _disc_diff_from_player(canonical_board, player),
+        _corner_diff_from_player(canonical_board, player),
+    )
+
+
+def abstract_state_key(player: str, pending: str, legal_moves: int, empties: int, disc_diff: int, corner_diff: int) -> str:
+    """Abstract key from board counts; all of them are the same for every board symmetry."""
     phase = "opening" if empties >= 44 else ("mid" if empties >= 16 else "end")
     mobility_bucket = _to_bucket(legal_moves, [0, 2, 4, 6, 10, 20])
-    disc_diff_bucket = _to_bucket(_disc_diff_from_player(canonical_board, player), [-20, -10, -4, 0, 4, 10, 20])
-    corner_diff_bucket = _to_bucket(_corner_diff_from_player(canonical_board, player), [-4, -2, -1, 0, 1, 2, 4])
+    disc_diff_bucket = _to_bucket(disc_diff, [-20, -10, -4, 0, 4, 10, 20])
+    corner_diff_bucket = _to_bucket(corner_diff, [-4, -2, -1, 0, 1, 2, 4])
     return f"{player}|{pending}|{phase}|mob:{mobility_bucket}|disc:{disc_diff_bucket}|corner:{corner_diff_bucket}"
 
 
@@ -220,49 +235,85 @@ def choose_best_action(action_map: Dict[str, ActionStat]) -> Tuple[str, ActionSt
     return best_key, best_stat
 
 
-def _materialize_states(table: Dict[str, Dict[str, ActionStat]], min_visits: int) -> tuple[dict, int]:
-    states = {}
-    kept_states = 0
+def _state_entry(action_map: Dict[str, ActionStat], total_visits: int) -> dict:
+    best_key, best_stat = choose_best_action(action_map)
+    return {
+        "visits": total_visits,
+        "bestAction": best_key,
+        "bestActionVisits": best_stat.visits,
+        "bestActionAvgOutcome": best_stat.avg_outcome,
+        "actions": {
+            key: {
+                "visits": value.visits,
+                "avgOutcome": value.avg_outcome,
+            }
+            for key, value in action_map.items()
+        },
+    }
+
+
+def _iter_states(table: Dict[str, Dict[str, ActionStat]], min_visits: int) -> Iterator[tuple[str, dict]]:
     for state_key, action_map in table.items():
         total_visits = sum(v.visits for v in action_map.values())
         if total_visits < min_visits:
             continue
-        best_key, best_stat = choose_best_action(action_map)
-        states[state_key] = {
-            "visits": total_visits,
-            "bestAction": best_key,
-            "bestActionVisits": best_stat.visits,
-            "bestActionAvgOutcome": best_stat.avg_outcome,
-            "actions": {
-                key: {
-                    "visits": value.visits,
-                    "avgOutcome": value.avg_outcome,
-                }
-                for key, value in action_map.items()
-            },
-        }
-        kept_states += 1
-    return states, kept_states
+        yield state_key, _state_entry(action_map, total_visits)
 
 
-def train(records: Iterable[dict], min_visits: int) -> dict:
-    table: Dict[str, Dict[str, ActionStat]] = {}
-    abstract_table: Dict[str, Dict[str, ActionStat]] = {}
-    lines = 0
-    skipped = 0
-    positive = 0
+def _count_kept(table: Dict[str, Dict[str, ActionStat]], min_visits: int) -> int:
+    return sum(1 for action_map in table.values() if sum(v.visits for v in action_map.values()) >= min_visits)
 
-    for rec in records:
-        lines += 1
+
+def _materialize_states(table: Dict[str, Dict[str, ActionStat]], min_visits: int) -> tuple[dict, int]:
+    states = dict(_iter_states(table, min_visits))
+    return states, len(states)
+
+
+class StateStream:
+    """A `states` section whose entries are produced one at a time while the table is written.
+
+    `write_model` serializes it exactly like the equivalent dict, so a table with millions
+    of states never holds more than one materialized entry next to the aggregate.
+    """
+
+    def __init__(self, factory: Callable[[], Iterable[tuple[str, dict]]], count: int):
+        self._factory = factory
+        self.count = count
+
+    def items(self) -> Iterable[tuple[str, dict]]:
+        return self._factory()
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class PolicyTableAggregator:
+    """Running per-state action statistics; `build` materializes a table at any point.
+
+    `shape_immediate` defaults to the module-wide `_TRAINING_CONTEXT` value.
+    """
+
+    def __init__(self, shape_immediate: float | None = None):
+        if shape_immediate is None:
+            shape_immediate = _TRAINING_CONTEXT["shape_immediate"]
+        self.shape_immediate = float(shape_immediate)
+        self.table: Dict[str, Dict[str, ActionStat]] = {}
+        self.abstract_table: Dict[str, Dict[str, ActionStat]] = {}
+        self.lines = 0
+        self.skipped = 0
+        self.positive = 0
+
+    def add(self, rec: dict) -> None:
+        self.lines += 1
         outcome = rec.get("outcome")
         if outcome is None:
-            skipped += 1
-            continue
-        target = compute_training_target(rec, float(outcome), _TRAINING_CONTEXT["shape_immediate"])
+            self.skipped += 1
+            return
+        target = compute_training_target(rec, float(outcome), self.shape_immediate)
 
         state_key, transform_id = build_state_key(rec)
         action_key = build_action_key(rec, transform_id)
-        state_actions = table.setdefault(state_key, {})
+        state_actions = self.table.setdefault(state_key, {})
         stat = state_actions.get(action_key)
         if stat is None:
             stat = ActionStat()
@@ -271,7 +322,7 @@ def train(records: Iterable[dict], min_visits: int) -> dict:
 
         abstract_state_key = build_abstract_state_key(rec)
         abstract_action_key = build_abstract_action_key(rec)
-        abs_actions = abstract_table.setdefault(abstract_state_key, {})
+        abs_actions = self.abstract_table.setdefault(abstract_state_key, {})
         abs_stat = abs_actions.get(abstract_action_key)
         if abs_stat is None:
             abs_stat = ActionStat()
@@ -279,29 +330,97 @@ def train(records: Iterable[dict], min_visits: int) -> dict:
         abs_stat.add(target)
 
         if float(outcome) > 0:
-            positive += 1
+            self.positive += 1
+
+    def _model(self, min_visits: int, states, abstract_states) -> dict:
+        return {
+            "schemaVersion": MODEL_SCHEMA_VERSION,
+            "normalization": NORMALIZATION,
+            "createdAt": dt.datetime.utcnow().isoformat() + "Z",
+            "stats": {
+                "recordsRead": self.lines,
+                "recordsSkipped": self.skipped,
+                "statesRaw": len(self.table),
+                "statesKept": len(states),
+                "abstractStatesRaw": len(self.abstract_table),
+                "abstractStatesKept": len(abstract_states),
+                "positiveRate": (self.positive / max(1, self.lines - self.skipped)),
+                "minVisits": min_visits,
+                "shapeImmediate": self.shape_immediate,
+            },
+            "states": states,
+            "abstractStates": abstract_states,
+        }
 
-    states, kept_states = _materialize_states(table, min_visits)
-    abstract_states, kept_abstract_states = _materialize_states(abstract_table, min_visits)
+    def build(self, min_visits: int) -> dict:
+        states, _ = _materialize_states(self.table, min_visits)
+        abstract_states, _ = _materialize_states(self.abstract_table, min_visits)
+        return self._model(min_visits, states, abstract_states)
 
-    return {
-        "schemaVersion": MODEL_SCHEMA_VERSION,
-        "normalization": NORMALIZATION,
-        "createdAt": dt.datetime.utcnow().isoformat() + "Z",
-        "stats": {
-            "recordsRead": lines,
-            "recordsSkipped": skipped,
-            "statesRaw": len(table),
-            "statesKept": kept_states,
-            "abstractStatesRaw": len(abstract_table),
-            "abstractStatesKept": kept_abstract_states,
-            "positiveRate": (positive / max(1, lines - skipped)),
-            "minVisits": min_visits,
-            "shapeImmediate": _TRAINING_CONTEXT["shape_immediate"],
-        },
-        "states": states,
-        "abstractStates": abstract_states,
-    }
+    def stream(self, min_visits: int) -> dict:
+        """Same model as `build`, with the state sections generated during `write_model`.
+
+        The aggregate must not change until the model has been written.
+        """
+        return self._model(
+            min_visits,
+            StateStream(lambda: _iter_states(self.table, min_visits), _count_kept(self.table, min_visits)),
+            StateStream(
+                lambda: _iter_states(self.abstract_table, min_visits), _count_kept(self.abstract_table, min_visits)
+            ),
+        )
+
+
+def aggregate(records: Iterable[dict], shape_immediate: float | None = None) -> PolicyTableAggregator:
+    aggregator = PolicyTableAggregator(shape_immediate)
+    for rec in records:
+        aggregator.add(rec)
+    return aggregator
+
+
+def train(records: Iterable[dict], min_visits: int) -> dict:
+    return aggregate(records).build(min_visits)
+
+
+def dump_model(model: dict, f: TextIO, compact: bool = False) -> None:
+    """Serialize a table to `f` one state at a time.
+
+    The output is byte-identical to `json.dump(model, f, ensure_ascii=False, indent=2)`
+    (or to `separators=(",", ":")` without indentation when `compact`), but the
+    `states`/`abstractStates` sections may be dicts or `StateStream`s.
+    """
+    separators = (",", ":") if compact else (",", ": ")
+    key_sep = separators[1]
+
+    def encode(value, level: int) -> str:
+        text = json.dumps(value, ensure_ascii=False, indent=None if compact else 2, separators=separators)
+        return text if compact else text.replace("\n", "\n" + "  " * level)
+
+    def write_object(items: Iterable[tuple[str, object]], level: int, stream_sections: bool) -> None:
+        newline = "" if compact else "\n" + "  " * (level + 1)
+        f.write("{")
+        first = True
+        for key, value in items:
+            f.write(("" if first else ",") + newline + json.dumps(key, ensure_ascii=False) + key_sep)
+            if stream_sections and key in STATE_SECTIONS:
+                write_object(value.items(), level + 1, False)
+            else:
+                f.write(encode(value, level + 1))
+            first = False
+        f.write(("" if first or compact else "\n" + "  " * level) + "}")
+
+    write_object(model.items(), 0, True)
+
+
+def write_model(model: dict, path: str, compact: bool = False) -> None:
+    """Write via a temp file and rename so readers never see a half-written table."""
+    out_dir = os.path.dirname(path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        dump_model(model, f, compact)
+    os.replace(tmp_path, path)
 
 
 def compute_training_target(rec: dict, outcome: float, shape_immediate: float) -> float:
@@ -327,7 +446,7 @@ _TRAINING_CONTEXT = {"shape_immediate": 0.0}
 
 def parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser(description="Train simple policy table from self-play NDJSON.")
-    p.add_argument("--input", required=True, help="Path to NDJSON self-play data.")
+    p.add_argument("--input", required=True, help="Path to NDJSON self-play data (with --follow: file, shard directory or glob).")
     p.add_argument(
         "--model-out",
         default=os.path.join("data", "models", "policy-table.json"),
@@ -345,9 +464,42 @@ def parse_args() -> argparse.Namespace:
         default=0.25,
         help="Blend ratio [0..1] of immediate disc-diff delta into outcome target.",
     )
+    p.add_argument(
+        "--compact-table",
+        action="store_true",
+        help="Write the table with compact separators and no indentation (smaller file, same content).",
+    )
+    p.add_argument("--metrics-out", default="", help="Append the artifact-cache report as a JSON line (default: off).")
+    artifact_cache.add_cache_args(p)
+    ndjson_follow.add_follow_args(p)
     return p.parse_args()
 
 
+def follow_table(args: argparse.Namespace) -> dict:
+    """Aggregate completed games from growing shards, rewriting the table on the snapshot schedule."""
+    aggregator = PolicyTableAggregator()
+    snapshots = 0
+
+    def on_games(games: list[list[dict]]) -> None:
+        for game in games:
+            for rec in game:
+                aggregator.add(rec)
+
+    def on_snapshot() -> None:
+        nonlocal snapshots
+        snapshots += 1
+        model = aggregator.stream(args.min_visits)
+        write_model(model, args.model_out, args.compact_table)
+        print(
+            f"[train_policy_table] snapshot={snapshots} records={model['stats']['recordsRead']} "
+            f"states_kept={model['stats']['statesKept']} out={args.model_out}",
+            flush=True,
+        )
+
+    ndjson_follow.follow_games(args, on_games, on_snapshot, "train_policy_table")
+    return aggregator.stream(args.min_visits)
+
+
 def main() -> int:
     args = parse_args()
     if args.min_visits < 1:
@@ -356,13 +508,26 @@ def main() -> int:
         raise ValueError("--shape-immediate must be in [0, 1]")
 
     _TRAINING_CONTEXT["shape_immediate"] = float(args.shape_immediate)
+    follow = ndjson_follow.validate_follow_args(args)
+    if follow and (args.artifact_cache_dir or "").strip():
+        raise ValueError("--artifact-cache-dir cannot be combined with --follow")
 
-    model = train(iter_ndjson(args.input), args.min_visits)
-    out_dir = os.path.dirname(args.model_out)
-    if out_dir:
-        os.makedirs(out_dir, exist_ok=True)
-    with open(args.model_out, "w", encoding="utf-8") as f:
-        json.dump(model, f, ensure_ascii=False, indent=2)
+    cache = artifact_cache.open_stage_cache(
+        args, "train_policy_table", inputs={"input": args.input}, outputs=("model_out", "metrics_out")
+    )
+    outputs = {"model_out": args.model_out}
+    if cache is not None:
+        report = cache.restore(outputs)
+        if report is not None:
+            artifact_cache.log_report("train_policy_table", report, args.metrics_out)
+            print(f"[train_policy_table] out={args.model_out}")
+            return 0
+
+    if follow:
+        model = follow_table(args)
+    else:
+        model = aggregate(iter_ndjson(args.input)).stream(args.min_visits)
+    write_model(model, args.model_out, args.compact_table)
 
     stats = model["stats"]
     print(
@@ -372,6 +537,8 @@ def main() -> int:
         f"positive_rate={stats['positiveRate']:.3f} "
         f"out={args.model_out}"
     )
+    if cache is not None:
+        artifact_cache.log_report("train_policy_table", cache.store(outputs), args.metrics_out)
     return 0
 
 
@@ -24,6 +24,7 @@ let _noCardActionIndex = -1;
 let _lastError = null;
 let _sourceUrl = DEFAULT_MODEL_URL;
 let _metaUrl = DEFAULT_META_URL;
+let _loadedModelUrl = null;
 let _config = {
     enabled: true,
     minLevel: 6
@@ -41,6 +42,7 @@ function configure(config) {
 function clearModel() {
     _session = null;
     _meta = null;
+    _loadedModelUrl = null;
     _inputName = 'obs';
     _placeOutputName = 'logits';
     _cardOutputName = null;
@@ -69,6 +71,7 @@ function getStatus() {
         schemaVersion: _meta && _meta.schemaVersion ? _meta.schemaVersion : null,
         sourceUrl: _sourceUrl,
         metaUrl: _metaUrl,
+        loadedModelUrl: _loadedModelUrl,
         lastError: _lastError ? _lastError.message : null
     };
 }
@@ -123,6 +126,31 @@ function resolveTensorByName(outputs, preferredName, fallbackIndex) {
     return outputs[key] || null;
 }
 
+/**
+ * Resolve the export variant preferred for single-position inference, if any.
+ * Trainers list variants in `meta.exportVariants` with file names relative to the base model.
+ * @param {string} modelUrl
+ * @param {object|null} meta
+ * @returns {string|null}
+ */
+function resolvePreferredVariantUrl(modelUrl, meta) {
+    const variants = meta && meta.exportVariants;
+    const file = variants && typeof variants.preferredFile === 'string' ? variants.preferredFile.trim() : '';
+    if (!file || file.includes('/') || file.includes('\\')) return null;
+    const slash = modelUrl.lastIndexOf('/');
+    const baseName = slash >= 0 ? modelUrl.slice(slash + 1) : modelUrl;
+    if (file === baseName) return null;
+    return (slash >= 0 ? modelUrl.slice(0, slash + 1) : '') + file;
+}
+
+async function createSession(ortApi, url) {
+    try {
+        return await ortApi.InferenceSession.create(url, { executionProviders: ['webgpu', 'wasm'] });
+    } catch (primaryErr) {
+        return await ortApi.InferenceSession.create(url, { executionProviders: ['wasm'] });
+    }
+}
+
 async function loadFromUrl(modelUrl, metaUrl, fetchImpl) {
     const ortApi = resolveOrtApi(true);
     if (!ortApi) {
@@ -134,14 +162,22 @@ async function loadFromUrl(modelUrl, metaUrl, fetchImpl) {
     const targetMeta = (typeof metaUrl === 'string' && metaUrl.trim()) ? metaUrl.trim() : _metaUrl;
 
     try {
+        const meta = await loadMetaJson(targetMeta, fetchImpl);
         let session = null;
-        try {
-            session = await ortApi.InferenceSession.create(targetModel, { executionProviders: ['webgpu', 'wasm'] });
-        } catch (primaryErr) {
-            session = await ortApi.InferenceSession.create(targetModel, { executionProviders: ['wasm'] });
+        let loadedUrl = targetModel;
+        const variantUrl = resolvePreferredVariantUrl(targetModel, meta);
+        if (variantUrl) {
+            try {
+                session = await createSession(ortApi, variantUrl);
+                loadedUrl = variantUrl;
+            } catch (variantErr) {
+                // Variant files are optional; fall back to the base model.
+                session = null;
+            }
         }
-        const meta = await loadMetaJson(targetMeta, fetchImpl);
+        if (!session) session = await createSession(ortApi, targetModel);
         _session = session;
+        _loadedModelUrl = loadedUrl;
         _meta = meta || { schemaVersion: POLICY_ONNX_MODEL_SCHEMA_VERSION, inputDim: BASE_INPUT_DIM };
         _inputName = (_meta && _meta.inputName) || (session.inputNames && session.inputNames[0]) || 'obs';
         _placeOutputName =
@@ -7,7 +7,10 @@
 'use strict';
 
 const POLICY_TABLE_MODEL_SCHEMA_VERSION = 'policy_table.v2';
+const POLICY_TABLE_DELTA_SCHEMA_VERSION = 'policy_table_delta.v1';
 const DEFAULT_MODEL_URL = 'data/models/policy-table.json';
+const OPENING_BOOK_SCHEMA_VERSION = 'opening_book.v1';
+const DEFAULT_BOOK_URL = 'data/models/opening-book.json';
 const MODEL_HEURISTIC_WEIGHT = 1;
 
 let _model = null;
@@ -17,6 +20,9 @@ let _config = {
 };
 let _lastError = null;
 let _sourceUrl = DEFAULT_MODEL_URL;
+let _deltasApplied = 0;
+let _book = null;
+let _bookHits = 0;
 
 const POSITION_WEIGHTS = [
     [120, -20, 20, 5, 5, 20, -20, 120],
@@ -54,15 +60,10 @@ function transformCoord(row, col, size, t) {
     return { row, col };
 }
 
-function decodeBoard(boardStr) {
-    if (!boardStr || typeof boardStr !== 'string') return [];
-    return boardStr.split('/').map((row) => row.split(''));
-}
-
 function transformBoard(board, t) {
     if (!Array.isArray(board) || !board.length) return [];
     const size = board.length;
-    const out = Array.from({ length: size }, () => Array.from({ length: size }, () => '.'));
+    const out = Array.from({ length: size }, () => Array.from({ length: size }, () => 0));
     for (let r = 0; r < size; r++) {
         for (let c = 0; c < size; c++) {
             const next = transformCoord(r, c, size, t);
@@ -75,11 +76,11 @@ function transformBoard(board, t) {
 function canonicalizeBoard(board) {
     const raw = encodeBoard(board);
     if (!raw) return { boardKey: raw, transformId: 0 };
-    const decoded = decodeBoard(raw);
+    // Transform the numeric board itself; encodeBoard only understands numeric cells.
     let best = null;
     let bestT = 0;
     for (let t = 0; t < 8; t++) {
-        const encoded = encodeBoard(transformBoard(decoded, t));
+        const encoded = encodeBoard(transformBoard(board, t));
         if (best === null || encoded < best) {
             best = encoded;
             bestT = t;
@@ -323,6 +324,67 @@ function estimateMoveHeuristic(move, context) {
     );
 }
 
+/**
+ * Compact canonical position hash used by opening books:
+ * `<b|w><legalMoves>:<black mask hex><white mask hex>` over the canonical 8x8 board key.
+ */
+function makeBookKey(playerKey, boardKey, legalMovesCount) {
+    if (typeof boardKey !== 'string') return '';
+    const cells = boardKey.replace(/\//g, '');
+    if (cells.length !== 64) return '';
+    let black = '';
+    let white = '';
+    for (let i = 0; i < 64; i += 4) {
+        let b = 0;
+        let w = 0;
+        for (let j = 0; j < 4; j++) {
+            const ch = cells[i + j];
+            if (ch === 'B') b |= 8 >> j;
+            else if (ch === 'W') w |= 8 >> j;
+        }
+        black += b.toString(16);
+        white += w.toString(16);
+    }
+    const legalMoves = Number.isFinite(legalMovesCount) ? legalMovesCount : 0;
+    return `${playerKey === 'black' ? 'b' : 'w'}${legalMoves}:${black}${white}`;
+}
+
+function isValidBook(book) {
+    if (!book || typeof book !== 'object') return false;
+    if (book.schemaVersion !== OPENING_BOOK_SCHEMA_VERSION) return false;
+    if (!book.entries || typeof book.entries !== 'object') return false;
+    return true;
+}
+
+/**
+ * A book is only valid for the table it was built from: once a table is loaded (or a
+ * delta moves it to a new version), the book's `source.createdAt` must match it.
+ * Before any table loads the book answers on its own.
+ */
+function isBookForModel() {
+    if (!_book) return false;
+    if (!hasModel()) return true;
+    const source = (_book.source && typeof _book.source === 'object') ? _book.source : {};
+    return (source.createdAt || null) === (_model.createdAt || null);
+}
+
+/** Book move among `candidateMoves`, or null when the position is not in the book. */
+function lookupBookMove(candidateMoves, ctx, legalMovesCount) {
+    if (!isBookForModel() || ctx.pendingType) return null;
+    const board = ctx.board;
+    if (!Array.isArray(board) || board.length !== 8) return null;
+    const playerKey = ctx.playerKey === 'black' ? 'black' : 'white';
+    const canonical = canonicalizeBoard(board);
+    const index = _book.entries[makeBookKey(playerKey, canonical.boardKey, legalMovesCount)];
+    if (!Number.isFinite(index)) return null;
+    for (const move of candidateMoves) {
+        if (!move || !Number.isFinite(move.row) || !Number.isFinite(move.col)) continue;
+        const p = transformCoord(move.row, move.col, board.length, canonical.transformId);
+        if ((p.row * board.length) + p.col === index) return move;
+    }
+    return null;
+}
+
 function isValidModel(model) {
     if (!model || typeof model !== 'object') return false;
     if (model.schemaVersion !== 'policy_table.v1' && model.schemaVersion !== POLICY_TABLE_MODEL_SCHEMA_VERSION) return false;
@@ -341,7 +403,7 @@ function getStateEntry(playerKey, board, pendingType, legalMovesCount) {
     if (_model.states[canonicalKey]) return { entry: _model.states[canonicalKey], abstract: false };
     // Backward-compatible fallback: allow non-canonical key in v2 payloads.
     const rawKey = makeStateKey(playerKey, board, pendingType, legalMovesCount);
-    if (_model.states[rawKey]) return { entry: _model.states[rawKey], abstract: false };
+    if (_model.states[rawKey]) return { entry: _model.states[rawKey], abstract: false, raw: true };
     if (_model.abstractStates && typeof _model.abstractStates === 'object') {
         const abstractKey = makeAbstractStateKey(playerKey, board, pendingType, legalMovesCount);
         if (_model.abstractStates[abstractKey]) return { entry: _model.abstractStates[abstractKey], abstract: true };
@@ -356,15 +418,86 @@ function setModel(model, options) {
     }
     _model = model;
     _lastError = null;
+    _deltasApplied = 0;
     if (options && typeof options.url === 'string' && options.url.trim()) {
         _sourceUrl = options.url.trim();
     }
     return true;
 }
 
+function applyDeltaSection(section, change) {
+    if (!change || typeof change !== 'object') return;
+    if (Array.isArray(change.remove)) {
+        for (const key of change.remove) delete section[key];
+    }
+    if (change.upsert && typeof change.upsert === 'object') {
+        for (const key of Object.keys(change.upsert)) section[key] = change.upsert[key];
+    }
+}
+
+/**
+ * Apply a `policy_table_delta.v1` (see scripts/diff-policy-table.js) to a base table.
+ * The base `states`/`abstractStates` objects are updated in place so a large cached
+ * table is not copied; throws before touching anything when the delta does not match.
+ */
+function applyPolicyTableDelta(base, delta) {
+    if (!isValidModel(base)) throw new Error('invalid base model');
+    if (!delta || typeof delta !== 'object' || delta.schemaVersion !== POLICY_TABLE_DELTA_SCHEMA_VERSION) {
+        throw new Error(`invalid delta schema (expected ${POLICY_TABLE_DELTA_SCHEMA_VERSION})`);
+    }
+    const expected = delta.base || {};
+    if (expected.createdAt !== (base.createdAt || null)) {
+        throw new Error(`delta base mismatch: expected ${expected.createdAt}, cached ${base.createdAt || null}`);
+    }
+    const header = (delta.header && typeof delta.header === 'object') ? delta.header : {};
+    const next = Object.assign({}, base, header);
+    next.states = base.states;
+    next.abstractStates = (base.abstractStates && typeof base.abstractStates === 'object') ? base.abstractStates : {};
+    if (!isValidModel(next)) throw new Error('delta header produces an invalid model');
+    applyDeltaSection(next.states, delta.states);
+    applyDeltaSection(next.abstractStates, delta.abstractStates);
+    return next;
+}
+
+function applyDelta(delta) {
+    if (!hasModel()) {
+        _lastError = new Error('no base model loaded');
+        return false;
+    }
+    try {
+        _model = applyPolicyTableDelta(_model, delta);
+    } catch (err) {
+        _lastError = err instanceof Error ? err : new Error(String(err));
+        return false;
+    }
+    _deltasApplied++;
+    _lastError = null;
+    return true;
+}
+
 function clearModel() {
     _model = null;
     _lastError = null;
+    _deltasApplied = 0;
+}
+
+function setBook(book) {
+    if (!isValidBook(book)) {
+        _lastError = new Error(`invalid opening book schema (expected ${OPENING_BOOK_SCHEMA_VERSION})`);
+        return false;
+    }
+    _book = book;
+    _bookHits = 0;
+    return true;
+}
+
+function clearBook() {
+    _book = null;
+    _bookHits = 0;
+}
+
+function hasBook() {
+    return !!_book;
 }
 
 function hasModel() {
@@ -379,6 +512,11 @@ function getStatus() {
         schemaVersion: hasModel() ? _model.schemaVersion : null,
         statesCount: hasModel() ? Object.keys(_model.states).length : 0,
         sourceUrl: _sourceUrl,
+        deltasApplied: _deltasApplied,
+        bookLoaded: hasBook(),
+        bookEntries: hasBook() ? Object.keys(_book.entries).length : 0,
+        bookActive: isBookForModel(),
+        bookHits: _bookHits,
         lastError: _lastError ? _lastError.message : null
     };
 }
@@ -414,9 +552,52 @@ async function loadFromUrl(url, fetchImpl) {
     }
 }
 
+async function loadBookFromUrl(url, fetchImpl) {
+    const target = (typeof url === 'string' && url.trim()) ? url.trim() : DEFAULT_BOOK_URL;
+    const f = fetchImpl || (typeof fetch === 'function' ? fetch : null);
+    if (!f) {
+        _lastError = new Error('fetch is not available');
+        return false;
+    }
+    try {
+        const response = await f(target, { cache: 'no-store' });
+        if (!response || !response.ok) {
+            _lastError = new Error(`opening book fetch failed: ${response ? response.status : 'no_response'}`);
+            return false;
+        }
+        return setBook(await response.json());
+    } catch (err) {
+        _lastError = err instanceof Error ? err : new Error(String(err));
+        return false;
+    }
+}
+
+async function loadDeltaFromUrl(url, fetchImpl) {
+    const f = fetchImpl || (typeof fetch === 'function' ? fetch : null);
+    if (!f) {
+        _lastError = new Error('fetch is not available');
+        return false;
+    }
+    if (!hasModel()) {
+        _lastError = new Error('no base model loaded');
+        return false;
+    }
+    try {
+        const response = await f(url, { cache: 'no-store' });
+        if (!response || !response.ok) {
+            _lastError = new Error(`delta fetch failed: ${response ? response.status : 'no_response'}`);
+            return false;
+        }
+        return applyDelta(await response.json());
+    } catch (err) {
+        _lastError = err instanceof Error ? err : new Error(String(err));
+        return false;
+    }
+}
+
 function chooseMove(candidateMoves, context) {
     if (!_config.enabled) return null;
-    if (!hasModel()) return null;
+    if (!hasModel() && !hasBook()) return null;
     if (!Array.isArray(candidateMoves) || candidateMoves.length === 0) return null;
 
     const ctx = context || {};
@@ -425,6 +606,13 @@ function chooseMove(candidateMoves, context) {
 
     const playerKey = ctx.playerKey === 'black' ? 'black' : 'white';
     const legalMovesCount = Number.isFinite(ctx.legalMovesCount) ? ctx.legalMovesCount : candidateMoves.length;
+    // Opening book first: one hash lookup, and it answers before the full table has loaded.
+    const bookMove = lookupBookMove(candidateMoves, ctx, legalMovesCount);
+    if (bookMove) {
+        _bookHits++;
+        return bookMove;
+    }
+    if (!hasModel()) return null;
     const schema = _model.schemaVersion;
     const canonical = schema === 'policy_table.v1' ? { boardKey: encodeBoard(ctx.board), transformId: 0 } : canonicalizeBoard(ctx.board);
     const stateMeta = getStateEntry(playerKey, ctx.board, ctx.pendingType || null, legalMovesCount);
@@ -437,7 +625,7 @@ function chooseMove(candidateMoves, context) {
     for (const move of candidateMoves) {
         let actionKey = schema === 'policy_table.v1'
             ? makeActionKeyFromMove(move)
-            : makeActionKeyFromMoveWithTransform(move, canonical.transformId, boardSize);
+            : makeActionKeyFromMoveWithTransform(move, stateMeta.raw ? 0 : canonical.transformId, boardSize);
         if (stateMeta.abstract) {
             actionKey = makeAbstractActionKeyFromMove(move, boardSize);
         }
@@ -482,7 +670,7 @@ function getActionScore(move, context) {
     const boardSize = Array.isArray(ctx.board) ? ctx.board.length : 8;
     let actionKey = schema === 'policy_table.v1'
         ? makeActionKeyFromMove(move)
-        : makeActionKeyFromMoveWithTransform(move, canonical.transformId, boardSize);
+        : makeActionKeyFromMoveWithTransform(move, stateMeta.raw ? 0 : canonical.transformId, boardSize);
     if (stateMeta.abstract) {
         actionKey = makeAbstractActionKeyFromMove(move, boardSize);
     }
@@ -524,13 +712,26 @@ function getActionScoreForKey(actionKey, context) {
 
 const Api = {
     MODEL_SCHEMA_VERSION: POLICY_TABLE_MODEL_SCHEMA_VERSION,
+    DELTA_SCHEMA_VERSION: POLICY_TABLE_DELTA_SCHEMA_VERSION,
+    BOOK_SCHEMA_VERSION: OPENING_BOOK_SCHEMA_VERSION,
     DEFAULT_MODEL_URL,
+    DEFAULT_BOOK_URL,
     configure,
     getStatus,
     setModel,
     clearModel,
     hasModel,
     loadFromUrl,
+    applyDelta,
+    loadDeltaFromUrl,
+    applyPolicyTableDelta,
+    setBook,
+    clearBook,
+    hasBook,
+    loadBookFromUrl,
+    makeBookKey,
+    getStateEntry,
+    transformCoord,
     chooseMove,
     getActionScore,
     getActionScoreForKey,
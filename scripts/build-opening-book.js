@@ -0,0 +1,243 @@
+#!/usr/bin/env node
+'use strict';
+
+const fs = require('fs');
+const path = require('path');
+const runtime = require('../game/ai/policy-table-runtime');
+
+const BOARD_SIZE = 8;
+const BLACK = 1;
+const WHITE = -1;
+
+function parseArgs(argv) {
+    const args = {
+        modelPath: path.resolve(process.cwd(), 'data', 'models', 'policy-table.json'),
+        outPath: path.resolve(process.cwd(), 'data', 'models', 'opening-book.json'),
+        plies: 12,
+        branching: 3,
+        minVisits: 2,
+        maxEntries: 20000,
+        help: false
+    };
+
+    for (let i = 0; i < argv.length; i++) {
+        const a = argv[i];
+        if (a === '--help' || a === '-h') { args.help = true; continue; }
+        if (a === '--model') { args.modelPath = path.resolve(process.cwd(), argv[++i]); continue; }
+        if (a === '--out') { args.outPath = path.resolve(process.cwd(), argv[++i]); continue; }
+        if (a === '--plies') { args.plies = Number(argv[++i]); continue; }
+        if (a === '--branching') { args.branching = Number(argv[++i]); continue; }
+        if (a === '--min-visits') { args.minVisits = Number(argv[++i]); continue; }
+        if (a === '--max-entries') { args.maxEntries = Number(argv[++i]); continue; }
+    }
+
+    if (args.help) return args;
+    if (!Number.isInteger(args.plies) || args.plies < 1) throw new Error('--plies must be an integer >= 1');
+    if (!Number.isInteger(args.branching) || args.branching < 1) throw new Error('--branching must be an integer >= 1');
+    if (!Number.isFinite(args.minVisits) || args.minVisits < 0) throw new Error('--min-visits must be >= 0');
+    if (!Number.isInteger(args.maxEntries) || args.maxEntries < 1) throw new Error('--max-entries must be an integer >= 1');
+    return args;
+}
+
+function printHelp() {
+    console.log([
+        'Usage:',
+        '  node scripts/build-opening-book.js [options]',
+        '',
+        'Walks the policy table (and its abstract-state fallback) from the initial position and',
+        'stores the move policy-table-runtime.js would choose in every position reached within',
+        'the first N plies, keyed by canonical position hash.',
+        '',
+        'Options:',
+        '      --model <path>        Policy table JSON (default: data/models/policy-table.json)',
+        '      --out <path>          Opening book output (default: data/models/opening-book.json)',
+        '      --plies <n>           Book depth in plies from the initial position (default: 12)',
+        '      --branching <n>       Most-visited table actions followed per exact state (default: 3)',
+        '      --min-visits <n>      Minimum action visits to follow a non-chosen move (default: 2)',
+        '      --max-entries <n>     Stop after this many book positions (default: 20000)',
+        '  -h, --help                Show this help'
+    ].join('\n'));
+}
+
+function createInitialBoard() {
+    const board = Array.from({ length: BOARD_SIZE }, () => Array.from({ length: BOARD_SIZE }, () => 0));
+    board[3][3] = WHITE;
+    board[3][4] = BLACK;
+    board[4][3] = BLACK;
+    board[4][4] = WHITE;
+    return board;
+}
+
+function getFlipsBasic(board, row, col, playerValue) {
+    if (board[row][col] !== 0) return [];
+    const dirs = [
+        [-1, -1], [-1, 0], [-1, 1],
+        [0, -1],           [0, 1],
+        [1, -1],  [1, 0],  [1, 1]
+    ];
+    const out = [];
+    for (const d of dirs) {
+        const temp = [];
+        let r = row + d[0];
+        let c = col + d[1];
+        while (r >= 0 && c >= 0 && r < board.length && c < board.length && board[r][c] === -playerValue) {
+            temp.push({ row: r, col: c });
+            r += d[0];
+            c += d[1];
+        }
+        if (temp.length > 0 && r >= 0 && c >= 0 && r < board.length && c < board.length && board[r][c] === playerValue) {
+            out.push(...temp);
+        }
+    }
+    return out;
+}
+
+function getLegalMovesBasic(board, playerValue) {
+    const moves = [];
+    for (let row = 0; row < board.length; row++) {
+        for (let col = 0; col < board[row].length; col++) {
+            const flips = getFlipsBasic(board, row, col, playerValue);
+            if (flips.length > 0) moves.push({ row, col, flips });
+        }
+    }
+    return moves;
+}
+
+function applyMove(board, move, playerValue) {
+    const out = board.map((row) => row.slice());
+    out[move.row][move.col] = playerValue;
+    for (const f of move.flips) out[f.row][f.col] = playerValue;
+    return out;
+}
+
+function toPlayerKey(playerValue) {
+    return playerValue === BLACK ? 'black' : 'white';
+}
+
+/** Table actions of an exact state, most visited first, mapped back onto `moves`. */
+function visitedMoves(entry, moves, transformId, minVisits) {
+    const byAction = new Map();
+    for (const move of moves) {
+        const p = runtime.transformCoord(move.row, move.col, BOARD_SIZE, transformId);
+        byAction.set(`place:${p.row}:${p.col}`, move);
+    }
+    return Object.keys(entry.actions || {})
+        .filter((key) => byAction.has(key))
+        .map((key) => ({ move: byAction.get(key), visits: Number(entry.actions[key].visits) || 0 }))
+        .filter((item) => item.visits >= minVisits)
+        .sort((a, b) => b.visits - a.visits)
+        .map((item) => item.move);
+}
+
+function buildOpeningBook(model, options) {
+    if (!runtime.setModel(model)) {
+        throw new Error(runtime.getStatus().lastError || 'invalid policy table');
+    }
+    runtime.clearBook();
+    runtime.configure({ enabled: true, minLevel: 1 });
+
+    const entries = {};
+    const counts = { positions: 0, entries: 0, exact: 0, abstract: 0, noDecision: 0, depth: 0 };
+    const seen = new Set();
+    let queue = [{ board: createInitialBoard(), playerValue: BLACK }];
+    for (let ply = 0; ply < options.plies && queue.length > 0; ply++) {
+        const next = [];
+        for (const node of queue) {
+            if (counts.entries >= options.maxEntries) break;
+            let playerValue = node.playerValue;
+            let moves = getLegalMovesBasic(node.board, playerValue);
+            if (moves.length === 0) {
+                // Pass: the same board with the other side to move.
+                playerValue = -playerValue;
+                moves = getLegalMovesBasic(node.board, playerValue);
+                if (moves.length === 0) continue;
+            }
+            const playerKey = toPlayerKey(playerValue);
+            const canonical = runtime.canonicalizeBoard(node.board);
+            const key = runtime.makeBookKey(playerKey, canonical.boardKey, moves.length);
+            if (seen.has(key)) continue;
+            seen.add(key);
+            counts.positions++;
+
+            const context = { playerKey, level: Number.MAX_SAFE_INTEGER, board: node.board, pendingType: null, legalMovesCount: moves.length };
+            const chosen = runtime.chooseMove(moves, context);
+            if (!chosen) {
+                counts.noDecision++;
+                continue;
+            }
+            const p = runtime.transformCoord(chosen.row, chosen.col, BOARD_SIZE, canonical.transformId);
+            entries[key] = (p.row * BOARD_SIZE) + p.col;
+            counts.entries++;
+            counts.depth = ply + 1;
+
+            const stateMeta = runtime.getStateEntry(playerKey, node.board, null, moves.length);
+            const followed = [chosen];
+            if (stateMeta && !stateMeta.abstract) {
+                counts.exact++;
+                for (const move of visitedMoves(stateMeta.entry, moves, canonical.transformId, options.minVisits)) {
+                    if (followed.length >= options.branching) break;
+                    if (!followed.includes(move)) followed.push(move);
+                }
+            } else {
+                counts.abstract++;
+            }
+            for (const move of followed) {
+                next.push({ board: applyMove(node.board, move, playerValue), playerValue: -playerValue });
+            }
+        }
+        queue = next;
+    }
+    runtime.clearModel();
+
+    const book = {
+        schemaVersion: runtime.BOOK_SCHEMA_VERSION,
+        createdAt: new Date().toISOString(),
+        source: {
+            schemaVersion: model.schemaVersion,
+            createdAt: model.createdAt || null
+        },
+        boardSize: BOARD_SIZE,
+        maxPlies: options.plies,
+        entries
+    };
+    return { book, counts };
+}
+
+function writeOpeningBook(options) {
+    const modelRaw = fs.readFileSync(options.modelPath, 'utf8');
+    const { book, counts } = buildOpeningBook(JSON.parse(modelRaw), options);
+    const payload = JSON.stringify(book);
+    fs.mkdirSync(path.dirname(options.outPath), { recursive: true });
+    fs.writeFileSync(options.outPath, payload, 'utf8');
+    return Object.assign({}, counts, {
+        outPath: options.outPath,
+        bookBytes: Buffer.byteLength(payload, 'utf8'),
+        tableBytes: Buffer.byteLength(modelRaw, 'utf8')
+    });
+}
+
+function main() {
+    const args = parseArgs(process.argv.slice(2));
+    if (args.help) { printHelp(); return; }
+    const r = writeOpeningBook(args);
+    console.log(
+        `[opening-book] entries=${r.entries} exact=${r.exact} abstract=${r.abstract} no_decision=${r.noDecision} ` +
+        `depth=${r.depth} book_bytes=${r.bookBytes} table_bytes=${r.tableBytes} out=${r.outPath}`
+    );
+}
+
+if (require.main === module) {
+    try {
+        main();
+    } catch (err) {
+        console.error('[opening-book] failed:', err && err.message ? err.message : err);
+        process.exit(1);
+    }
+}
+
+module.exports = {
+    parseArgs,
+    createInitialBoard,
+    buildOpeningBook,
+    writeOpeningBook
+};
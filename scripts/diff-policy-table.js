@@ -0,0 +1,235 @@
+#!/usr/bin/env node
+'use strict';
+
+const fs = require('fs');
+const path = require('path');
+const runtime = require('../game/ai/policy-table-runtime');
+
+const STATE_SECTIONS = ['states', 'abstractStates'];
+
+function parseArgs(argv) {
+    const args = {
+        basePath: null,
+        targetPath: null,
+        outPath: null,
+        reportOutPath: null,
+        tolerance: 0,
+        verify: true,
+        help: false
+    };
+
+    for (let i = 0; i < argv.length; i++) {
+        const a = argv[i];
+        if (a === '--help' || a === '-h') { args.help = true; continue; }
+        if (a === '--base') { args.basePath = path.resolve(process.cwd(), argv[++i]); continue; }
+        if (a === '--target') { args.targetPath = path.resolve(process.cwd(), argv[++i]); continue; }
+        if (a === '--out') { args.outPath = path.resolve(process.cwd(), argv[++i]); continue; }
+        if (a === '--report-out') { args.reportOutPath = path.resolve(process.cwd(), argv[++i]); continue; }
+        if (a === '--tolerance') { args.tolerance = Number(argv[++i]); continue; }
+        if (a === '--no-verify') { args.verify = false; continue; }
+    }
+
+    if (args.help) return args;
+    if (!args.basePath) throw new Error('--base is required');
+    if (!args.targetPath) throw new Error('--target is required');
+    if (!Number.isFinite(args.tolerance) || args.tolerance < 0) throw new Error('--tolerance must be >= 0');
+    if (!args.outPath) args.outPath = args.targetPath.replace(/\.json$/i, '') + '.delta.json';
+    return args;
+}
+
+function printHelp() {
+    console.log([
+        'Usage:',
+        '  node scripts/diff-policy-table.js --base <path> --target <path> [options]',
+        '',
+        'Writes a policy_table_delta.v1 file that turns the base table into the target table.',
+        'States are compared by key, bestAction and actions; policy-table-runtime.js applies',
+        'the delta to a cached base with applyDelta()/loadDeltaFromUrl().',
+        '',
+        'Options:',
+        '      --base <path>         Policy table the clients already have (required)',
+        '      --target <path>       Newly trained policy table (required)',
+        '      --out <path>          Delta output path (default: <target>.delta.json)',
+        '      --report-out <path>   Write the size/count report as JSON (optional)',
+        '      --tolerance <x>       Treat numeric action fields within x as unchanged (default: 0=exact)',
+        '      --no-verify           Skip re-applying the delta to the base and comparing with the target',
+        '  -h, --help                Show this help'
+    ].join('\n'));
+}
+
+function readJson(p) {
+    const raw = fs.readFileSync(p, 'utf8');
+    return JSON.parse(raw);
+}
+
+function validatePolicyModel(model, label) {
+    if (!model || typeof model !== 'object') throw new Error(`${label} model is not an object`);
+    if (model.schemaVersion !== 'policy_table.v1' && model.schemaVersion !== 'policy_table.v2') {
+        throw new Error(`${label} model schema must be policy_table.v1 or policy_table.v2`);
+    }
+    if (!model.states || typeof model.states !== 'object') throw new Error(`${label} model must include states object`);
+}
+
+function sameValue(a, b, tolerance) {
+    if (typeof a === 'number' && typeof b === 'number') {
+        return a === b || Math.abs(a - b) <= tolerance;
+    }
+    if (a === null || b === null || typeof a !== 'object' || typeof b !== 'object') return a === b;
+    if (Array.isArray(a) !== Array.isArray(b)) return false;
+    const keysA = Object.keys(a);
+    if (keysA.length !== Object.keys(b).length) return false;
+    for (const key of keysA) {
+        if (!Object.prototype.hasOwnProperty.call(b, key)) return false;
+        if (!sameValue(a[key], b[key], tolerance)) return false;
+    }
+    return true;
+}
+
+function entryChanged(prev, next, tolerance) {
+    if (!prev || !next) return true;
+    if (prev.bestAction !== next.bestAction) return true;
+    return !sameValue(prev.actions || {}, next.actions || {}, tolerance);
+}
+
+function diffSection(baseSection, targetSection, tolerance) {
+    const base = (baseSection && typeof baseSection === 'object') ? baseSection : {};
+    const target = (targetSection && typeof targetSection === 'object') ? targetSection : {};
+    const upsert = {};
+    const remove = [];
+    const counts = { added: 0, changed: 0, removed: 0, unchanged: 0 };
+    for (const key of Object.keys(target)) {
+        if (!Object.prototype.hasOwnProperty.call(base, key)) {
+            upsert[key] = target[key];
+            counts.added++;
+        } else if (entryChanged(base[key], target[key], tolerance)) {
+            upsert[key] = target[key];
+            counts.changed++;
+        } else {
+            counts.unchanged++;
+        }
+    }
+    for (const key of Object.keys(base)) {
+        if (!Object.prototype.hasOwnProperty.call(target, key)) {
+            remove.push(key);
+            counts.removed++;
+        }
+    }
+    return { change: { upsert, remove }, counts };
+}
+
+function diffPolicyTables(base, target, options) {
+    validatePolicyModel(base, 'base');
+    validatePolicyModel(target, 'target');
+    const tolerance = options && Number.isFinite(options.tolerance) ? options.tolerance : 0;
+    const header = {};
+    for (const key of Object.keys(target)) {
+        if (!STATE_SECTIONS.includes(key)) header[key] = target[key];
+    }
+    const delta = {
+        schemaVersion: runtime.DELTA_SCHEMA_VERSION,
+        base: {
+            schemaVersion: base.schemaVersion,
+            createdAt: base.createdAt || null,
+            statesCount: Object.keys(base.states).length
+        },
+        target: {
+            schemaVersion: target.schemaVersion,
+            createdAt: target.createdAt || null,
+            statesCount: Object.keys(target.states).length
+        },
+        tolerance,
+        header
+    };
+    const counts = {};
+    for (const section of STATE_SECTIONS) {
+        const result = diffSection(base[section], target[section], tolerance);
+        delta[section] = result.change;
+        counts[section] = result.counts;
+    }
+    return { delta, counts };
+}
+
+/** Apply the delta to a copy of the base and count states that differ from the target. */
+function verifyDelta(base, target, delta) {
+    const applied = runtime.applyPolicyTableDelta(JSON.parse(JSON.stringify(base)), delta);
+    let mismatches = 0;
+    for (const section of STATE_SECTIONS) {
+        const want = target[section] || {};
+        const got = applied[section] || {};
+        if (Object.keys(want).length !== Object.keys(got).length) mismatches++;
+        for (const key of Object.keys(want)) {
+            if (entryChanged(got[key], want[key], delta.tolerance)) mismatches++;
+        }
+    }
+    return mismatches;
+}
+
+function writeDelta(options) {
+    const baseRaw = fs.readFileSync(options.basePath, 'utf8');
+    const targetRaw = fs.readFileSync(options.targetPath, 'utf8');
+    const base = JSON.parse(baseRaw);
+    const target = JSON.parse(targetRaw);
+    const { delta, counts } = diffPolicyTables(base, target, { tolerance: options.tolerance });
+    const payload = JSON.stringify(delta);
+    fs.mkdirSync(path.dirname(options.outPath), { recursive: true });
+    fs.writeFileSync(options.outPath, payload, 'utf8');
+
+    const deltaBytes = Buffer.byteLength(payload, 'utf8');
+    const fullBytes = Buffer.byteLength(targetRaw, 'utf8');
+    const fullCompactBytes = Buffer.byteLength(JSON.stringify(target), 'utf8');
+    const report = {
+        basePath: options.basePath,
+        targetPath: options.targetPath,
+        deltaPath: options.outPath,
+        counts,
+        deltaBytes,
+        fullBytes,
+        fullCompactBytes,
+        ratio: fullBytes > 0 ? deltaBytes / fullBytes : null,
+        ratioCompact: fullCompactBytes > 0 ? deltaBytes / fullCompactBytes : null,
+        verified: null,
+        mismatches: null
+    };
+    if (options.verify !== false) {
+        report.mismatches = verifyDelta(base, target, delta);
+        report.verified = report.mismatches === 0;
+    }
+    if (options.reportOutPath) {
+        fs.mkdirSync(path.dirname(options.reportOutPath), { recursive: true });
+        fs.writeFileSync(options.reportOutPath, JSON.stringify(report, null, 2), 'utf8');
+    }
+    return report;
+}
+
+function main() {
+    const args = parseArgs(process.argv.slice(2));
+    if (args.help) { printHelp(); return; }
+    const report = writeDelta(args);
+    for (const section of STATE_SECTIONS) {
+        const c = report.counts[section];
+        console.log(`[policy-delta] ${section} added=${c.added} changed=${c.changed} removed=${c.removed} unchanged=${c.unchanged}`);
+    }
+    console.log(
+        `[policy-delta] delta_bytes=${report.deltaBytes} full_bytes=${report.fullBytes} ratio=${report.ratio.toFixed(4)} ` +
+        `full_compact_bytes=${report.fullCompactBytes} ratio_compact=${report.ratioCompact.toFixed(4)} out=${report.deltaPath}`
+    );
+    if (report.verified === false) {
+        throw new Error(`delta does not reproduce the target (${report.mismatches} mismatches)`);
+    }
+}
+
+if (require.main === module) {
+    try {
+        main();
+    } catch (err) {
+        console.error('[policy-delta] failed:', err && err.message ? err.message : err);
+        process.exit(1);
+    }
+}
+
+module.exports = {
+    parseArgs,
+    diffPolicyTables,
+    verifyDelta,
+    writeDelta
+};
@@ -148,7 +148,11 @@ function main() {
 
     fs.mkdirSync(path.dirname(args.out), { recursive: true });
     const summaryPath = `${args.out}.summary.json`;
-    const outStream = fs.createWriteStream(args.out, { encoding: 'utf8' });
+    // The game loop is synchronous, so records are written with writeSync once per
+    // finished game: the file grows while generation runs (`--follow` trainers tail it)
+    // and never ends in a partial game.
+    const outFd = fs.openSync(args.out, 'w');
+    let pendingLines = [];
 
     let finishedGames = 0;
     const startedAt = Date.now();
@@ -177,9 +181,11 @@ function main() {
             }
         } : null,
         onRecord: (record) => {
-            outStream.write(`${JSON.stringify(record)}\n`);
+            pendingLines.push(`${JSON.stringify(record)}\n`);
         },
         onGameEnd: (gameSummary) => {
+            fs.writeSync(outFd, pendingLines.join(''));
+            pendingLines = [];
             finishedGames += 1;
             if (finishedGames % 10 === 0 || finishedGames === args.games) {
                 console.log(`[selfplay] ${finishedGames}/${args.games} completed (last winner: ${gameSummary.winner})`);
@@ -187,7 +193,7 @@ function main() {
         }
     }));
 
-    outStream.end();
+    fs.closeSync(outFd);
 
     const elapsedMs = Date.now() - startedAt;
     const payload = {
@@ -55,6 +55,7 @@ function parseArgs(argv) {
         runTag: null,
         runsDir: path.resolve(process.cwd(), 'data', 'runs'),
         modelsDir: path.resolve(process.cwd(), 'data', 'models'),
+        artifactCacheDir: null,
         summaryOut: null,
         verbose: false,
         help: false
@@ -114,6 +115,7 @@ function parseArgs(argv) {
         if (a === '--run-tag') { args.runTag = String(argv[++i] || '').trim(); continue; }
         if (a === '--runs-dir') { args.runsDir = path.resolve(process.cwd(), argv[++i]); continue; }
         if (a === '--models-dir') { args.modelsDir = path.resolve(process.cwd(), argv[++i]); continue; }
+        if (a === '--artifact-cache-dir') { args.artifactCacheDir = path.resolve(process.cwd(), argv[++i]); continue; }
         if (a === '--summary-out') { args.summaryOut = path.resolve(process.cwd(), argv[++i]); continue; }
         if (a === '--verbose') { args.verbose = true; continue; }
     }
@@ -284,6 +286,7 @@ function printHelp() {
         '      --run-tag <tag>         Tag appended to output filenames',
         '      --runs-dir <path>       Output directory for records/results (default: data/runs)',
         '      --models-dir <path>     Output directory for candidate models (default: data/models)',
+        '      --artifact-cache-dir <path> Reuse train/evaluate outputs when inputs and args are unchanged (default: off)',
         '      --summary-out <path>    Output summary JSON path',
         '      --verbose               Keep verbose logs in underlying scripts',
         '  -h, --help                  Show this help'
@@ -368,6 +371,7 @@ function runIteration(args, iterationIndex, deadlineMs, carryOver) {
     const guideModelArgs = guideModelPath ? ['--policy-model', guideModelPath] : [];
     const verboseArgs = args.verbose ? ['--verbose'] : [];
     const adoptionCardRate = args.allowCardUsage ? args.cardUsageRate : 0;
+    const artifactCacheArgs = args.artifactCacheDir ? ['--artifact-cache-dir', args.artifactCacheDir] : [];
 
     fs.mkdirSync(args.runsDir, { recursive: true });
     fs.mkdirSync(args.modelsDir, { recursive: true });
@@ -422,13 +426,13 @@ function runIteration(args, iterationIndex, deadlineMs, carryOver) {
         '--min-visits', String(args.minVisits),
         '--shape-immediate', String(args.shapeImmediate),
         '--checkpoint-out', p.checkpointPath
-    ].concat(resumeCheckpointPath ? ['--resume-checkpoint', resumeCheckpointPath] : []));
+    ].concat(resumeCheckpointPath ? ['--resume-checkpoint', resumeCheckpointPath] : [], artifactCacheArgs));
 
     runStep('evaluate-policy', args.pythonPath, [
         path.resolve('ai', 'train', 'evaluate_policy_table.py'),
         '--input', p.evalDataPath,
         '--model', p.candidateModelPath
-    ]);
+    ].concat(artifactCacheArgs));
 
     runStep('adoption-quick', process.execPath, [
         path.resolve('scripts', 'benchmark-policy-adoption.js'),
@@ -619,6 +623,7 @@ function main() {
             promoteOnPass: args.promoteOnPass,
             bootstrapPolicyModelPath: args.bootstrapPolicyModelPath,
             resumeCheckpointPath: args.resumeCheckpointPath,
+            artifactCacheDir: args.artifactCacheDir,
             runTag: args.runTag
         },
         latestGuideModelPath: guideModelPath,
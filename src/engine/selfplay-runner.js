@@ -96,11 +96,6 @@ function encodeBoard(board) {
         .join('/');
 }
 
-function decodeBoard(boardStr) {
-    if (!boardStr) return [];
-    return boardStr.split('/').map((row) => row.split(''));
-}
-
 function transformCoord(row, col, size, t) {
     if (t === 0) return { row, col };
     if (t === 1) return { row: col, col: size - 1 - row };
@@ -116,7 +111,7 @@ function transformCoord(row, col, size, t) {
 function transformBoard(board, t) {
     if (!Array.isArray(board) || !board.length) return [];
     const size = board.length;
-    const out = Array.from({ length: size }, () => Array.from({ length: size }, () => '.'));
+    const out = Array.from({ length: size }, () => Array.from({ length: size }, () => 0));
     for (let r = 0; r < size; r++) {
         for (let c = 0; c < size; c++) {
             const next = transformCoord(r, c, size, t);
@@ -129,11 +124,11 @@ function transformBoard(board, t) {
 function canonicalizeBoard(board) {
     const raw = encodeBoard(board);
     if (!raw) return { boardKey: raw, transformId: 0 };
-    const decoded = decodeBoard(raw);
+    // Transform the numeric board itself; encodeBoard only understands numeric cells.
     let best = null;
     let bestT = 0;
     for (let t = 0; t < 8; t++) {
-        const encoded = encodeBoard(transformBoard(decoded, t));
+        const encoded = encodeBoard(transformBoard(board, t));
         if (best === null || encoded < best) {
             best = encoded;
             bestT = t;
@@ -1142,5 +1137,6 @@ module.exports = {
     selectPlacementMove,
     getPolicyActionScoreByKey,
     encodeBoard,
+    canonicalizeBoard,
     getPolicyForPlayer
 };
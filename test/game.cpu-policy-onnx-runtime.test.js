@@ -1,6 +1,40 @@
+const fs = require('fs');
+const os = require('os');
 const path = require('path');
+const { spawnSync } = require('child_process');
 const runtime = require(path.resolve(__dirname, '..', 'game', 'ai', 'policy-onnx-runtime.js'));
 
+const PYTHON = process.env.PYTHON || 'python3';
+const PY_WRITE_VARIANT_META = [
+  'import json, sys',
+  'import onnx_export_tools as t',
+  'teacher, variant = sys.argv[1], sys.argv[2]',
+  'json.dump({"schemaVersion": "policy_onnx.v1", "inputName": "obs", "placeOutputName": "place_logits",',
+  '           "exportVariants": {"preferred": "batch1", "preferredFile": "policy-net.b1.onnx"},',
+  '           "runtimeCheck": {"ok": True}, "studentManifest": "policy-net.students.json"}, open(teacher, "w"))',
+  't.write_variant_meta(teacher, variant, {"quantization": {"accepted": True}})',
+  'print(open(variant).read())'
+].join('\n');
+
+// The INT8 meta exactly as the trainers write it from a teacher meta that lists export variants.
+function pythonInt8Meta() {
+  const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'policy-onnx-meta-'));
+  try {
+    const result = spawnSync(
+      PYTHON,
+      ['-c', PY_WRITE_VARIANT_META, path.join(dir, 'policy-net.onnx.meta.json'), path.join(dir, 'policy-net.int8.onnx.meta.json')],
+      { cwd: path.resolve(__dirname, '..', 'ai', 'train'), encoding: 'utf8' }
+    );
+    if (result.error || result.status !== 0) return null;
+    return JSON.parse(result.stdout);
+  } finally {
+    fs.rmSync(dir, { recursive: true, force: true });
+  }
+}
+
+const int8Meta = pythonInt8Meta();
+const testWithPython = int8Meta ? test : test.skip;
+
 describe('policy-onnx-runtime', () => {
   beforeEach(() => {
     global.ort = {
@@ -96,4 +130,57 @@ describe('policy-onnx-runtime', () => {
     });
     expect(selected).toBe('card_b');
   });
+
+  test('loadFromUrl prefers the export variant listed in meta', async () => {
+    const create = jest.fn(async (url) => ({ url, inputNames: ['obs'], outputNames: ['place_logits'] }));
+    global.ort.InferenceSession = Object.assign(function InferenceSession() {}, { create });
+    const fetchImpl = jest.fn(async () => ({
+      ok: true,
+      json: async () => ({
+        schemaVersion: runtime.MODEL_SCHEMA_VERSION,
+        inputName: 'obs',
+        placeOutputName: 'place_logits',
+        exportVariants: { preferred: 'batch1', preferredFile: 'policy-net.b1.onnx' }
+      })
+    }));
+
+    const ok = await runtime.loadFromUrl('data/models/policy-net.onnx', 'data/models/policy-net.onnx.meta.json', fetchImpl);
+    expect(ok).toBe(true);
+    expect(create.mock.calls[0][0]).toBe('data/models/policy-net.b1.onnx');
+    expect(runtime.getStatus().loadedModelUrl).toBe('data/models/policy-net.b1.onnx');
+    expect(runtime.getStatus().sourceUrl).toBe('data/models/policy-net.onnx');
+  });
+
+  test('loadFromUrl falls back to the base model when the variant is missing', async () => {
+    const create = jest.fn(async (url) => {
+      if (url.endsWith('.opt.onnx')) throw new Error('404');
+      return { url, inputNames: ['obs'], outputNames: ['place_logits'] };
+    });
+    global.ort.InferenceSession = Object.assign(function InferenceSession() {}, { create });
+    const fetchImpl = jest.fn(async () => ({
+      ok: true,
+      json: async () => ({
+        schemaVersion: runtime.MODEL_SCHEMA_VERSION,
+        exportVariants: { preferred: 'optimized', preferredFile: 'policy-net.opt.onnx' }
+      })
+    }));
+
+    const ok = await runtime.loadFromUrl('data/models/policy-net.onnx', 'data/models/policy-net.onnx.meta.json', fetchImpl);
+    expect(ok).toBe(true);
+    expect(runtime.getStatus().loadedModelUrl).toBe('data/models/policy-net.onnx');
+  });
+
+  testWithPython('a derived model meta loads its own model, not the teacher variant', async () => {
+    const create = jest.fn(async (url) => ({ url, inputNames: ['obs'], outputNames: ['place_logits'] }));
+    global.ort.InferenceSession = Object.assign(function InferenceSession() {}, { create });
+    const fetchImpl = jest.fn(async () => ({ ok: true, json: async () => int8Meta }));
+
+    expect(int8Meta.exportVariants).toBeUndefined();
+    expect(int8Meta.quantization).toEqual({ accepted: true });
+    const ok = await runtime.loadFromUrl('data/models/policy-net.int8.onnx', 'data/models/policy-net.int8.onnx.meta.json', fetchImpl);
+    expect(ok).toBe(true);
+    expect(create).toHaveBeenCalledTimes(1);
+    expect(create.mock.calls[0][0]).toBe('data/models/policy-net.int8.onnx');
+    expect(runtime.getStatus().loadedModelUrl).toBe('data/models/policy-net.int8.onnx');
+  });
 });
@@ -221,4 +221,112 @@ describe('policy-table-runtime', () => {
     });
     expect(selected).toEqual({ row: 0, col: 0, flips: [] });
   });
+
+  test('applyDelta updates a cached base table and rejects a delta for another base', () => {
+    const board = [[0]];
+    const stateKey = runtime.makeStateKey('white', runtime.canonicalizeBoard(board).boardKey, null, 1);
+    const base = {
+      schemaVersion: 'policy_table.v2',
+      createdAt: '2026-01-01T00:00:00Z',
+      states: {
+        [stateKey]: { bestAction: 'place:0:0', actions: { 'place:0:0': { visits: 1, avgOutcome: -0.5 } } },
+        stale: { bestAction: 'place:0:0', actions: {} }
+      }
+    };
+    expect(runtime.setModel(base)).toBe(true);
+    const delta = {
+      schemaVersion: runtime.DELTA_SCHEMA_VERSION,
+      base: { createdAt: '2026-01-01T00:00:00Z' },
+      header: { schemaVersion: 'policy_table.v2', createdAt: '2026-01-02T00:00:00Z' },
+      states: {
+        upsert: { [stateKey]: { bestAction: 'place:0:0', actions: { 'place:0:0': { visits: 9, avgOutcome: 0.5 } } } },
+        remove: ['stale']
+      },
+      abstractStates: { upsert: {}, remove: [] }
+    };
+    const ctx = { playerKey: 'white', level: 5, board, pendingType: null, legalMovesCount: 1 };
+    const before = runtime.getActionScoreForKey('place:0:0', ctx);
+    expect(runtime.applyDelta(delta)).toBe(true);
+    expect(runtime.getActionScoreForKey('place:0:0', ctx)).toBeGreaterThan(before);
+    expect(runtime.getStatus().statesCount).toBe(1);
+    expect(runtime.getStatus().deltasApplied).toBe(1);
+
+    // The model now carries the delta's createdAt, so the same delta no longer applies.
+    expect(runtime.applyDelta(delta)).toBe(false);
+    expect(runtime.getStatus().lastError).toContain('delta base mismatch');
+    expect(runtime.getStatus().statesCount).toBe(1);
+  });
+
+  test('opening book answers before the table loads and maps symmetric boards', () => {
+    const board = Array.from({ length: 8 }, () => Array.from({ length: 8 }, () => 0));
+    board[3][3] = -1;
+    board[3][4] = 1;
+    board[4][3] = 1;
+    board[4][4] = -1;
+    const candidates = [
+      { row: 2, col: 3, flips: [{ row: 3, col: 3 }] },
+      { row: 3, col: 2, flips: [{ row: 3, col: 3 }] },
+      { row: 4, col: 5, flips: [{ row: 4, col: 4 }] },
+      { row: 5, col: 4, flips: [{ row: 4, col: 4 }] }
+    ];
+    const canonical = runtime.canonicalizeBoard(board);
+    const target = candidates[2];
+    const p = runtime.transformCoord(target.row, target.col, 8, canonical.transformId);
+    expect(runtime.setBook({
+      schemaVersion: runtime.BOOK_SCHEMA_VERSION,
+      entries: { [runtime.makeBookKey('black', canonical.boardKey, 4)]: (p.row * 8) + p.col }
+    })).toBe(true);
+    const ctx = { playerKey: 'black', level: 5, board, pendingType: null, legalMovesCount: 4 };
+    expect(runtime.hasModel()).toBe(false);
+    expect(runtime.chooseMove(candidates, ctx)).toBe(target);
+    expect(runtime.chooseMove(candidates, Object.assign({}, ctx, { pendingType: 'FREE_PLACEMENT' }))).toBeNull();
+    expect(runtime.getStatus().bookHits).toBe(1);
+
+    // The same position rotated by 90 degrees hits the same entry with the rotated move.
+    const rotated = board.map((row, r) => row.map((_, c) => board[7 - c][r]));
+    const rotatedCandidates = candidates.map((m) => ({ row: m.col, col: 7 - m.row, flips: [] }));
+    expect(runtime.chooseMove(rotatedCandidates, Object.assign({}, ctx, { board: rotated }))).toBe(rotatedCandidates[2]);
+    runtime.clearBook();
+  });
+
+  test('opening book is ignored once a different table (or delta version) is loaded', () => {
+    const board = Array.from({ length: 8 }, () => Array.from({ length: 8 }, () => 0));
+    board[3][3] = -1;
+    board[3][4] = 1;
+    board[4][3] = 1;
+    board[4][4] = -1;
+    const candidates = [
+      { row: 2, col: 3, flips: [{ row: 3, col: 3 }] },
+      { row: 4, col: 5, flips: [{ row: 4, col: 4 }] }
+    ];
+    const canonical = runtime.canonicalizeBoard(board);
+    const p = runtime.transformCoord(4, 5, 8, canonical.transformId);
+    expect(runtime.setBook({
+      schemaVersion: runtime.BOOK_SCHEMA_VERSION,
+      source: { schemaVersion: 'policy_table.v2', createdAt: 't1' },
+      entries: { [runtime.makeBookKey('black', canonical.boardKey, 2)]: (p.row * 8) + p.col }
+    })).toBe(true);
+    const ctx = { playerKey: 'black', level: 5, board, pendingType: null, legalMovesCount: 2 };
+    const table = (createdAt) => ({ schemaVersion: 'policy_table.v2', createdAt, states: {}, abstractStates: {} });
+
+    expect(runtime.setModel(table('t1'))).toBe(true);
+    expect(runtime.getStatus().bookActive).toBe(true);
+    expect(runtime.chooseMove(candidates, ctx)).toBe(candidates[1]);
+
+    expect(runtime.setModel(table('t0'))).toBe(true);
+    expect(runtime.getStatus().bookActive).toBe(false);
+    expect(runtime.chooseMove(candidates, ctx)).not.toBe(candidates[1]);
+
+    // A delta moves the table to its target version; the book follows the table it names.
+    expect(runtime.applyDelta({
+      schemaVersion: runtime.DELTA_SCHEMA_VERSION,
+      base: { createdAt: 't0' },
+      header: { schemaVersion: 'policy_table.v2', createdAt: 't1' },
+      states: { upsert: {}, remove: [] },
+      abstractStates: { upsert: {}, remove: [] }
+    })).toBe(true);
+    expect(runtime.getStatus().bookActive).toBe(true);
+    expect(runtime.chooseMove(candidates, ctx)).toBe(candidates[1]);
+    runtime.clearBook();
+  });
 });
@@ -0,0 +1,91 @@
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const runtime = require('../game/ai/policy-table-runtime');
+const {
+    parseArgs,
+    createInitialBoard,
+    buildOpeningBook,
+    writeOpeningBook
+} = require('../scripts/build-opening-book');
+
+function initialStateKey() {
+    const canonical = runtime.canonicalizeBoard(createInitialBoard());
+    return { key: runtime.makeStateKey('black', canonical.boardKey, null, 4), transformId: canonical.transformId };
+}
+
+describe('selfplay opening book', () => {
+    afterEach(() => {
+        runtime.clearModel();
+        runtime.clearBook();
+    });
+
+    test('parseArgs validates depth and branching', () => {
+        expect(() => parseArgs(['--plies', '0'])).toThrow('--plies must be an integer >= 1');
+        expect(() => parseArgs(['--branching', '0'])).toThrow('--branching must be an integer >= 1');
+        expect(parseArgs(['--plies', '10']).plies).toBe(10);
+    });
+
+    test('buildOpeningBook records the table move and follows visited replies', () => {
+        const { key, transformId } = initialStateKey();
+        const best = runtime.transformCoord(2, 3, 8, transformId);
+        const other = runtime.transformCoord(4, 5, 8, transformId);
+        const model = {
+            schemaVersion: 'policy_table.v2',
+            createdAt: '2026-01-01T00:00:00Z',
+            states: {
+                [key]: {
+                    bestAction: `place:${best.row}:${best.col}`,
+                    actions: {
+                        [`place:${best.row}:${best.col}`]: { visits: 30, avgOutcome: 0.4 },
+                        [`place:${other.row}:${other.col}`]: { visits: 5, avgOutcome: 0.1 }
+                    }
+                }
+            },
+            abstractStates: {}
+        };
+        const { book, counts } = buildOpeningBook(model, { plies: 4, branching: 2, minVisits: 1, maxEntries: 100 });
+        expect(counts.entries).toBe(1);
+        expect(counts.exact).toBe(1);
+        expect(book.source.createdAt).toBe('2026-01-01T00:00:00Z');
+
+        runtime.setModel(model);
+        runtime.configure({ enabled: true, minLevel: 1 });
+        const board = createInitialBoard();
+        const moves = [
+            { row: 2, col: 3, flips: [{ row: 3, col: 3 }] },
+            { row: 3, col: 2, flips: [{ row: 3, col: 3 }] },
+            { row: 4, col: 5, flips: [{ row: 4, col: 4 }] },
+            { row: 5, col: 4, flips: [{ row: 4, col: 4 }] }
+        ];
+        const ctx = { playerKey: 'black', level: 5, board, pendingType: null, legalMovesCount: 4 };
+        const fromTable = runtime.chooseMove(moves, ctx);
+        runtime.clearModel();
+        expect(runtime.setBook(book)).toBe(true);
+        expect(runtime.chooseMove(moves, ctx)).toBe(fromTable);
+    });
+
+    test('writeOpeningBook writes a compact book and reports sizes', () => {
+        const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'opening-book-'));
+        const { key, transformId } = initialStateKey();
+        const best = runtime.transformCoord(2, 3, 8, transformId);
+        const modelPath = path.join(dir, 'policy-table.json');
+        fs.writeFileSync(modelPath, JSON.stringify({
+            schemaVersion: 'policy_table.v2',
+            states: {
+                [key]: { bestAction: `place:${best.row}:${best.col}`, actions: { [`place:${best.row}:${best.col}`]: { visits: 3, avgOutcome: 0.2 } } }
+            },
+            abstractStates: {
+                'white|-|opening|mob:4|disc:0|corner:0': { bestAction: 'place_cat:inner', actions: { 'place_cat:inner': { visits: 4, avgOutcome: 0.1 } } }
+            }
+        }, null, 2), 'utf8');
+
+        const outPath = path.join(dir, 'opening-book.json');
+        const report = writeOpeningBook({ modelPath, outPath, plies: 2, branching: 3, minVisits: 1, maxEntries: 100 });
+        expect(report.entries).toBe(2);
+        expect(report.abstract).toBe(1);
+        expect(report.bookBytes).toBe(fs.statSync(outPath).size);
+        expect(report.bookBytes).toBeLessThan(report.tableBytes);
+        fs.rmSync(dir, { recursive: true, force: true });
+    });
+});
@@ -0,0 +1,57 @@
+const path = require('path');
+const { spawnSync } = require('child_process');
+const runtime = require('../game/ai/policy-table-runtime');
+const { runSelfPlayGames, canonicalizeBoard } = require('../src/engine/selfplay-runner');
+
+const PYTHON = process.env.PYTHON || 'python3';
+const TRAIN_DIR = path.resolve(__dirname, '..', 'ai', 'train');
+const PY_CANONICALIZE = [
+    'import json, sys',
+    'import train_policy_table as t',
+    'print(json.dumps([list(t.canonicalize_board(b)) for b in json.load(sys.stdin)]))'
+].join('\n');
+
+function pythonCanonical(boardKeys) {
+    const result = spawnSync(PYTHON, ['-c', PY_CANONICALIZE], {
+        cwd: TRAIN_DIR,
+        input: JSON.stringify(boardKeys),
+        encoding: 'utf8',
+        maxBuffer: 64 * 1024 * 1024
+    });
+    if (result.error || result.status !== 0) return null;
+    return JSON.parse(result.stdout);
+}
+
+function decodeRecordedBoard(boardKey) {
+    return boardKey.split('/').map((row) => row.split('').map((ch) => (ch === 'B' ? 1 : (ch === 'W' ? -1 : 0))));
+}
+
+function recordedBoardKeys() {
+    const { records } = runSelfPlayGames({ games: 4, baseSeed: 11, allowCardUsage: false });
+    return Array.from(new Set(records.map((rec) => rec.board)));
+}
+
+const boardKeys = recordedBoardKeys();
+const expected = pythonCanonical(boardKeys);
+const describeWithPython = expected ? describe : describe.skip;
+
+describeWithPython('policy-table canonical board keys match train_policy_table.py', () => {
+    test('recorded self-play boards are numeric and non-trivial', () => {
+        expect(boardKeys.length).toBeGreaterThan(100);
+        expect(boardKeys.every((key) => /^[BW.]{8}(\/[BW.]{8}){7}$/.test(key))).toBe(true);
+    });
+
+    test('table runtime canonicalizeBoard matches canonicalize_board', () => {
+        boardKeys.forEach((key, i) => {
+            const canonical = runtime.canonicalizeBoard(decodeRecordedBoard(key));
+            expect([canonical.boardKey, canonical.transformId]).toEqual(expected[i]);
+        });
+    });
+
+    test('self-play runner canonicalizeBoard matches canonicalize_board', () => {
+        boardKeys.forEach((key, i) => {
+            const canonical = canonicalizeBoard(decodeRecordedBoard(key));
+            expect([canonical.boardKey, canonical.transformId]).toEqual(expected[i]);
+        });
+    });
+});
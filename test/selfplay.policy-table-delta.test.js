@@ -0,0 +1,62 @@
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const runtime = require('../game/ai/policy-table-runtime');
+const {
+    parseArgs,
+    diffPolicyTables,
+    verifyDelta,
+    writeDelta
+} = require('../scripts/diff-policy-table');
+
+function table(createdAt, states, abstractStates) {
+    return { schemaVersion: 'policy_table.v2', createdAt, stats: { statesKept: Object.keys(states).length }, states, abstractStates: abstractStates || {} };
+}
+
+function entry(bestAction, visits, avgOutcome) {
+    return { visits, bestAction, actions: { [bestAction]: { visits, avgOutcome } } };
+}
+
+describe('selfplay policy table delta', () => {
+    test('parseArgs requires base/target and derives the delta path', () => {
+        expect(() => parseArgs([])).toThrow('--base is required');
+        expect(() => parseArgs(['--base', 'a.json'])).toThrow('--target is required');
+        const args = parseArgs(['--base', 'a.json', '--target', 'models/b.json']);
+        expect(args.outPath).toBe(path.resolve(process.cwd(), 'models', 'b.delta.json'));
+    });
+
+    test('diffPolicyTables keeps only added, changed and removed states', () => {
+        const base = table('t0', { keep: entry('place:0:0', 3, 0.5), move: entry('place:0:0', 3, 0.5), drop: entry('place:1:1', 1, 0) });
+        const target = table('t1', { keep: entry('place:0:0', 3, 0.5), move: entry('place:2:2', 4, 0.7), fresh: entry('place:3:3', 2, 0.1) });
+        const { delta, counts } = diffPolicyTables(base, target);
+        expect(counts.states).toEqual({ added: 1, changed: 1, removed: 1, unchanged: 1 });
+        expect(Object.keys(delta.states.upsert).sort()).toEqual(['fresh', 'move']);
+        expect(delta.states.remove).toEqual(['drop']);
+        expect(delta.base.createdAt).toBe('t0');
+        expect(delta.header.createdAt).toBe('t1');
+        expect(verifyDelta(base, target, delta)).toBe(0);
+
+        const applied = runtime.applyPolicyTableDelta(JSON.parse(JSON.stringify(base)), delta);
+        expect(applied.states).toEqual(target.states);
+        expect(applied.stats).toEqual(target.stats);
+    });
+
+    test('writeDelta reports delta size against the full table', () => {
+        const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'policy-delta-'));
+        const states = {};
+        for (let i = 0; i < 50; i++) states[`s${i}`] = entry('place:0:0', 5, 0.25);
+        const base = table('t0', states);
+        const target = table('t1', Object.assign({}, states, { s0: entry('place:1:1', 6, 0.5) }));
+        const basePath = path.join(dir, 'base.json');
+        const targetPath = path.join(dir, 'target.json');
+        fs.writeFileSync(basePath, JSON.stringify(base, null, 2), 'utf8');
+        fs.writeFileSync(targetPath, JSON.stringify(target, null, 2), 'utf8');
+
+        const report = writeDelta({ basePath, targetPath, outPath: path.join(dir, 'target.delta.json'), tolerance: 0 });
+        expect(report.verified).toBe(true);
+        expect(report.counts.states.changed).toBe(1);
+        expect(report.deltaBytes).toBeLessThan(report.fullBytes / 5);
+        expect(report.deltaBytes).toBe(fs.statSync(report.deltaPath).size);
+        fs.rmSync(dir, { recursive: true, force: true });
+    });
+});
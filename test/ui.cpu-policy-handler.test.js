@@ -75,4 +75,23 @@ describe('ui cpu-policy handler', () => {
     await expect(handlers.initPolicyTableModel()).resolves.toBeUndefined();
     expect(loadFromUrl).toHaveBeenCalledTimes(1);
   });
+
+  test('initPolicyTableModel loads the opening book before the full table', async () => {
+    const calls = [];
+    global.window.fetch = jest.fn(async () => ({ ok: true }));
+    global.window.CpuPolicyTableRuntime = {
+      DEFAULT_BOOK_URL: 'data/models/opening-book.json',
+      configure: jest.fn(),
+      getStatus: jest.fn(() => ({ statesCount: 1, bookEntries: 3 })),
+      loadBookFromUrl: jest.fn(async (url) => { calls.push(['book', url]); return true; }),
+      loadFromUrl: jest.fn(async (url) => { calls.push(['table', url]); return true; })
+    };
+
+    await handlers.initPolicyTableModel();
+
+    expect(calls).toEqual([
+      ['book', 'data/models/opening-book.json'],
+      ['table', 'data/models/policy-table.json']
+    ]);
+  });
 });
@@ -121,8 +121,39 @@ async function initPolicyOnnxModel() {
     }
 }
 
+/**
+ * Opening book loading for the policy-table runtime (small; answers early moves
+ * while the full table is still loading). Missing book files are skipped quietly.
+ */
+async function initPolicyOpeningBook(runtime) {
+    if (!runtime || typeof runtime.loadBookFromUrl !== 'function') return;
+    const bookUrl = runtime.DEFAULT_BOOK_URL || 'data/models/opening-book.json';
+    const fetchImpl = (typeof window !== 'undefined' && typeof window.fetch === 'function')
+        ? window.fetch.bind(window)
+        : null;
+    if (!fetchImpl) return;
+    try {
+        const head = await fetchImpl(bookUrl, { method: 'HEAD', cache: 'no-store' });
+        if (!head || !head.ok) {
+            if (_isDebugEnabled()) console.warn('[CPU] opening book file not found; skip load');
+            return;
+        }
+        const ok = await runtime.loadBookFromUrl(bookUrl, fetchImpl);
+        if (ok) {
+            const status = (typeof runtime.getStatus === 'function') ? runtime.getStatus() : null;
+            console.log(`[CPU] opening book loaded (entries=${status ? status.bookEntries : '?'})`);
+        } else if (_isDebugEnabled()) {
+            const status = (typeof runtime.getStatus === 'function') ? runtime.getStatus() : null;
+            console.warn('[CPU] opening book not loaded', status && status.lastError ? status.lastError : '');
+        }
+    } catch (err) {
+        if (_isDebugEnabled()) console.warn('[CPU] opening book loading failed', err);
+    }
+}
+
 /**
  * Policy-table model loading for browser CPU runtime.
+ * The opening book is loaded first so early moves do not wait for the full table.
  * Fails safely: CPU falls back to default policy logic.
  */
 async function initPolicyTableModel() {
@@ -143,6 +174,7 @@ async function initPolicyTableModel() {
                 sourceUrl: 'data/models/policy-table.json'
             });
         }
+        await initPolicyOpeningBook(runtime);
         const ok = await runtime.loadFromUrl('data/models/policy-table.json');
         if (ok) {
             const status = (typeof runtime.getStatus === 'function') ? runtime.getStatus() : null;